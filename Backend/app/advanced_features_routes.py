@@ -7,6 +7,9 @@ from fastapi import APIRouter, HTTPException, BackgroundTasks
 from pydantic import BaseModel
 from typing import Optional, List, Dict
 from datetime import datetime
+import asyncio
+
+import numpy as np
 
 # Import services
 from .services.risk_management_service import RiskManagementService, RiskLimits
@@ -15,6 +18,8 @@ from .services.execution_intelligence_service import ExecutionIntelligenceServic
 from .services.security_compliance_service import SecurityComplianceService
 from .services.enhanced_notification_service import EnhancedNotificationService
 from .services.paper_trading_engine import PaperTradingEngine
+from .services.backtest_engine import BacktestEngine, OHLCData, StrategyParams
+from .services.strategy_optimizer import build_grid, strategy_optimizer
 from .services.natural_language_service import NaturalLanguageService
 
 # Initialize services (in production, use dependency injection)
@@ -24,6 +29,7 @@ execution_svc = ExecutionIntelligenceService()
 security_svc = SecurityComplianceService()
 notification_svc = EnhancedNotificationService()
 paper_trading = PaperTradingEngine()
+backtester = BacktestEngine(paper_trading)
 nlp_svc = NaturalLanguageService()
 
 router = APIRouter(prefix="/api/advanced", tags=["Advanced Trading Features"])
@@ -208,6 +214,45 @@ async def create_conditional_order(user_id: str, request: ConditionalOrderReques
     )
 
 
+MAX_BULK_ORDERS = 500
+
+
+class BulkConditionalOrderRequest(BaseModel):
+    orders: List[ConditionalOrderRequest]
+    validate_risk: bool = True  # Check every order against the user's risk limits
+
+
+class BulkCancelRequest(BaseModel):
+    order_ids: List[str]
+    user_id: Optional[str] = None  # Only cancel orders owned by this user
+
+
+@router.post("/execution/conditional-orders/bulk")
+async def create_conditional_orders_bulk(user_id: str, request: BulkConditionalOrderRequest):
+    """
+    Create up to MAX_BULK_ORDERS conditional orders in one request
+    Orders are risk-checked together and registered in one pass; invalid
+    orders are reported by index without blocking the rest.
+    """
+    if len(request.orders) > MAX_BULK_ORDERS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BULK_ORDERS} orders per request")
+    
+    return await execution_svc.create_conditional_orders(
+        user_id,
+        [order.model_dump() for order in request.orders],
+        risk_manager=risk_manager if request.validate_risk else None
+    )
+
+
+@router.post("/execution/cancel-orders/bulk")
+async def cancel_orders_bulk(request: BulkCancelRequest):
+    """Cancel up to MAX_BULK_ORDERS pending orders in one request"""
+    if len(request.order_ids) > MAX_BULK_ORDERS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BULK_ORDERS} orders per request")
+    
+    return await execution_svc.cancel_orders(request.order_ids, request.user_id)
+
+
 @router.get("/execution/order-status/{order_id}")
 async def get_order_status(order_id: str):
     """Get status of a conditional order"""
@@ -449,6 +494,119 @@ async def update_paper_prices(price_data: Dict[str, float]):
     return await paper_trading.update_live_prices(price_data)
 
 
+class BacktestRequest(BaseModel):
+    pair: str
+    close: Optional[List[float]] = None  # Defaults to the live price history for the pair
+    high: Optional[List[float]] = None
+    low: Optional[List[float]] = None
+    timestamps: Optional[List[float]] = None  # Epoch seconds
+    params: Optional[Dict[str, float]] = None
+    param_grid: Optional[List[Dict[str, float]]] = None
+    position_size: float = 1000.0
+    starting_balance: float = 10000.0
+    include_trades: bool = False
+
+
+def _load_ohlc(
+    pair: str,
+    close: Optional[List[float]] = None,
+    high: Optional[List[float]] = None,
+    low: Optional[List[float]] = None,
+    timestamps: Optional[List[float]] = None
+) -> OHLCData:
+    """Bars from the request, or the live price history for the pair"""
+    if close is not None:
+        try:
+            return OHLCData.from_arrays(close, high, low, timestamps)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    
+    from .price_history import price_history
+    
+    buffer = price_history.buffers.get(pair)
+    if buffer is None or not len(buffer):
+        raise HTTPException(status_code=404, detail=f"No price history for {pair}")
+    # Copy on the event loop: the stream keeps overwriting the ring buffer while the backtest runs
+    return OHLCData.from_arrays(np.array(buffer.window()), timestamps=np.array(buffer.timestamps()))
+
+
+@router.post("/paper/backtest")
+async def run_backtest(request: BacktestRequest):
+    """
+    Backtest the AI signal rules on historical bars
+    Pass `param_grid` to evaluate several threshold sets in one vectorized run.
+    """
+    ohlc = _load_ohlc(request.pair, request.close, request.high, request.low, request.timestamps)
+    
+    try:
+        grid = [StrategyParams(**p) for p in (request.param_grid or [request.params or {}])]
+    except TypeError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid strategy parameter: {e}")
+    
+    results = await asyncio.to_thread(
+        backtester.run_grid,
+        request.pair,
+        ohlc,
+        grid,
+        request.position_size,
+        request.starting_balance,
+        request.include_trades
+    )
+    return results[0] if request.param_grid is None else {"success": True, "results": results}
+
+
+class OptimizeRequest(BaseModel):
+    pairs: List[str]
+    ranges: Dict[str, List[float]]  # e.g. {"rsi_oversold": [20, 25, 30], "take_profit_pct": [0.01, 0.02]}
+    closes: Optional[Dict[str, List[float]]] = None  # Per-pair closes; defaults to live price history
+    metric: str = "total_profit_loss"
+    top: int = 20
+    min_trades: int = 1
+    position_size: float = 1000.0
+    starting_balance: float = 10000.0
+    apply: bool = False  # Use each pair's best thresholds for live AI signals
+
+
+@router.post("/paper/optimize")
+async def optimize_strategy(request: OptimizeRequest):
+    """
+    Sweep signal thresholds per pair in a process pool
+    Returns a ranked table per pair; `apply` hands the winners to the AI engine.
+    """
+    try:
+        grid = build_grid(request.ranges)
+    except (ValueError, TypeError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    closes = request.closes or {}
+    histories = {pair: _load_ohlc(pair, closes.get(pair)) for pair in request.pairs}
+    try:
+        results = await asyncio.to_thread(
+            strategy_optimizer.sweep_pairs,
+            histories,
+            grid,
+            metric=request.metric,
+            top=request.top,
+            min_trades=request.min_trades,
+            position_size=request.position_size,
+            starting_balance=request.starting_balance
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    applied = {}
+    if request.apply:
+        from .ai_forex_engine import ai_engine
+        
+        for pair, result in results.items():
+            if result["results"]:
+                best = result["results"][0]["params"]
+                ai_engine.set_strategy_params(pair, best)
+                applied[pair] = best
+    
+    return {"success": True, "combinations": len(grid), "pairs": results, "applied": applied}
+
+
 @router.get("/paper/guide")
 async def get_paper_trading_guide():
     """Get paper trading guide"""
@@ -10,8 +10,12 @@ import numpy as np
 from dataclasses import dataclass
 import json
 
+from .http_client import http_pool
+from .indicator_engine import IndicatorEngine, ema_series, rsi_series, macd_series
+from .rate_cache import get_usd_rates
 
-@dataclass
+
+@dataclass(slots=True)
 class TradingSignal:
     """Trading signal with AI analysis"""
     pair: str
@@ -24,7 +28,7 @@ class TradingSignal:
     timestamp: datetime
 
 
-@dataclass
+@dataclass(slots=True)
 class MarketCondition:
     """Current market conditions"""
     pair: str
@@ -49,19 +53,22 @@ class ForexAIEngine:
     """
     
     def __init__(self):
-        self.session: Optional[aiohttp.ClientSession] = None
         self.active_positions: Dict[str, Dict] = {}
         self.user_preferences: Dict[str, any] = {}
+        self.indicators = IndicatorEngine()
+        self.pair_strategy_params: Dict[str, Dict[str, float]] = {}  # Tuned thresholds per pair
         
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """Shared pooled HTTP session (owned by the app lifespan)"""
+        return http_pool.session
+    
     async def initialize(self):
         """Initialize the AI engine"""
-        if not self.session:
-            self.session = aiohttp.ClientSession()
+        await http_pool.start()
     
     async def close(self):
-        """Close sessions"""
-        if self.session:
-            await self.session.close()
+        """Release engine resources (the shared HTTP pool is closed on app shutdown)"""
     
     # ========================================================================
     # REAL-TIME DATA FETCHING
@@ -70,26 +77,22 @@ class ForexAIEngine:
     async def fetch_live_rates(self) -> Dict[str, float]:
         """Fetch real-time forex rates from multiple sources"""
         try:
-            # Primary source: exchangerate-api.com
-            url = "https://api.exchangerate-api.com/v4/latest/USD"
+            # Primary source: exchangerate-api.com (shared TTL cache)
+            usd_rates = await get_usd_rates()
             
-            async with self.session.get(url, timeout=10) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    
-                    # Calculate major pairs
-                    rates = {
-                        "EUR/USD": 1 / data["rates"]["EUR"],
-                        "GBP/USD": 1 / data["rates"]["GBP"],
-                        "USD/JPY": data["rates"]["JPY"],
-                        "USD/CHF": data["rates"]["CHF"],
-                        "AUD/USD": 1 / data["rates"]["AUD"],
-                        "USD/CAD": data["rates"]["CAD"],
-                        "NZD/USD": 1 / data["rates"]["NZD"],
-                        "EUR/GBP": data["rates"]["GBP"] / data["rates"]["EUR"],
-                    }
-                    
-                    return rates
+            # Calculate major pairs
+            rates = {
+                "EUR/USD": 1 / usd_rates["EUR"],
+                "GBP/USD": 1 / usd_rates["GBP"],
+                "USD/JPY": usd_rates["JPY"],
+                "USD/CHF": usd_rates["CHF"],
+                "AUD/USD": 1 / usd_rates["AUD"],
+                "USD/CAD": usd_rates["CAD"],
+                "NZD/USD": 1 / usd_rates["NZD"],
+                "EUR/GBP": usd_rates["GBP"] / usd_rates["EUR"],
+            }
+            
+            return rates
         except Exception as e:
             print(f"Error fetching rates: {e}")
             return {}
@@ -131,62 +134,43 @@ class ForexAIEngine:
     # ========================================================================
     
     def calculate_rsi(self, prices: List[float], period: int = 14) -> float:
-        """Calculate Relative Strength Index"""
+        """Calculate Relative Strength Index (Wilder smoothing)"""
         if len(prices) < period + 1:
             return 50.0
         
-        deltas = np.diff(prices)
-        gains = np.where(deltas > 0, deltas, 0)
-        losses = np.where(deltas < 0, -deltas, 0)
-        
-        avg_gain = np.mean(gains[:period])
-        avg_loss = np.mean(losses[:period])
-        
-        if avg_loss == 0:
-            return 100.0
-        
-        rs = avg_gain / avg_loss
-        rsi = 100 - (100 / (1 + rs))
-        
-        return rsi
+        return float(rsi_series(prices, period)[0, -1])
     
     def calculate_macd(self, prices: List[float]) -> Dict[str, float]:
         """Calculate MACD (Moving Average Convergence Divergence)"""
         if len(prices) < 26:
             return {"macd": 0, "signal": 0, "histogram": 0}
         
-        prices_array = np.array(prices)
-        
-        # Calculate EMAs
-        ema_12 = self._calculate_ema(prices_array, 12)
-        ema_26 = self._calculate_ema(prices_array, 26)
-        
-        macd_line = ema_12 - ema_26
-        signal_line = self._calculate_ema(np.array([macd_line]), 9)
-        histogram = macd_line - signal_line
+        macd = macd_series(prices)
         
         return {
-            "macd": macd_line,
-            "signal": signal_line,
-            "histogram": histogram
+            "macd": float(macd["macd"][0, -1]),
+            "signal": float(macd["signal"][0, -1]),
+            "histogram": float(macd["histogram"][0, -1])
         }
     
     def _calculate_ema(self, prices: np.ndarray, period: int) -> float:
         """Calculate Exponential Moving Average"""
-        multiplier = 2 / (period + 1)
-        ema = prices[0]
-        
-        for price in prices[1:]:
-            ema = (price * multiplier) + (ema * (1 - multiplier))
-        
-        return ema
+        return float(ema_series(prices, period)[-1])
+    
+    def update_indicators(self, rates: Dict[str, float]):
+        """Fold a live rates snapshot into the rolling per-pair indicator state"""
+        self.indicators.update_many(rates)
+    
+    def get_live_indicators(self, pair: str) -> Dict:
+        """Current rolling RSI/MACD for a pair, updated tick by tick"""
+        return self.indicators.snapshot(pair)
     
     def identify_support_resistance(self, prices: List[float]) -> Tuple[float, float]:
         """Identify support and resistance levels"""
         recent_prices = prices[-50:] if len(prices) > 50 else prices
         
-        support = min(recent_prices)
-        resistance = max(recent_prices)
+        support = float(np.min(recent_prices))
+        resistance = float(np.max(recent_prices))
         
         return support, resistance
     
@@ -201,11 +185,62 @@ class ForexAIEngine:
     ) -> MarketCondition:
         """Comprehensive market analysis using AI"""
         
-        current_price = historical_prices[-1]
-        
         # Technical indicators
         rsi = self.calculate_rsi(historical_prices)
         macd = self.calculate_macd(historical_prices)
+        
+        return self._build_market_condition(pair, historical_prices, rsi, macd)
+    
+    async def analyze_market_conditions_batch(
+        self,
+        histories: Dict[str, List[float]]
+    ) -> Dict[str, MarketCondition]:
+        """Analyze many pairs at once"""
+        return self.analyze_windows(histories)
+    
+    def analyze_windows(
+        self,
+        histories: Dict[str, List[float]]
+    ) -> Dict[str, MarketCondition]:
+        """
+        Synchronous batch analysis
+        Pairs sharing a window length are stacked into one matrix so RSI/MACD
+        are computed in a single vectorized pass instead of per pair.
+        """
+        by_length: Dict[int, List[str]] = {}
+        for pair, prices in histories.items():
+            if len(prices):
+                by_length.setdefault(len(prices), []).append(pair)
+        
+        conditions: Dict[str, MarketCondition] = {}
+        for length, pairs in by_length.items():
+            matrix = np.vstack([np.asarray(histories[p], dtype=np.float64) for p in pairs])
+            series = self.indicators.compute_series(matrix)
+            
+            for row, pair in enumerate(pairs):
+                rsi = float(series["rsi"][row, -1])
+                if length >= 26:
+                    macd = {
+                        "macd": float(series["macd"][row, -1]),
+                        "signal": float(series["signal"][row, -1]),
+                        "histogram": float(series["histogram"][row, -1])
+                    }
+                else:
+                    macd = {"macd": 0, "signal": 0, "histogram": 0}
+                conditions[pair] = self._build_market_condition(pair, matrix[row], rsi, macd)
+        
+        return conditions
+    
+    def _build_market_condition(
+        self,
+        pair: str,
+        historical_prices,
+        rsi: float,
+        macd: Dict[str, float]
+    ) -> MarketCondition:
+        """Combine indicator values with trend, volatility and S/R levels"""
+        
+        current_price = float(historical_prices[-1])
         support, resistance = self.identify_support_resistance(historical_prices)
         
         # Trend identification
@@ -227,8 +262,8 @@ class ForexAIEngine:
             current_price=current_price,
             trend=trend,
             volatility=volatility,
-            support_level=support,
-            resistance_level=resistance,
+            support_level=float(support),
+            resistance_level=float(resistance),
             rsi=rsi,
             macd=macd
         )
@@ -243,7 +278,26 @@ class ForexAIEngine:
         market_condition: MarketCondition,
         user_strategy: Dict
     ) -> TradingSignal:
-        """Generate AI-powered trading signal"""
+        """
+        Generate AI-powered trading signal
+        Thresholds (rsi_oversold, rsi_overbought, confidence_threshold,
+        support_band, take_profit_pct) come from `user_strategy`, then the
+        pair's tuned parameters, then the defaults below.
+        """
+        thresholds = {
+            "rsi_oversold": 30.0,
+            "rsi_overbought": 70.0,
+            "confidence_threshold": 0.5,
+            "support_band": 0.01,  # Price within 1% of support/resistance
+            "take_profit_pct": 0.02,  # 2% profit target
+            **self.pair_strategy_params.get(pair, {}),
+        }
+        for name in thresholds:
+            if name in user_strategy:
+                thresholds[name] = float(user_strategy[name])
+        band = thresholds["support_band"]
+        gate = thresholds["confidence_threshold"]
+        take_profit_pct = thresholds["take_profit_pct"]
         
         action = "HOLD"
         confidence = 0.0
@@ -256,9 +310,9 @@ class ForexAIEngine:
         signals = []
         
         # RSI Signal
-        if market_condition.rsi < 30:
+        if market_condition.rsi < thresholds["rsi_oversold"]:
             signals.append(("BUY", 0.7, "RSI oversold"))
-        elif market_condition.rsi > 70:
+        elif market_condition.rsi > thresholds["rsi_overbought"]:
             signals.append(("SELL", 0.7, "RSI overbought"))
         
         # MACD Signal
@@ -274,9 +328,9 @@ class ForexAIEngine:
             signals.append(("SELL", 0.8, "Strong downtrend"))
         
         # Support/Resistance Signal
-        if market_condition.current_price <= market_condition.support_level * 1.01:
+        if market_condition.current_price <= market_condition.support_level * (1 + band):
             signals.append(("BUY", 0.9, "Price at support"))
-        elif market_condition.current_price >= market_condition.resistance_level * 0.99:
+        elif market_condition.current_price >= market_condition.resistance_level * (1 - band):
             signals.append(("SELL", 0.9, "Price at resistance"))
         
         # Aggregate signals
@@ -287,18 +341,18 @@ class ForexAIEngine:
             buy_confidence = sum(s[1] for s in buy_signals) / len(signals)
             sell_confidence = sum(s[1] for s in sell_signals) / len(signals)
             
-            if buy_confidence > sell_confidence and buy_confidence > 0.5:
+            if buy_confidence > sell_confidence and buy_confidence > gate:
                 action = "BUY"
                 confidence = buy_confidence
                 reason = ", ".join(s[2] for s in buy_signals)
                 stop_loss = market_condition.support_level
-                take_profit = market_condition.current_price * 1.02  # 2% profit target
-            elif sell_confidence > buy_confidence and sell_confidence > 0.5:
+                take_profit = market_condition.current_price * (1 + take_profit_pct)
+            elif sell_confidence > buy_confidence and sell_confidence > gate:
                 action = "SELL"
                 confidence = sell_confidence
                 reason = ", ".join(s[2] for s in sell_signals)
                 stop_loss = market_condition.resistance_level
-                take_profit = market_condition.current_price * 0.98  # 2% profit target
+                take_profit = market_condition.current_price * (1 - take_profit_pct)
         
         return TradingSignal(
             pair=pair,
@@ -311,6 +365,10 @@ class ForexAIEngine:
             timestamp=datetime.now()
         )
     
+    def set_strategy_params(self, pair: str, params: Dict[str, float]):
+        """Use tuned signal thresholds (e.g. from a parameter sweep) for a pair"""
+        self.pair_strategy_params[pair] = dict(params)
+    
     # ========================================================================
     # AUTOMATED TRADING
     # ========================================================================
@@ -409,6 +467,15 @@ class ForexAIEngine:
         AI-powered price forecasting
         Predicts future price movements based on historical data
         """
+        return self.forecast_window(pair, historical_prices, horizon_hours)
+    
+    def forecast_window(
+        self,
+        pair: str,
+        historical_prices: List[float],
+        horizon_hours: int = 24
+    ) -> Dict:
+        """Synchronous linear-regression forecast for one price window"""
         
         # Simple linear regression forecast
         # In production, use LSTM, ARIMA, or transformer models
@@ -437,7 +504,7 @@ class ForexAIEngine:
         
         return {
             "pair": pair,
-            "current_price": historical_prices[-1],
+            "current_price": float(historical_prices[-1]),
             "forecasted_price": float(forecasted_price),
             "expected_change": float(forecasted_price - historical_prices[-1]),
             "expected_change_percent": float((forecasted_price - historical_prices[-1]) / historical_prices[-1] * 100),
@@ -448,4 +515,23 @@ class ForexAIEngine:
 
 
 # Global AI engine instance
-ai_engine = ForexAIEngine()
\ No newline at end of file
+ai_engine = ForexAIEngine()
+
+
+def analyze_price_windows(
+    histories: Dict[str, List[float]],
+    include_forecast: bool = False,
+    horizon_hours: int = 24
+) -> Dict[str, Tuple[MarketCondition, Optional[Dict]]]:
+    """
+    Analyze (and optionally forecast) a chunk of pairs
+    Top-level and synchronous so it can run inside a process pool worker.
+    """
+    conditions = ai_engine.analyze_windows(histories)
+    return {
+        pair: (
+            condition,
+            ai_engine.forecast_window(pair, histories[pair], horizon_hours) if include_forecast else None
+        )
+        for pair, condition in conditions.items()
+    }
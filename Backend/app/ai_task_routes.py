@@ -6,11 +6,19 @@ from fastapi import APIRouter, HTTPException, BackgroundTasks
 from pydantic import BaseModel
 from typing import Optional, List, Dict
 from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import multiprocessing
 import uuid
 import asyncio
+import math
+import os
 
-from .ai_forex_engine import ai_engine
+import numpy as np
+
+from .ai_forex_engine import ai_engine, analyze_price_windows
 from .enhanced_websocket_manager import ws_manager
+from .price_history import price_history
 
 router = APIRouter(prefix="/api/tasks", tags=["AI Tasks"])
 
@@ -34,6 +42,7 @@ class TaskCreateRequest(BaseModel):
     analysis_period_hours: int = 24
     include_forecast: bool = True
     forecast_horizon_hours: int = 24
+    max_concurrency: int = 8  # Pairs post-processed and streamed in parallel
 
 
 class TaskResponse(BaseModel):
@@ -57,6 +66,100 @@ class TaskResponse(BaseModel):
 # TASK EXECUTION ENGINE
 # ============================================================================
 
+HISTORY_WINDOW = 100  # Prices per pair handed to the AI engine
+
+
+def get_price_window(pair: str, rates: Dict[str, float]):
+    """
+    Latest HISTORY_WINDOW prices for a pair from the shared history store
+    Returns a read-only NumPy view. Pairs the forex stream has not covered
+    long enough yet are padded with a placeholder ramp for this call only;
+    the padding never enters the store, so backtests only ever see real ticks.
+    """
+    recent = price_history.window(pair, HISTORY_WINDOW)
+    missing = HISTORY_WINDOW - (0 if recent is None else recent.size)
+    if missing <= 0:
+        return recent
+    
+    current = price_history.latest(pair) or rates.get(pair, 1.0)
+    # Placeholder padding (in production, fetch from a historical rates API)
+    padded = np.concatenate([
+        current * (1 + (np.arange(missing) - missing) / 1000),
+        recent if recent is not None else np.empty(0),
+    ])
+    padded.flags.writeable = False
+    return padded
+
+
+# ============================================================================
+# PIPELINED MULTI-PAIR ANALYSIS
+# ============================================================================
+
+ANALYSIS_WORKERS = min(4, os.cpu_count() or 1)
+PROCESS_POOL_MIN_PAIRS = 16  # Below this, IPC costs more than the NumPy work
+
+_analysis_pool: Optional[ProcessPoolExecutor] = None
+
+
+def get_analysis_pool() -> ProcessPoolExecutor:
+    """Lazily create the process pool used for NumPy-heavy analysis"""
+    global _analysis_pool
+    if _analysis_pool is None:
+        _analysis_pool = ProcessPoolExecutor(
+            max_workers=ANALYSIS_WORKERS,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return _analysis_pool
+
+
+def shutdown_analysis_pool():
+    """Stop the analysis process pool (called on app shutdown)"""
+    global _analysis_pool
+    if _analysis_pool is not None:
+        _analysis_pool.shutdown(wait=False, cancel_futures=True)
+        _analysis_pool = None
+
+
+async def iter_pair_analyses(
+    histories: Dict[str, np.ndarray],
+    include_forecast: bool,
+    horizon_hours: int
+):
+    """
+    Yield (pair, market_condition, forecast) as soon as each pair is analyzed
+    Large requests are split into chunks and fanned out over the process pool;
+    small ones are analyzed inline in a single vectorized pass.
+    """
+    if len(histories) < PROCESS_POOL_MIN_PAIRS or ANALYSIS_WORKERS < 2:
+        results = analyze_price_windows(histories, include_forecast, horizon_hours)
+        for pair, (condition, forecast) in results.items():
+            yield pair, condition, forecast
+        return
+
+    loop = asyncio.get_running_loop()
+    pool = get_analysis_pool()
+    pairs = list(histories)
+    # Twice as many chunks as workers so early chunks stream back sooner
+    chunk_size = math.ceil(len(pairs) / (ANALYSIS_WORKERS * 2))
+
+    async def run_chunk(chunk: List[str]):
+        # Copy out of the ring buffer: pickling happens off the event loop thread
+        windows = {pair: np.array(histories[pair]) for pair in chunk}
+        try:
+            return await loop.run_in_executor(
+                pool, analyze_price_windows, windows, include_forecast, horizon_hours
+            )
+        except BrokenProcessPool:
+            shutdown_analysis_pool()
+            return analyze_price_windows(windows, include_forecast, horizon_hours)
+
+    chunks = [pairs[i:i + chunk_size] for i in range(0, len(pairs), chunk_size)]
+    for finished in asyncio.as_completed([run_chunk(chunk) for chunk in chunks]):
+        results = await finished
+        for pair, (condition, forecast) in results.items():
+            yield pair, condition, forecast
+
+
 async def execute_market_analysis_task(task_id: str, params: TaskCreateRequest):
     """
     Execute comprehensive market analysis task
@@ -72,69 +175,69 @@ async def execute_market_analysis_task(task_id: str, params: TaskCreateRequest):
             message="Collecting live forex rates and economic calendar..."
         )
         
-        await ai_engine.initialize()
-        rates = await ai_engine.fetch_live_rates()
-        calendar = await ai_engine.fetch_economic_calendar()
+        rates, calendar = await asyncio.gather(
+            ai_engine.fetch_live_rates(),
+            ai_engine.fetch_economic_calendar()
+        )
+        rates = rates or {}
         
-        # Step 2: Analyze each currency pair
+        # Step 2: Analyze all currency pairs, streaming results as they finish
+        pairs = list(dict.fromkeys(params.currency_pairs or []))
         await ws_manager.send_task_progress(
             task_id=task_id,
             step="Analyzing Markets",
             progress=0.4,
-            message=f"Analyzing {len(params.currency_pairs)} currency pairs..."
+            message=f"Analyzing {len(pairs)} currency pairs..."
         )
         
+        histories = {pair: get_price_window(pair, rates) for pair in pairs}
         analysis_results = {}
+        semaphore = asyncio.Semaphore(max(1, params.max_concurrency))
         
-        for pair in params.currency_pairs:
-            # Simulate historical prices (in production, fetch from API)
-            historical_prices = [rates.get(pair, 1.0) * (1 + (i/1000 - 0.05)) 
-                                for i in range(100)]
-            
-            # Analyze market conditions
-            market_condition = await ai_engine.analyze_market_conditions(
-                pair, historical_prices
-            )
-            
-            # Generate trading signal
-            signal = await ai_engine.generate_trading_signal(
-                pair, 
-                market_condition,
-                params.user_limits or {}
-            )
-            
-            # Forecast if requested
-            forecast = None
-            if params.include_forecast:
-                forecast = await ai_engine.forecast_price_movement(
+        async def publish(pair, market_condition, forecast):
+            async with semaphore:
+                signal = await ai_engine.generate_trading_signal(
                     pair,
-                    historical_prices,
-                    params.forecast_horizon_hours
+                    market_condition,
+                    params.user_limits or {}
                 )
-            
-            analysis_results[pair] = {
-                "current_price": market_condition.current_price,
-                "trend": market_condition.trend,
-                "rsi": market_condition.rsi,
-                "volatility": market_condition.volatility,
-                "signal": {
-                    "action": signal.action,
-                    "confidence": signal.confidence,
-                    "reason": signal.reason,
-                    "entry_price": signal.entry_price,
-                    "stop_loss": signal.stop_loss,
-                    "take_profit": signal.take_profit
-                },
-                "forecast": forecast
-            }
-            
-            # Send update for this pair
-            await ws_manager.send_update(
-                task_id=task_id,
-                message=f"✅ Analyzed {pair}: {signal.action} signal with {signal.confidence:.0%} confidence",
-                update_type="info",
-                data=analysis_results[pair]
-            )
+                
+                analysis_results[pair] = {
+                    "current_price": market_condition.current_price,
+                    "trend": market_condition.trend,
+                    "rsi": market_condition.rsi,
+                    "volatility": market_condition.volatility,
+                    "signal": {
+                        "action": signal.action,
+                        "confidence": signal.confidence,
+                        "reason": signal.reason,
+                        "entry_price": signal.entry_price,
+                        "stop_loss": signal.stop_loss,
+                        "take_profit": signal.take_profit
+                    },
+                    "forecast": forecast
+                }
+                
+                # Send update for this pair, advancing the progress bar
+                await ws_manager.send_update(
+                    task_id=task_id,
+                    message=f"✅ Analyzed {pair}: {signal.action} signal with {signal.confidence:.0%} confidence",
+                    update_type="info",
+                    progress=0.4 + 0.4 * len(analysis_results) / max(len(pairs), 1),
+                    data=analysis_results[pair]
+                )
+        
+        publishers = []
+        async for pair, market_condition, forecast in iter_pair_analyses(
+            histories,
+            params.include_forecast,
+            params.forecast_horizon_hours
+        ):
+            publishers.append(asyncio.create_task(publish(pair, market_condition, forecast)))
+        await asyncio.gather(*publishers)
+        
+        # Keep the report in the order the pairs were requested
+        analysis_results = {pair: analysis_results[pair] for pair in pairs if pair in analysis_results}
         
         # Step 3: Generate comprehensive report
         await ws_manager.send_task_progress(
@@ -150,7 +253,7 @@ async def execute_market_analysis_task(task_id: str, params: TaskCreateRequest):
         await ws_manager.send_task_complete(
             task_id=task_id,
             result={
-                "summary": f"Analysis complete for {len(params.currency_pairs)} pairs",
+                "summary": f"Analysis complete for {len(pairs)} pairs",
                 "file_url": f"/downloads/{task_id}_market_analysis.pdf",
                 "analysis": analysis_results,
                 "economic_calendar": calendar,
@@ -160,8 +263,6 @@ async def execute_market_analysis_task(task_id: str, params: TaskCreateRequest):
         
     except Exception as e:
         await ws_manager.send_error(task_id, str(e))
-    finally:
-        await ai_engine.close()
 
 
 async def execute_auto_trading_task(task_id: str, params: TaskCreateRequest):
@@ -171,8 +272,6 @@ async def execute_auto_trading_task(task_id: str, params: TaskCreateRequest):
     """
     
     try:
-        await ai_engine.initialize()
-        
         await ws_manager.send_task_progress(
             task_id=task_id,
             step="Initializing",
@@ -201,9 +300,7 @@ async def execute_auto_trading_task(task_id: str, params: TaskCreateRequest):
                 if pair not in rates:
                     continue
                 
-                # Simulate historical data
-                historical_prices = [rates[pair] * (1 + (j/1000 - 0.05)) 
-                                    for j in range(100)]
+                historical_prices = get_price_window(pair, rates)
                 
                 # Analyze and generate signal
                 market_condition = await ai_engine.analyze_market_conditions(
@@ -266,8 +363,6 @@ async def execute_auto_trading_task(task_id: str, params: TaskCreateRequest):
         
     except Exception as e:
         await ws_manager.send_error(task_id, str(e))
-    finally:
-        await ai_engine.close()
 
 
 async def execute_forecast_task(task_id: str, params: TaskCreateRequest):
@@ -277,8 +372,6 @@ async def execute_forecast_task(task_id: str, params: TaskCreateRequest):
     """
     
     try:
-        await ai_engine.initialize()
-        
         await ws_manager.send_task_progress(
             task_id=task_id,
             step="Collecting Data",
@@ -297,9 +390,7 @@ async def execute_forecast_task(task_id: str, params: TaskCreateRequest):
         )
         
         for pair in params.currency_pairs:
-            # Simulate historical prices
-            historical_prices = [rates.get(pair, 1.0) * (1 + (i/1000 - 0.05)) 
-                                for i in range(100)]
+            historical_prices = get_price_window(pair, rates)
             
             # Generate forecast
             forecast = await ai_engine.forecast_price_movement(
@@ -328,8 +419,6 @@ async def execute_forecast_task(task_id: str, params: TaskCreateRequest):
         
     except Exception as e:
         await ws_manager.send_error(task_id, str(e))
-    finally:
-        await ai_engine.close()
 
 
 # ============================================================================
@@ -453,9 +542,7 @@ async def resume_task(task_id: str):
 @router.get("/market/live-rates")
 async def get_live_rates():
     """Get current forex rates"""
-    await ai_engine.initialize()
     rates = await ai_engine.fetch_live_rates()
-    await ai_engine.close()
     
     return {
         "timestamp": datetime.now().isoformat(),
@@ -466,9 +553,7 @@ async def get_live_rates():
 @router.get("/market/economic-calendar")
 async def get_economic_calendar():
     """Get upcoming economic events"""
-    await ai_engine.initialize()
     calendar = await ai_engine.fetch_economic_calendar()
-    await ai_engine.close()
     
     return {
         "events": calendar
@@ -2,34 +2,72 @@
 Enhanced WebSocket Manager with Live Forex Data Integration
 """
 from fastapi import WebSocket, WebSocketDisconnect
-from typing import Dict, Set, Optional
+from typing import Dict, Iterable, Set, Optional
 import asyncio
-import uuid
-from datetime import datetime
+
+from .forex_delta import ForexDeltaTracker
+from .websocket_codec import JSON_ENCODING, Payload, encode, epoch_millis, next_message_id
+from .websocket_outbound import (
+    OutboundConnection,
+    OutboundStats,
+    OverflowPolicy,
+    DEFAULT_MAX_QUEUE,
+    DEFAULT_SEND_TIMEOUT,
+    DEFAULT_OVERFLOW_POLICY
+)
 
 
 class EnhancedWebSocketManager:
     """Manages WebSocket connections and broadcasts live forex updates"""
 
-    def __init__(self):
+    def __init__(
+        self,
+        max_queue: int = DEFAULT_MAX_QUEUE,
+        send_timeout: float = DEFAULT_SEND_TIMEOUT,
+        overflow_policy: OverflowPolicy = DEFAULT_OVERFLOW_POLICY
+    ):
         # Store active connections: {task_id: Set[WebSocket]}
         self.active_connections: Dict[str, Set[WebSocket]] = {}
+        # Reverse index: {WebSocket: Set[task_id]}
+        self.subscriptions: Dict[WebSocket, Set[str]] = {}
         # Store all connections for broadcasts
         self.all_connections: Set[WebSocket] = set()
+        # Per-socket outbound queue + writer task
+        self.outbound: Dict[WebSocket, OutboundConnection] = {}
+        # Negotiated encoding per socket (JSON unless a compact subprotocol was chosen)
+        self.encodings: Dict[WebSocket, str] = {}
         # Track streaming tasks
         self.streaming_tasks: Dict[str, asyncio.Task] = {}
+        # Clients that opted into snapshot + delta forex updates
+        self.delta_clients: Set[WebSocket] = set()
+        self.forex_delta = ForexDeltaTracker()
 
-    async def connect(self, websocket: WebSocket, task_id: str = "global"):
-        """Accept a new WebSocket connection"""
-        await websocket.accept()
+        self.max_queue = max_queue
+        self.send_timeout = send_timeout
+        self.overflow_policy = overflow_policy
+        self.laggards_disconnected = 0
+        # Counters from sockets that have already been released
+        self.released_stats = OutboundStats()
 
-        # Add to task-specific connections
-        if task_id not in self.active_connections:
-            self.active_connections[task_id] = set()
-        self.active_connections[task_id].add(websocket)
+    async def connect(self, websocket: WebSocket, task_id: str = "global", subprotocol: Optional[str] = None):
+        """Accept a new WebSocket connection, optionally with a compact encoding subprotocol"""
+        await websocket.accept(subprotocol=subprotocol)
 
-        # Add to all connections
-        self.all_connections.add(websocket)
+        self.subscribe(websocket, task_id)
+        if subprotocol:
+            self.encodings[websocket] = subprotocol
+
+        # Start this socket's writer
+        if websocket not in self.outbound:
+            connection = OutboundConnection(
+                websocket,
+                max_queue=self.max_queue,
+                send_timeout=self.send_timeout,
+                overflow_policy=self.overflow_policy,
+                on_failure=self._on_send_failure
+            )
+            self.outbound[websocket] = connection
+            connection.start()
 
         print(f"✅ WebSocket connected for task: {task_id}")
         print(f"📊 Total connections: {len(self.all_connections)}")
@@ -42,20 +80,59 @@ class EnhancedWebSocketManager:
             websocket=websocket
         )
 
-    def disconnect(self, websocket: WebSocket, task_id: str = "global"):
-        """Remove a WebSocket connection"""
-        # Remove from task-specific connections
-        if task_id in self.active_connections:
-            self.active_connections[task_id].discard(websocket)
-            if not self.active_connections[task_id]:
+    def subscribe(self, websocket: WebSocket, task_id: str):
+        """Add a task subscription for an already-accepted socket"""
+        if task_id not in self.active_connections:
+            self.active_connections[task_id] = set()
+        self.active_connections[task_id].add(websocket)
+
+        if websocket not in self.subscriptions:
+            self.subscriptions[websocket] = set()
+        self.subscriptions[websocket].add(task_id)
+
+        self.all_connections.add(websocket)
+
+    def unsubscribe(self, websocket: WebSocket, task_id: str):
+        """Remove one task subscription (the socket stays connected)"""
+        web_sockets = self.active_connections.get(task_id)
+        if web_sockets is not None:
+            web_sockets.discard(websocket)
+            if not web_sockets:
                 del self.active_connections[task_id]
 
-        # Remove from all connections
-        self.all_connections.discard(websocket)
+        task_ids = self.subscriptions.get(websocket)
+        if task_ids is not None:
+            task_ids.discard(task_id)
+
+    def disconnect(self, websocket: WebSocket, task_id: str = "global"):
+        """Remove a task subscription; the socket is released once it has none left"""
+        self.unsubscribe(websocket, task_id)
+        if not self.subscriptions.get(websocket):
+            self._release(websocket)
 
         print(f"❌ WebSocket disconnected for task: {task_id}")
         print(f"📊 Remaining connections: {len(self.all_connections)}")
 
+    def disconnect_all(self, websocket: WebSocket):
+        """Remove a socket from every task it is subscribed to - O(subscriptions)"""
+        for task_id in list(self.subscriptions.get(websocket, ())):
+            self.unsubscribe(websocket, task_id)
+        self._release(websocket)
+
+        print(f"❌ WebSocket disconnected from all tasks")
+        print(f"📊 Remaining connections: {len(self.all_connections)}")
+
+    def _release(self, websocket: WebSocket):
+        """Drop a socket's bookkeeping and stop its writer"""
+        self.subscriptions.pop(websocket, None)
+        self.all_connections.discard(websocket)
+        self.delta_clients.discard(websocket)
+        self.encodings.pop(websocket, None)
+        connection = self.outbound.pop(websocket, None)
+        if connection:
+            connection.stop()
+            self.released_stats.add(connection.stats)
+
     async def send_update(
         self,
         task_id: str,
@@ -66,60 +143,125 @@ class EnhancedWebSocketManager:
         websocket: Optional[WebSocket] = None
     ):
         """Send an update to specific task connections or single websocket"""
-        update = {
-            "id": str(uuid.uuid4()),
+        update = self._build_update(task_id, message, update_type, data)
+        update["progress"] = progress
+
+        if websocket:
+            self._deliver([websocket], update, envelope=True)
+        else:
+            self._deliver(self.active_connections.get(task_id, ()), update, envelope=True)
+
+    async def broadcast(
+        self,
+        message: str,
+        update_type: str = "info",
+        data: Optional[dict] = None,
+        coalesce_key: Optional[str] = None
+    ):
+        """
+        Broadcast a message to all connected clients
+        A queued broadcast with the same `coalesce_key` is replaced rather than
+        sent twice, so slow clients skip superseded snapshots.
+        """
+        update = self._build_update("broadcast", message, update_type, data)
+        self._deliver(self.all_connections, update, coalesce_key, envelope=True)
+
+    async def send_text(self, websocket: WebSocket, text: str):
+        """Queue raw text (e.g. heartbeat replies) behind the socket's pending updates"""
+        connection = self.outbound.get(websocket)
+        if connection and not connection.enqueue(text):
+            self._drop_laggard(websocket, "outbound queue full")
+
+    # ========================================================================
+    # Fan-out delivery
+    # ========================================================================
+
+    def _build_update(self, task_id: str, message: str, update_type: str, data: Optional[dict]) -> dict:
+        """Update envelope with a sequence id and epoch-millisecond timestamp"""
+        return {
+            "id": next_message_id(),
             "task_id": task_id,
             "message": message,
             "type": update_type,
-            "timestamp": datetime.now().isoformat(),
-            "progress": progress,
+            "timestamp": epoch_millis(),
             "data": data
         }
 
+    def _deliver(
+        self,
+        websockets: Iterable[WebSocket],
+        update: dict,
+        coalesce_key: Optional[str] = None,
+        envelope: bool = False
+    ):
+        """Encode once per negotiated encoding and enqueue on every socket without awaiting any client"""
+        if not websockets:
+            return
+
+        payloads: Dict[str, Optional[Payload]] = {}
+        laggards = []
+        for websocket in websockets:
+            connection = self.outbound.get(websocket)
+            if connection is None:
+                continue
+            encoding = self.encodings.get(websocket, JSON_ENCODING)
+            if encoding not in payloads:
+                payloads[encoding] = self._encode(update, encoding, envelope)
+            payload = payloads[encoding]
+            if payload is not None and not connection.enqueue(payload, coalesce_key):
+                laggards.append(websocket)
+
+        for websocket in laggards:
+            self._drop_laggard(websocket, "outbound queue full")
+
+    def _encode(self, update: dict, encoding: str, envelope: bool) -> Optional[Payload]:
         try:
-            if websocket:
-                await websocket.send_json(update)
-            elif task_id in self.active_connections:
-                # Use a copy to avoid issues if the set is modified during iteration
-                connections = list(self.active_connections[task_id])
-                for connection in connections:
-                    try:
-                        await connection.send_json(update)
-                    except Exception:
-                        self.disconnect(connection, task_id)
+            return encode(update, encoding, envelope)
         except Exception as e:
-            print(f"Error in send_update: {e}")
+            print(f"Error serializing update: {e}")
+            return None
 
-    async def broadcast(self, message: str, update_type: str = "info", data: Optional[dict] = None):
-        """Broadcast a message to all connected clients"""
-        update = {
-            "id": str(uuid.uuid4()),
-            "task_id": "broadcast",
-            "message": message,
-            "type": update_type,
-            "timestamp": datetime.now().isoformat(),
-            "data": data
-        }
+    def _drop_laggard(self, websocket: WebSocket, reason: str):
+        """Disconnect a client that can't keep up, then close its socket"""
+        self.laggards_disconnected += 1
+        print(f"🐢 Dropping slow WebSocket client: {reason}")
+        self.disconnect_all(websocket)
+        asyncio.create_task(self._close_quietly(websocket, code=1013))
 
-        # Use a copy to avoid issues if the set is modified during iteration
-        all_connections_copy = list(self.all_connections)
-        for connection in all_connections_copy:
-            try:
-                await connection.send_json(update)
-            except Exception:
-                # Find which task_id this dead connection belongs to
-                for task_id, web_sockets in self.active_connections.items():
-                    if connection in web_sockets:
-                        self.disconnect(connection, task_id)
-                        break
+    async def _on_send_failure(self, websocket: WebSocket, reason: str):
+        """Writer task callback: the socket errored or timed out"""
+        self.disconnect_all(websocket)
+        await self._close_quietly(websocket, code=1011)
+
+    async def _close_quietly(self, websocket: WebSocket, code: int = 1000):
+        try:
+            await websocket.close(code=code)
+        except Exception:
+            pass
 
     async def send_forex_update(self, forex_data: dict):
-        """Send forex market data to all connected clients"""
-        await self.broadcast(
-            message="Live forex market update received",
-            update_type="info",
-            data=forex_data
-        )
+        """
+        Send forex market data to all connected clients
+        Delta-mode clients get only the changed pairs; everyone else gets the
+        full snapshot as before.
+        """
+        delta = self.forex_delta.apply(forex_data)
+        if delta and self.delta_clients:
+            # Never coalesced: a lost delta shows up as a sequence gap instead
+            self._deliver(self.delta_clients, delta)
+
+        full_clients = self.all_connections - self.delta_clients if self.delta_clients else self.all_connections
+        update = self._build_update("broadcast", "Live forex market update received", "info", forex_data)
+        self._deliver(full_clients, update, coalesce_key="forex_update", envelope=True)
+
+    async def enable_forex_deltas(self, websocket: WebSocket):
+        """Switch a socket to the delta protocol, starting with a full snapshot"""
+        self.delta_clients.add(websocket)
+        await self.send_forex_snapshot(websocket)
+
+    async def send_forex_snapshot(self, websocket: WebSocket):
+        """Send the full forex state (on subscribe, or when a client detects a gap)"""
+        self._deliver([websocket], self.forex_delta.snapshot())
 
     async def send_task_progress(self, task_id: str, step: str, progress: float, message: str):
         """Send task progress update"""
@@ -149,6 +291,31 @@ class EnhancedWebSocketManager:
             update_type="error"
         )
 
+    def get_delivery_stats(self) -> Dict:
+        """Outbound queue depth, drop and coalescing statistics"""
+        totals = OutboundStats()
+        totals.add(self.released_stats)
+        depths = []
+        for connection in self.outbound.values():
+            totals.add(connection.stats)
+            depths.append(connection.qsize())
+        return {
+            "connections": len(self.all_connections),
+            "queued_messages": sum(depths),
+            "max_queue_depth": max(depths, default=0),
+            "queue_capacity": self.max_queue,
+            "overflow_policy": self.overflow_policy.value,
+            "messages_enqueued": totals.enqueued,
+            "messages_sent": totals.sent,
+            "messages_coalesced": totals.coalesced,
+            "messages_dropped": totals.dropped,
+            "laggards_disconnected": self.laggards_disconnected,
+        }
+
+    def get_subscriptions(self, websocket: WebSocket) -> Set[str]:
+        """Task ids a socket is subscribed to"""
+        return set(self.subscriptions.get(websocket, ()))
+
     def get_connection_count(self, task_id: Optional[str] = None) -> int:
         """Get number of active connections"""
         if task_id:
@@ -158,12 +325,25 @@ class EnhancedWebSocketManager:
     async def start_forex_stream(self, interval: int = 10):
         """Start streaming live forex data to all clients"""
         from .forex_data_service import forex_service
+        from .ai_forex_engine import ai_engine
+        from .price_history import price_history
+        from .services.market_data_bus import market_data_bus
 
         if "forex_stream" in self.streaming_tasks and not self.streaming_tasks["forex_stream"].done():
             print("Forex stream is already running.")
             return
 
+        last_rates: Dict[str, float] = {}
+
         async def stream_callback(forex_data):
+            nonlocal last_rates
+            rates = forex_data.get("rates") or {}
+            # The rate cache outlives the stream interval; a repeated snapshot is not a new bar
+            if rates != last_rates:
+                price_history.append_many(rates)
+                ai_engine.update_indicators(rates)
+                last_rates = dict(rates)
+            await market_data_bus.publish_rates(rates)
             await self.send_forex_update(forex_data)
 
         task = asyncio.create_task(forex_service.stream_live_data(stream_callback, interval))
@@ -6,24 +6,27 @@ import aiohttp
 from datetime import datetime
 from typing import Dict, List, Optional
 
+from .http_client import http_pool
+from .rate_cache import get_usd_rates
+
 
 class ForexDataService:
     """Service to fetch real-time forex data from multiple sources"""
 
     def __init__(self):
-        self.session: Optional[aiohttp.ClientSession] = None
         self.running = False
 
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """Shared pooled HTTP session (owned by the app lifespan)"""
+        return http_pool.session
+
     async def initialize(self):
         """Initialize the HTTP session"""
-        if not self.session or self.session.closed:
-            self.session = aiohttp.ClientSession()
+        await http_pool.start()
 
     async def close(self):
-        """Close the HTTP session"""
-        if self.session:
-            await self.session.close()
-            self.session = None
+        """Release service resources (the shared HTTP pool is closed on app shutdown)"""
 
     async def get_forex_factory_news(self) -> List[Dict]:
         """
@@ -63,35 +66,29 @@ class ForexDataService:
         Using exchangerate-api.com (free tier)
         """
         try:
-            # Free API - no key required for basic usage
-            url = "https://api.exchangerate-api.com/v4/latest/USD"
-
-            if not self.session:
-                await self.initialize()
-
-            async with self.session.get(url, timeout=10) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    rates = data.get("rates", {})
-                    return {
-                        "EUR/USD": 1 / rates.get("EUR", 1),
-                        "GBP/USD": 1 / rates.get("GBP", 1),
-                        "USD/JPY": rates.get("JPY"),
-                        "USD/CHF": rates.get("CHF"),
-                        "AUD/USD": 1 / rates.get("AUD", 1),
-                        "USD/CAD": rates.get("CAD"),
-                        "NZD/USD": 1 / rates.get("NZD", 1),
-                    }
+            # Free API - no key required for basic usage (shared TTL cache)
+            rates = await get_usd_rates()
+            return {
+                "EUR/USD": 1 / rates.get("EUR", 1),
+                "GBP/USD": 1 / rates.get("GBP", 1),
+                "USD/JPY": rates.get("JPY"),
+                "USD/CHF": rates.get("CHF"),
+                "AUD/USD": 1 / rates.get("AUD", 1),
+                "USD/CAD": rates.get("CAD"),
+                "NZD/USD": 1 / rates.get("NZD", 1),
+            }
         except Exception as e:
             print(f"Error fetching currency rates: {e}")
             return {}
 
-    async def get_market_sentiment(self) -> Dict[str, any]:
+    async def get_market_sentiment(self, rates: Optional[Dict[str, float]] = None) -> Dict[str, any]:
         """
         Get market sentiment analysis
+        Pass already-fetched `rates` to avoid a second lookup.
         """
         try:
-            rates = await self.get_currency_rates()
+            if rates is None:
+                rates = await self.get_currency_rates()
 
             return {
                 "timestamp": datetime.now().isoformat(),
@@ -120,7 +117,7 @@ class ForexDataService:
                 # Fetch all data types
                 rates = await self.get_currency_rates()
                 news = await self.get_forex_factory_news()
-                sentiment = await self.get_market_sentiment()
+                sentiment = await self.get_market_sentiment(rates)
 
                 # Prepare update package
                 update_data = {
@@ -141,7 +138,6 @@ class ForexDataService:
             print("Live data stream cancelled")
         finally:
             self.running = False
-            await self.close()
 
     def stop_streaming(self):
         """Stop the live data stream"""
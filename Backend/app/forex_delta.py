@@ -0,0 +1,88 @@
+"""
+Forex Delta Tracker
+Turns successive full forex snapshots into sequenced per-pair deltas for
+clients that opt into the delta protocol
+"""
+from typing import Dict, List, Optional
+
+
+# Fields stamped with "now" on every fetch, which would make each tick look changed
+VOLATILE_KEYS = ("timestamp", "time")
+
+
+def _content(value):
+    """Compare payloads (dicts or lists of dicts) without their volatile time fields"""
+    if isinstance(value, list):
+        return [_content(item) for item in value]
+    if isinstance(value, dict):
+        return {k: v for k, v in value.items() if k not in VOLATILE_KEYS}
+    return value
+
+
+def _sentiment(sentiment: Dict) -> Dict:
+    """Sentiment without `major_pairs`, which repeats the rates the delta already carries"""
+    return {k: v for k, v in sentiment.items() if k != "major_pairs"}
+
+
+class ForexDeltaTracker:
+    """
+    Holds the latest forex state and a sequence number
+
+    `apply()` returns the changes since the previous snapshot, tagged with the
+    next sequence number, or None when nothing changed (the sequence is not
+    advanced, so clients only see a gap when a delta was actually lost).
+    A client whose last applied `seq` is not `delta.seq - 1` must resync.
+    """
+
+    def __init__(self, epsilon: float = 0.0):
+        self.epsilon = epsilon
+        self.seq = 0
+        self.rates: Dict[str, float] = {}
+        self.news: List = []
+        self.sentiment: Dict = {}
+        self.timestamp: Optional[str] = None
+
+    def apply(self, forex_data: dict) -> Optional[Dict]:
+        """Record a full snapshot and return its delta against the previous one"""
+        rates = forex_data.get("rates") or {}
+        news = forex_data.get("news") or []
+        sentiment = _sentiment(forex_data.get("sentiment") or {})
+
+        changed = {}
+        for pair, price in rates.items():
+            previous = self.rates.get(pair)
+            if previous is None or price is None or abs(price - previous) > self.epsilon:
+                changed[pair] = price
+        removed = [pair for pair in self.rates if pair not in rates]
+
+        delta = {}
+        if changed:
+            delta["rates"] = changed
+        if removed:
+            delta["removed"] = removed
+        if _content(news) != _content(self.news):
+            delta["news"] = news
+        if _content(sentiment) != _content(self.sentiment):
+            delta["sentiment"] = sentiment
+
+        self.rates = dict(rates)
+        self.news = news
+        self.sentiment = sentiment
+        self.timestamp = forex_data.get("timestamp")
+
+        if not delta:
+            return None
+
+        self.seq += 1
+        return {"type": "forex_delta", "seq": self.seq, "timestamp": self.timestamp, **delta}
+
+    def snapshot(self) -> Dict:
+        """Full current state tagged with the current sequence number"""
+        return {
+            "type": "forex_snapshot",
+            "seq": self.seq,
+            "timestamp": self.timestamp,
+            "rates": self.rates,
+            "news": self.news,
+            "sentiment": self.sentiment,
+        }
@@ -0,0 +1,68 @@
+"""
+Shared HTTP Client Pool
+One app-lifespan-scoped aiohttp session with keep-alive, per-host limits
+and DNS caching, shared by the AI engine and the forex data service
+"""
+from typing import Optional
+import aiohttp
+
+
+class HTTPClientPool:
+    """
+    Owns the process-wide aiohttp session
+    Services borrow `session` per request and never close it themselves;
+    the app lifespan calls `start()` and `close()` exactly once.
+    """
+
+    def __init__(
+        self,
+        limit: int = 100,
+        limit_per_host: int = 20,
+        dns_cache_ttl: int = 300,
+        keepalive_timeout: float = 30.0,
+        request_timeout: float = 10.0
+    ):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.dns_cache_ttl = dns_cache_ttl
+        self.keepalive_timeout = keepalive_timeout
+        self.request_timeout = request_timeout
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    def _create_session(self) -> aiohttp.ClientSession:
+        connector = aiohttp.TCPConnector(
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            use_dns_cache=True,
+            ttl_dns_cache=self.dns_cache_ttl,
+            keepalive_timeout=self.keepalive_timeout
+        )
+        return aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.request_timeout)
+        )
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """The shared session, created on first use (must be called inside the event loop)"""
+        if self._session is None or self._session.closed:
+            self._session = self._create_session()
+        return self._session
+
+    @property
+    def is_open(self) -> bool:
+        return self._session is not None and not self._session.closed
+
+    async def start(self):
+        """Open the pool (idempotent)"""
+        _ = self.session
+
+    async def close(self):
+        """Close the pool and all pooled connections"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+
+# Global HTTP pool instance
+http_pool = HTTPClientPool()
@@ -0,0 +1,287 @@
+"""
+Incremental Technical Indicator Engine
+Rolling per-pair indicator state with O(1) tick updates,
+plus a vectorized batch mode for computing full series across many pairs
+"""
+from dataclasses import dataclass
+from typing import Dict, Optional, Sequence
+import numpy as np
+from scipy.signal import lfilter
+
+
+# ============================================================================
+# BATCH (VECTORIZED) INDICATOR SERIES
+# ============================================================================
+
+def _as_2d(prices) -> np.ndarray:
+    """Coerce a price series (or a stack of series) into a (pairs, bars) float array"""
+    array = np.asarray(prices, dtype=np.float64)
+    if array.ndim == 1:
+        array = array[np.newaxis, :]
+    return array
+
+
+def ema_series(prices, period: int) -> np.ndarray:
+    """
+    Exponential moving average along the last axis, seeded with the first price.
+    Accepts a 1-D series or a (pairs, bars) matrix and returns the same shape.
+    """
+    array = np.asarray(prices, dtype=np.float64)
+    if array.shape[-1] == 0:
+        return array.copy()
+
+    alpha = 2 / (period + 1)
+    zi = (1 - alpha) * array[..., :1]
+    ema, _ = lfilter([alpha], [1, -(1 - alpha)], array, axis=-1, zi=zi)
+    return ema
+
+
+def wilder_averages(prices, period: int = 14):
+    """
+    Wilder-smoothed average gain/loss per bar, shape (pairs, bars).
+    Bars before the first full period are NaN.
+    """
+    array = _as_2d(prices)
+    pairs, bars = array.shape
+    avg_gain = np.full((pairs, bars), np.nan)
+    avg_loss = np.full((pairs, bars), np.nan)
+    if bars < period + 1:
+        return avg_gain, avg_loss
+
+    deltas = np.diff(array, axis=1)
+    gains = np.where(deltas > 0, deltas, 0.0)
+    losses = np.where(deltas < 0, -deltas, 0.0)
+
+    # Simple average over the first `period` deltas seeds the smoothing
+    seed_gain = gains[:, :period].mean(axis=1, keepdims=True)
+    seed_loss = losses[:, :period].mean(axis=1, keepdims=True)
+
+    # avg[k] = avg[k-1] + (x[k] - avg[k-1]) / period
+    alpha = 1 / period
+    b, a = [alpha], [1, -(1 - alpha)]
+    rest_gain, _ = lfilter(b, a, gains[:, period:], axis=1, zi=(1 - alpha) * seed_gain)
+    rest_loss, _ = lfilter(b, a, losses[:, period:], axis=1, zi=(1 - alpha) * seed_loss)
+
+    avg_gain[:, period:] = np.concatenate([seed_gain, rest_gain], axis=1)
+    avg_loss[:, period:] = np.concatenate([seed_loss, rest_loss], axis=1)
+    return avg_gain, avg_loss
+
+
+def rsi_series(prices, period: int = 14) -> np.ndarray:
+    """Wilder RSI per bar, shape (pairs, bars). Neutral 50.0 until warmed up."""
+    avg_gain, avg_loss = wilder_averages(prices, period)
+    rsi = np.full(avg_gain.shape, 50.0)
+    ready = ~np.isnan(avg_gain)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rs = avg_gain / avg_loss
+        values = 100 - (100 / (1 + rs))
+    values = np.where(avg_loss == 0, 100.0, values)
+
+    rsi[ready] = values[ready]
+    return rsi
+
+
+def macd_series(prices, fast: int = 12, slow: int = 26, signal: int = 9) -> Dict[str, np.ndarray]:
+    """MACD line, signal line and histogram per bar, shape (pairs, bars)"""
+    array = _as_2d(prices)
+    macd_line = ema_series(array, fast) - ema_series(array, slow)
+    signal_line = ema_series(macd_line, signal)
+    return {
+        "macd": macd_line,
+        "signal": signal_line,
+        "histogram": macd_line - signal_line,
+    }
+
+
+# ============================================================================
+# INCREMENTAL (PER-TICK) INDICATOR STATE
+# ============================================================================
+
+@dataclass
+class IndicatorState:
+    """Rolling indicator state for a single currency pair"""
+    count: int = 0
+    last_price: float = 0.0
+    ema_fast: float = 0.0
+    ema_slow: float = 0.0
+    macd_signal: float = 0.0
+    # Wilder RSI: running sums during warm-up, smoothed averages afterwards
+    avg_gain: float = 0.0
+    avg_loss: float = 0.0
+
+
+class IndicatorEngine:
+    """
+    Keeps per-pair rolling indicator state
+    Each new tick updates EMA, MACD signal and Wilder RSI averages in O(1);
+    `compute_series` evaluates full indicator series for many pairs at once.
+    """
+
+    def __init__(
+        self,
+        rsi_period: int = 14,
+        macd_fast: int = 12,
+        macd_slow: int = 26,
+        macd_signal: int = 9
+    ):
+        self.rsi_period = rsi_period
+        self.macd_fast = macd_fast
+        self.macd_slow = macd_slow
+        self.macd_signal = macd_signal
+        self.states: Dict[str, IndicatorState] = {}
+
+        self._alpha_fast = 2 / (macd_fast + 1)
+        self._alpha_slow = 2 / (macd_slow + 1)
+        self._alpha_signal = 2 / (macd_signal + 1)
+
+    # ------------------------------------------------------------------------
+    # Tick updates
+    # ------------------------------------------------------------------------
+
+    def update(self, pair: str, price: float) -> IndicatorState:
+        """Fold one new price into the pair's rolling state"""
+        state = self.states.get(pair)
+        if state is None:
+            state = IndicatorState(
+                count=1,
+                last_price=price,
+                ema_fast=price,
+                ema_slow=price,
+            )
+            self.states[pair] = state
+            return state
+
+        delta = price - state.last_price
+        gain = delta if delta > 0 else 0.0
+        loss = -delta if delta < 0 else 0.0
+        n_deltas = state.count  # deltas seen after this update
+        period = self.rsi_period
+
+        if n_deltas < period:
+            state.avg_gain += gain
+            state.avg_loss += loss
+        elif n_deltas == period:
+            state.avg_gain = (state.avg_gain + gain) / period
+            state.avg_loss = (state.avg_loss + loss) / period
+        else:
+            state.avg_gain += (gain - state.avg_gain) / period
+            state.avg_loss += (loss - state.avg_loss) / period
+
+        state.ema_fast += self._alpha_fast * (price - state.ema_fast)
+        state.ema_slow += self._alpha_slow * (price - state.ema_slow)
+        macd_line = state.ema_fast - state.ema_slow
+        state.macd_signal += self._alpha_signal * (macd_line - state.macd_signal)
+
+        state.last_price = price
+        state.count += 1
+        return state
+
+    def update_many(self, prices: Dict[str, float]):
+        """Apply one tick for every pair in a rates snapshot"""
+        for pair, price in prices.items():
+            if price is not None:
+                self.update(pair, price)
+
+    def seed(self, pair: str, prices: Sequence[float]) -> Optional[IndicatorState]:
+        """Rebuild a pair's state from history using the vectorized path"""
+        array = np.asarray(prices, dtype=np.float64)
+        if array.size == 0:
+            self.states.pop(pair, None)
+            return None
+
+        ema_fast = ema_series(array, self.macd_fast)
+        ema_slow = ema_series(array, self.macd_slow)
+        signal = ema_series(ema_fast - ema_slow, self.macd_signal)
+
+        state = IndicatorState(
+            count=int(array.size),
+            last_price=float(array[-1]),
+            ema_fast=float(ema_fast[-1]),
+            ema_slow=float(ema_slow[-1]),
+            macd_signal=float(signal[-1]),
+        )
+
+        n_deltas = array.size - 1
+        if n_deltas >= self.rsi_period:
+            avg_gain, avg_loss = wilder_averages(array, self.rsi_period)
+            state.avg_gain = float(avg_gain[0, -1])
+            state.avg_loss = float(avg_loss[0, -1])
+        elif n_deltas > 0:
+            deltas = np.diff(array)
+            state.avg_gain = float(deltas[deltas > 0].sum())
+            state.avg_loss = float(-deltas[deltas < 0].sum())
+
+        self.states[pair] = state
+        return state
+
+    def reset(self, pair: Optional[str] = None):
+        """Drop rolling state for one pair (or all pairs)"""
+        if pair is None:
+            self.states.clear()
+        else:
+            self.states.pop(pair, None)
+
+    # ------------------------------------------------------------------------
+    # Current values
+    # ------------------------------------------------------------------------
+
+    def is_ready(self, pair: str, indicator: str) -> bool:
+        """Whether an indicator ("rsi" or any "macd*" value) has seen enough ticks to be real"""
+        state = self.states.get(pair)
+        if not state:
+            return False
+        if indicator == "rsi":
+            return state.count >= self.rsi_period + 1
+        return state.count >= self.macd_slow
+
+    def rsi(self, pair: str) -> float:
+        """Current Wilder RSI for a pair (50.0 until warmed up)"""
+        if not self.is_ready(pair, "rsi"):
+            return 50.0
+        state = self.states[pair]
+        if state.avg_loss == 0:
+            return 100.0
+        rs = state.avg_gain / state.avg_loss
+        return 100 - (100 / (1 + rs))
+
+    def macd(self, pair: str) -> Dict[str, float]:
+        """Current MACD values for a pair (zeros until the slow EMA is warmed up)"""
+        if not self.is_ready(pair, "macd"):
+            return {"macd": 0, "signal": 0, "histogram": 0}
+        state = self.states[pair]
+        macd_line = state.ema_fast - state.ema_slow
+        return {
+            "macd": macd_line,
+            "signal": state.macd_signal,
+            "histogram": macd_line - state.macd_signal,
+        }
+
+    def snapshot(self, pair: str) -> Dict:
+        """All current indicator values for a pair"""
+        state = self.states.get(pair)
+        return {
+            "pair": pair,
+            "ticks": state.count if state else 0,
+            "price": state.last_price if state else None,
+            "rsi": self.rsi(pair),
+            "macd": self.macd(pair),
+        }
+
+    # ------------------------------------------------------------------------
+    # Batch mode
+    # ------------------------------------------------------------------------
+
+    def compute_series(self, prices) -> Dict[str, np.ndarray]:
+        """
+        Full indicator series for a (pairs, bars) price matrix
+        Every returned array has shape (pairs, bars).
+        """
+        array = _as_2d(prices)
+        macd = macd_series(array, self.macd_fast, self.macd_slow, self.macd_signal)
+        return {
+            "rsi": rsi_series(array, self.rsi_period),
+            "macd": macd["macd"],
+            "signal": macd["signal"],
+            "histogram": macd["histogram"],
+        }
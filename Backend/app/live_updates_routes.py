@@ -27,7 +27,7 @@ async def websocket_endpoint(websocket: WebSocket, task_id: str):
     
     try:
         # Send initial connection confirmation
-        await websocket.send_json({
+        await manager.send_personal(websocket, {
             "id": str(uuid.uuid4()),
             "task_id": task_id,
             "message": "Connected to live updates",
@@ -43,7 +43,7 @@ async def websocket_endpoint(websocket: WebSocket, task_id: str):
             
             # Echo back to confirm connection is alive
             if data == "ping":
-                await websocket.send_text("pong")
+                await manager.send_text(websocket, "pong")
     
     except WebSocketDisconnect:
         manager.disconnect(websocket)
@@ -85,4 +85,10 @@ async def send_update(update: UpdateRequest):
 async def get_connection_count(task_id: str):
     """Get the number of active connections for a task"""
     count = manager.get_connection_count(task_id)
-    return {"task_id": task_id, "connections": count}
\ No newline at end of file
+    return {"task_id": task_id, "connections": count}
+
+
+@router.get("/delivery-stats")
+async def get_delivery_stats():
+    """Outbound queue, drop and coalescing statistics for live update clients"""
+    return manager.get_delivery_stats()
@@ -11,20 +11,28 @@ from .websocket_routes import router as websocket_router
 from .auth_routes import router as auth_router
 
 try:
-    from .ai_task_routes import router as ai_task_router
+    from .ai_task_routes import router as ai_task_router, shutdown_analysis_pool
     AI_ROUTES_AVAILABLE = True
 except ImportError:
     AI_ROUTES_AVAILABLE = False
     print("??  AI task routes not available")
 
 try:
-    from .advanced_features_routes import router as advanced_router
+    from .advanced_features_routes import (
+        router as advanced_router,
+        execution_svc,
+        notification_svc,
+        security_svc,
+        strategy_optimizer,
+    )
     ADVANCED_FEATURES_AVAILABLE = True
 except ImportError:
     ADVANCED_FEATURES_AVAILABLE = False
     print("??  Advanced features routes not available")
 
 from .enhanced_websocket_manager import ws_manager
+from .http_client import http_pool
+from .services.market_data_bus import market_data_bus
 
 
 @asynccontextmanager
@@ -39,11 +47,22 @@ async def lifespan(app: FastAPI):
     print(f"?? Advanced Features: {'ACTIVE' if ADVANCED_FEATURES_AVAILABLE else 'DISABLED'}")
     print("=" * 60)
     
+    await http_pool.start()
     await ws_manager.start_forex_stream(interval=10)
     
     yield
     
     ws_manager.stop_forex_stream()
+    market_data_bus.stop()
+    if AI_ROUTES_AVAILABLE:
+        shutdown_analysis_pool()
+    if ADVANCED_FEATURES_AVAILABLE:
+        security_svc.close()
+        strategy_optimizer.shutdown()
+        notification_svc.delivery.stop()
+        notification_svc.release_scheduler.stop()
+        execution_svc.scheduler.stop()
+    await http_pool.close()
     print("? Shutdown complete")
 
 
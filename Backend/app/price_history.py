@@ -0,0 +1,128 @@
+"""
+Shared Price History Store
+Fixed-capacity NumPy ring buffer per currency pair, fed by the forex stream
+"""
+from datetime import datetime
+from typing import Dict, Iterable, Optional
+import numpy as np
+
+
+class PriceRingBuffer:
+    """
+    Fixed-capacity price ring buffer with zero-copy window views
+
+    Every value is written twice (at `pos` and `pos + capacity`), so the most
+    recent `n` values are always one contiguous slice. A window view of size
+    `n` stays valid for `capacity - n` further appends.
+    """
+
+    def __init__(self, capacity: int = 1000):
+        if capacity < 1:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self._prices = np.zeros(2 * capacity, dtype=np.float64)
+        self._timestamps = np.zeros(2 * capacity, dtype=np.float64)
+        self._pos = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(self, price: float, timestamp: Optional[float] = None):
+        """Append one price (timestamp in epoch seconds, defaults to now)"""
+        ts = timestamp if timestamp is not None else datetime.now().timestamp()
+        pos = self._pos
+        self._prices[pos] = self._prices[pos + self.capacity] = price
+        self._timestamps[pos] = self._timestamps[pos + self.capacity] = ts
+        self._pos = (pos + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+
+    def extend(self, prices: Iterable[float], timestamps: Optional[Iterable[float]] = None):
+        """Append many prices in order"""
+        if timestamps is None:
+            for price in prices:
+                self.append(price)
+        else:
+            for price, ts in zip(prices, timestamps):
+                self.append(price, ts)
+
+    def _bounds(self, size: Optional[int]):
+        n = self._size if size is None else max(0, min(size, self._size))
+        end = self._pos + self.capacity
+        return end - n, end
+
+    def window(self, size: Optional[int] = None) -> np.ndarray:
+        """Read-only view of the latest `size` prices, oldest first (no copy)"""
+        start, end = self._bounds(size)
+        view = self._prices[start:end]
+        view.flags.writeable = False
+        return view
+
+    def timestamps(self, size: Optional[int] = None) -> np.ndarray:
+        """Read-only view of the timestamps matching `window(size)`"""
+        start, end = self._bounds(size)
+        view = self._timestamps[start:end]
+        view.flags.writeable = False
+        return view
+
+    def latest(self) -> Optional[float]:
+        """Most recent price, if any"""
+        if not self._size:
+            return None
+        return float(self._prices[self._pos + self.capacity - 1])
+
+
+class PriceHistoryStore:
+    """In-process price history shared by the forex stream and AI tasks"""
+
+    def __init__(self, capacity: int = 1000):
+        self.capacity = capacity
+        self.buffers: Dict[str, PriceRingBuffer] = {}
+
+    def _buffer(self, pair: str) -> PriceRingBuffer:
+        buffer = self.buffers.get(pair)
+        if buffer is None:
+            buffer = PriceRingBuffer(self.capacity)
+            self.buffers[pair] = buffer
+        return buffer
+
+    def append(self, pair: str, price: float, timestamp: Optional[float] = None):
+        """Record a new tick for a pair"""
+        self._buffer(pair).append(price, timestamp)
+
+    def append_many(self, rates: Dict[str, float], timestamp: Optional[float] = None):
+        """Record one tick for every pair in a rates snapshot"""
+        ts = timestamp if timestamp is not None else datetime.now().timestamp()
+        for pair, price in rates.items():
+            if price is not None:
+                self._buffer(pair).append(price, ts)
+
+    def window(self, pair: str, size: int) -> Optional[np.ndarray]:
+        """Zero-copy view of a pair's latest `size` prices, or None if unknown"""
+        buffer = self.buffers.get(pair)
+        if buffer is None or not len(buffer):
+            return None
+        return buffer.window(size)
+
+    def windows(self, pairs: Iterable[str], size: int) -> Dict[str, np.ndarray]:
+        """Window views for every known pair in `pairs`"""
+        views = {}
+        for pair in pairs:
+            view = self.window(pair, size)
+            if view is not None:
+                views[pair] = view
+        return views
+
+    def latest(self, pair: str) -> Optional[float]:
+        """Most recent price for a pair"""
+        buffer = self.buffers.get(pair)
+        return buffer.latest() if buffer else None
+
+    def size(self, pair: str) -> int:
+        """Number of stored prices for a pair"""
+        buffer = self.buffers.get(pair)
+        return len(buffer) if buffer else 0
+
+
+# Global price history instance
+price_history = PriceHistoryStore()
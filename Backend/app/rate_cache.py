@@ -0,0 +1,133 @@
+"""
+Exchange Rate Cache
+TTL cache with single-flight request coalescing and stale-while-revalidate,
+shared by every caller of the exchange-rate provider
+"""
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional
+import asyncio
+import os
+import time
+
+from .http_client import http_pool
+
+
+EXCHANGE_RATE_URL = "https://api.exchangerate-api.com/v4/latest/USD"
+
+
+@dataclass
+class CacheEntry:
+    """Cached upstream payload"""
+    value: Any
+    fetched_at: float  # time.monotonic()
+
+
+class RateCache:
+    """
+    Caches upstream responses by key
+    - Fresh (age < ttl): served from memory
+    - Stale (age < ttl + stale_ttl): served immediately, refreshed in the background
+    - Missing/expired: callers await one shared in-flight fetch
+    If the upstream fails, the last known value is served when there is one.
+    """
+
+    def __init__(self, ttl: float = 30.0, stale_ttl: float = 300.0):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._entries: Dict[str, CacheEntry] = {}
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+        # Statistics
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.upstream_calls = 0
+        self.upstream_errors = 0
+
+    async def get(self, key: str, fetcher: Callable[[], Awaitable[Any]]) -> Any:
+        """Return the cached value for `key`, fetching it with `fetcher` when needed"""
+        entry = self._entries.get(key)
+        if entry is not None:
+            age = time.monotonic() - entry.fetched_at
+            if age < self.ttl:
+                self.hits += 1
+                return entry.value
+            if age < self.ttl + self.stale_ttl:
+                self.stale_hits += 1
+                self._refresh(key, fetcher)
+                return entry.value
+
+        self.misses += 1
+        try:
+            # Shield so a cancelled caller doesn't cancel the fetch others are sharing
+            return await asyncio.shield(self._refresh(key, fetcher))
+        except Exception:
+            if entry is not None:
+                return entry.value
+            raise
+
+    def _refresh(self, key: str, fetcher: Callable[[], Awaitable[Any]]) -> asyncio.Task:
+        """Start a fetch for `key` unless one is already in flight"""
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._fetch(key, fetcher))
+            task.add_done_callback(self._on_fetch_done)
+            self._inflight[key] = task
+        return task
+
+    async def _fetch(self, key: str, fetcher: Callable[[], Awaitable[Any]]) -> Any:
+        self.upstream_calls += 1
+        try:
+            value = await fetcher()
+            self._entries[key] = CacheEntry(value=value, fetched_at=time.monotonic())
+            return value
+        finally:
+            self._inflight.pop(key, None)
+
+    def _on_fetch_done(self, task: asyncio.Task):
+        # Retrieve the exception so background refresh failures don't go unobserved
+        if task.cancelled():
+            return
+        error = task.exception()
+        if error is not None:
+            self.upstream_errors += 1
+            print(f"Rate cache refresh failed: {error}")
+
+    def invalidate(self, key: Optional[str] = None):
+        """Drop one cached key (or everything)"""
+        if key is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
+
+    def get_stats(self) -> Dict:
+        """Cache effectiveness counters"""
+        return {
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "upstream_calls": self.upstream_calls,
+            "upstream_errors": self.upstream_errors,
+            "keys": len(self._entries),
+            "ttl_seconds": self.ttl,
+            "stale_ttl_seconds": self.stale_ttl,
+        }
+
+
+# Global rate cache instance (TTLs configurable via environment)
+rate_cache = RateCache(
+    ttl=float(os.getenv("RATE_CACHE_TTL_SECONDS", "30")),
+    stale_ttl=float(os.getenv("RATE_CACHE_STALE_SECONDS", "300"))
+)
+
+
+async def _fetch_usd_rates() -> Dict[str, float]:
+    async with http_pool.session.get(EXCHANGE_RATE_URL) as response:
+        response.raise_for_status()
+        data = await response.json()
+        return data["rates"]
+
+
+async def get_usd_rates() -> Dict[str, float]:
+    """USD-based exchange rates from exchangerate-api.com, served through the shared cache"""
+    return await rate_cache.get(EXCHANGE_RATE_URL, _fetch_usd_rates)
@@ -0,0 +1,335 @@
+"""
+Audit Log Store
+Append-only SQLite store for compliance audit entries, partitioned by month
+with a (user_id, ts) index per partition. Appends are buffered and written in
+batches by a background task, so logging never waits on disk.
+"""
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Set
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+
+
+AUDIT_DB_PATH = os.getenv("AUDIT_DB_PATH", "audit_log.db")
+AUDIT_RETENTION_DAYS = int(os.getenv("AUDIT_RETENTION_DAYS", "400"))
+
+PARTITION_PREFIX = "audit_"
+COLUMNS = (
+    "log_id", "user_id", "action", "ts", "pair", "trade_id", "quantity", "price",
+    "api_key_id", "ip_address", "session_id", "success", "error_message", "metadata",
+)
+
+
+def _partition(ts: float) -> str:
+    """Monthly partition table holding a timestamp"""
+    return PARTITION_PREFIX + datetime.fromtimestamp(ts).strftime("%Y%m")
+
+
+def _partition_end(name: str) -> datetime:
+    """First instant after the partition's month"""
+    month = datetime.strptime(name[len(PARTITION_PREFIX):], "%Y%m")
+    return (month + timedelta(days=32)).replace(day=1)
+
+
+def _to_row(entry) -> tuple:
+    """Flatten an AuditLogEntry into column order"""
+    return (
+        entry.log_id, entry.user_id, entry.action.value, entry.timestamp.timestamp(),
+        entry.pair, entry.trade_id, entry.quantity, entry.price,
+        entry.api_key_id, entry.ip_address, entry.session_id,
+        int(entry.success), entry.error_message, json.dumps(entry.metadata or {}),
+    )
+
+
+def _to_dict(row: tuple) -> Dict:
+    record = dict(zip(COLUMNS, row))
+    record["timestamp"] = datetime.fromtimestamp(record.pop("ts"))
+    record["success"] = bool(record["success"])
+    record["metadata"] = json.loads(record["metadata"]) if record["metadata"] else {}
+    return record
+
+
+class _Range:
+    """Time range and action filter shared by the SQL and in-memory paths"""
+
+    def __init__(self, since: Optional[datetime], until: Optional[datetime], action: Optional[str]):
+        self.since = since.timestamp() if since else 0.0
+        self.until = until.timestamp() if until else None
+        self.action = action
+        clauses, params = ["ts >= ?"], [self.since]
+        if self.until is not None:
+            clauses.append("ts < ?")
+            params.append(self.until)
+        if action is not None:
+            clauses.append("action = ?")
+            params.append(action)
+        self.sql = " AND ".join(clauses)
+        self.params = tuple(params)
+
+    def matches(self, row: tuple) -> bool:
+        return (
+            row[3] >= self.since
+            and (self.until is None or row[3] < self.until)
+            and (self.action is None or row[2] == self.action)
+        )
+
+
+class AuditLogStore:
+    """
+    Batched, partitioned audit log
+
+    Entries wait in an in-memory buffer until the writer task flushes them
+    (every `flush_interval` seconds, or sooner once `batch_size` are queued).
+    Reads include buffered entries, so a logged action is visible at once.
+    Partitions older than the retention window are dropped whole.
+    """
+
+    def __init__(
+        self,
+        path: str = AUDIT_DB_PATH,
+        retention_days: int = AUDIT_RETENTION_DAYS,
+        batch_size: int = 500,
+        flush_interval: float = 1.0
+    ):
+        self.path = path
+        self.retention_days = retention_days
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()  # One connection, used from worker threads
+        self._partitions: Set[str] = set()
+        self._pending: List[tuple] = []
+        self._inflight: List[tuple] = []  # Batch being written right now
+        self._flushing = asyncio.Lock()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+        # Statistics
+        self.entries_written = 0
+        self.batches_written = 0
+        self.partitions_dropped = 0
+
+    # ========================================================================
+    # WRITES
+    # ========================================================================
+
+    def append(self, entry):
+        """Queue an entry for the next batch"""
+        self._pending.append(_to_row(entry))
+        if self._ensure_writer():
+            if len(self._pending) >= self.batch_size:
+                self._wakeup.set()
+        elif len(self._pending) >= self.batch_size:
+            self._flush_sync()  # No loop to hand the batch to
+
+    async def flush(self):
+        """Write everything queued so far"""
+        async with self._flushing:
+            if not self._pending:
+                return
+            # Readers look at `_pending` before `_inflight`, so the batch is never missed
+            batch = self._inflight = self._pending
+            self._pending = []
+            try:
+                await asyncio.to_thread(self._write, batch)
+            finally:
+                self._inflight = []
+
+    def _flush_sync(self):
+        batch, self._pending = self._pending, []
+        if batch:
+            self._write(batch)
+
+    def _write(self, batch: List[tuple]):
+        by_partition: Dict[str, List[tuple]] = {}
+        for row in batch:
+            by_partition.setdefault(_partition(row[3]), []).append(row)
+
+        placeholders = ", ".join("?" for _ in COLUMNS)
+        with self._lock:
+            conn = self._connection()
+            new_partition = False
+            with conn:
+                for name, rows in by_partition.items():
+                    if name not in self._partitions:
+                        self._create_partition(conn, name)
+                        new_partition = True
+                    conn.executemany(f"INSERT INTO {name} VALUES ({placeholders})", rows)
+            if self._inflight is batch:
+                self._inflight = []  # Committed; readers now find it on disk
+            if new_partition:
+                self._drop_expired(conn, datetime.now())
+        self.entries_written += len(batch)
+        self.batches_written += 1
+
+    def _ensure_writer(self) -> bool:
+        if self._task is not None and not self._task.done():
+            return True
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return False
+        self._wakeup = asyncio.Event()
+        self._task = loop.create_task(self._run())
+        return True
+
+    async def _run(self):
+        try:
+            while self._pending:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+                await self.flush()
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            print(f"Audit log flush failed: {e}")
+
+    # ========================================================================
+    # READS
+    # ========================================================================
+
+    async def query(
+        self,
+        user_id: str,
+        since: Optional[datetime] = None,
+        limit: Optional[int] = 50,
+        until: Optional[datetime] = None,
+        action: Optional[str] = None
+    ) -> List[Dict]:
+        """A user's entries in [since, until), newest first (`limit=None` for all)"""
+        rows = await asyncio.to_thread(self._select, user_id, _Range(since, until, action), limit)
+        return [_to_dict(row) for row in rows]
+
+    async def count(
+        self,
+        user_id: str,
+        since: Optional[datetime] = None,
+        action: Optional[str] = None,
+        until: Optional[datetime] = None
+    ) -> int:
+        """Number of a user's entries in [since, until) (optionally of one action)"""
+        return await asyncio.to_thread(self._count, user_id, _Range(since, until, action))
+
+    def _buffered(self, user_id: str, where: _Range) -> List[tuple]:
+        """Matching rows not yet committed (callers hold the lock)"""
+        pending = self._pending
+        inflight = self._inflight
+        rows = inflight if pending is inflight else inflight + pending
+        return [row for row in rows if row[1] == user_id and where.matches(row)]
+
+    def _partitions_in(self, where: _Range) -> List[str]:
+        """Partitions that can hold entries in the range, newest first"""
+        first = _partition(where.since) if where.since > 0 else ""
+        last = _partition(where.until) if where.until is not None else None
+        return sorted(
+            (p for p in self._partitions if p >= first and (last is None or p <= last)),
+            reverse=True
+        )
+
+    def _select(self, user_id: str, where: _Range, limit: Optional[int]) -> List[tuple]:
+        with self._lock:
+            conn = self._connection()
+            rows = self._buffered(user_id, where)
+            rows.sort(key=lambda row: row[3], reverse=True)
+            if limit is not None:
+                del rows[limit:]
+            for name in self._partitions_in(where):
+                remaining = -1 if limit is None else limit - len(rows)  # SQLite: -1 means no limit
+                if remaining == 0:
+                    break
+                rows.extend(conn.execute(
+                    f"SELECT * FROM {name} WHERE user_id = ? AND {where.sql} ORDER BY ts DESC LIMIT ?",
+                    (user_id, *where.params, remaining)
+                ))
+        return rows
+
+    def _count(self, user_id: str, where: _Range) -> int:
+        with self._lock:
+            conn = self._connection()
+            total = len(self._buffered(user_id, where))
+            for name in self._partitions_in(where):
+                total += conn.execute(
+                    f"SELECT COUNT(*) FROM {name} WHERE user_id = ? AND {where.sql}",
+                    (user_id, *where.params)
+                ).fetchone()[0]
+        return total
+
+    # ========================================================================
+    # PARTITIONS & RETENTION
+    # ========================================================================
+
+    def _connection(self) -> sqlite3.Connection:
+        """Open the database on first use (callers hold the lock)"""
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._partitions = {
+                name for (name,) in self._conn.execute(
+                    "SELECT name FROM sqlite_master WHERE type = 'table' AND name LIKE ?",
+                    (PARTITION_PREFIX + "%",)
+                )
+            }
+            self._drop_expired(self._conn, datetime.now())
+        return self._conn
+
+    def _create_partition(self, conn: sqlite3.Connection, name: str):
+        conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {name} ("
+            "log_id TEXT, user_id TEXT, action TEXT, ts REAL, pair TEXT, trade_id TEXT, "
+            "quantity REAL, price REAL, api_key_id TEXT, ip_address TEXT, session_id TEXT, "
+            "success INTEGER, error_message TEXT, metadata TEXT)"
+        )
+        conn.execute(f"CREATE INDEX IF NOT EXISTS ix_{name}_user_ts ON {name} (user_id, ts)")
+        self._partitions.add(name)
+
+    def _drop_expired(self, conn: sqlite3.Connection, now: datetime) -> int:
+        """Drop partitions whose whole month is past the retention window"""
+        cutoff = now - timedelta(days=self.retention_days)
+        expired = [name for name in self._partitions if _partition_end(name) <= cutoff]
+        for name in expired:
+            conn.execute(f"DROP TABLE IF EXISTS {name}")
+            self._partitions.discard(name)
+        if expired:
+            conn.commit()
+            self.partitions_dropped += len(expired)
+        return len(expired)
+
+    async def purge(self, now: Optional[datetime] = None) -> int:
+        """Apply retention now and return how many partitions were dropped"""
+        def drop():
+            with self._lock:
+                return self._drop_expired(self._connection(), now or datetime.now())
+        return await asyncio.to_thread(drop)
+
+    def close(self):
+        """Write any queued entries and close the database"""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        self._flush_sync()
+        with self._lock:  # Waits for a batch still being written by a worker thread
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def get_stats(self) -> Dict:
+        return {
+            "path": self.path,
+            "partitions": len(self._partitions),
+            "pending": len(self._pending) + len(self._inflight),
+            "entries_written": self.entries_written,
+            "batches_written": self.batches_written,
+            "partitions_dropped": self.partitions_dropped,
+            "retention_days": self.retention_days,
+        }
@@ -0,0 +1,308 @@
+"""
+Vectorized Backtesting Engine
+Replays historical OHLC bars through the ForexAIEngine signal rules and
+settles the resulting trades on a paper trading account, so backtests report
+the same statistics as live paper trading
+"""
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Sequence
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from ..indicator_engine import macd_series, rsi_series
+from .paper_trading_engine import PaperTrade, PaperTradingAccount, PaperTradingEngine
+
+
+SR_WINDOW = 50  # Bars used for support/resistance (identify_support_resistance)
+WARMUP_BARS = 50  # No signals until SMA-50 and S/R windows are full
+
+
+@dataclass
+class StrategyParams:
+    """Tunable thresholds of ForexAIEngine.generate_trading_signal (defaults match it)"""
+    rsi_oversold: float = 30.0
+    rsi_overbought: float = 70.0
+    confidence_threshold: float = 0.5
+    support_band: float = 0.01  # Price within 1% of support/resistance
+    take_profit_pct: float = 0.02  # 2% profit target
+
+
+@dataclass
+class OHLCData:
+    """Historical bars for one pair; timestamps are epoch seconds"""
+    close: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    timestamps: np.ndarray
+
+    @classmethod
+    def from_arrays(
+        cls,
+        close: Sequence[float],
+        high: Optional[Sequence[float]] = None,
+        low: Optional[Sequence[float]] = None,
+        timestamps: Optional[Sequence[float]] = None,
+        bar_seconds: int = 3600
+    ) -> "OHLCData":
+        """Build from plain sequences; missing highs/lows fall back to closes"""
+        close = np.asarray(close, dtype=np.float64)
+        high = close if high is None else np.asarray(high, dtype=np.float64)
+        low = close if low is None else np.asarray(low, dtype=np.float64)
+        if timestamps is None:
+            end = datetime.now().timestamp()
+            timestamps = end - bar_seconds * np.arange(len(close) - 1, -1, -1)
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+        if not (len(close) == len(high) == len(low) == len(timestamps)):
+            raise ValueError("close, high, low and timestamps must have the same length")
+        return cls(close=close, high=high, low=low, timestamps=timestamps)
+
+    def __len__(self) -> int:
+        return len(self.close)
+
+
+# ============================================================================
+# VECTORIZED FEATURES AND SIGNALS
+# ============================================================================
+
+def compute_features(close: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Per-bar inputs of the signal rules, computed once for the whole series
+    RSI/MACD run over the full history rather than being re-seeded on every
+    trailing window as the live analysis does, so early values differ slightly.
+    """
+    bars = len(close)
+    rsi = rsi_series(close)[0]
+    histogram = macd_series(close)["histogram"][0] if bars >= 26 else np.zeros(bars)
+
+    cumulative = np.concatenate(([0.0], np.cumsum(close)))
+    sma_20 = np.full(bars, np.nan)
+    sma_50 = np.full(bars, np.nan)
+    sma_20[19:] = (cumulative[20:] - cumulative[:-20]) / 20
+    sma_50[49:] = (cumulative[50:] - cumulative[:-50]) / 50
+
+    trend = np.zeros(bars, dtype=np.int8)
+    trend[(sma_20 > sma_50) & (close > sma_20)] = 1
+    trend[(sma_20 < sma_50) & (close < sma_20)] = -1
+
+    support = np.full(bars, np.nan)
+    resistance = np.full(bars, np.nan)
+    if bars >= SR_WINDOW:
+        windows = sliding_window_view(close, SR_WINDOW)
+        support[SR_WINDOW - 1:] = windows.min(axis=1)
+        resistance[SR_WINDOW - 1:] = windows.max(axis=1)
+
+    return {
+        "close": close,
+        "rsi": rsi,
+        "histogram": histogram,
+        "trend": trend,
+        "support": support,
+        "resistance": resistance,
+    }
+
+
+def _param_column(params: List[StrategyParams], name: str) -> np.ndarray:
+    return np.array([getattr(p, name) for p in params], dtype=np.float64)[:, np.newaxis]
+
+
+def generate_signals(features: Dict[str, np.ndarray], params: List[StrategyParams]) -> Dict[str, np.ndarray]:
+    """
+    generate_trading_signal evaluated on every bar for every parameter set
+    Returns (params, bars) arrays: action (+1 BUY, -1 SELL, 0 HOLD),
+    stop_loss and take_profit.
+    """
+    close = features["close"]
+    support, resistance = features["support"], features["resistance"]
+    rsi, histogram, trend = features["rsi"], features["histogram"], features["trend"]
+
+    rsi_buy = rsi < _param_column(params, "rsi_oversold")
+    rsi_sell = ~rsi_buy & (rsi > _param_column(params, "rsi_overbought"))
+    macd_buy, macd_sell = histogram > 0, histogram < 0
+    trend_buy, trend_sell = trend == 1, trend == -1
+
+    band = _param_column(params, "support_band")
+    sr_buy = close <= support * (1 + band)
+    sr_sell = ~sr_buy & (close >= resistance * (1 - band))
+
+    count = (rsi_buy.astype(np.int8) + rsi_sell + macd_buy + macd_sell
+             + trend_buy + trend_sell + sr_buy + sr_sell)
+    count = np.maximum(count, 1)
+    buy_confidence = (0.7 * rsi_buy + 0.6 * macd_buy + 0.8 * trend_buy + 0.9 * sr_buy) / count
+    sell_confidence = (0.7 * rsi_sell + 0.6 * macd_sell + 0.8 * trend_sell + 0.9 * sr_sell) / count
+
+    gate = _param_column(params, "confidence_threshold")
+    action = np.zeros(buy_confidence.shape, dtype=np.int8)
+    action[(buy_confidence > sell_confidence) & (buy_confidence > gate)] = 1
+    action[(sell_confidence > buy_confidence) & (sell_confidence > gate)] = -1
+    action[:, :WARMUP_BARS] = 0
+
+    take_profit_pct = _param_column(params, "take_profit_pct")
+    return {
+        "action": action,
+        "stop_loss": np.where(action == 1, support, resistance),
+        "take_profit": close * (1 + action * take_profit_pct),
+    }
+
+
+def _first_exit(
+    ohlc: OHLCData,
+    start: int,
+    side: int,
+    stop_loss: float,
+    take_profit: float,
+    chunk: int = 256
+):
+    """
+    First bar at or after `start` where the stop (checked first) or target is hit
+    Scans in growing chunks so short trades don't touch the rest of the series.
+    Returns (bar, exit_price, status) or None if neither level is reached.
+    """
+    bars = len(ohlc)
+    while start < bars:
+        end = min(bars, start + chunk)
+        high, low = ohlc.high[start:end], ohlc.low[start:end]
+        if side == 1:
+            stop_hit, target_hit = low <= stop_loss, high >= take_profit
+        else:
+            stop_hit, target_hit = high >= stop_loss, low <= take_profit
+        hit = stop_hit | target_hit
+        if hit.any():
+            offset = int(np.argmax(hit))
+            if stop_hit[offset]:
+                return start + offset, stop_loss, "stopped_out"
+            return start + offset, take_profit, "closed"
+        start, chunk = end, chunk * 2
+    return None
+
+
+# ============================================================================
+# BACKTEST ENGINE
+# ============================================================================
+
+class BacktestEngine:
+    """
+    Runs the AI signal rules over historical bars
+    Signals are computed for every bar (and every parameter set) in one
+    vectorized pass; the trade walk then jumps from entry to exit, holding at
+    most one position at a time. Entries fill at the signal bar's close,
+    exits at the stop/target level, and a position still open at the end
+    closes at the last close.
+    """
+
+    def __init__(self, paper_engine: Optional[PaperTradingEngine] = None):
+        self.paper_engine = paper_engine or PaperTradingEngine()
+
+    def run(
+        self,
+        pair: str,
+        ohlc: OHLCData,
+        params: Optional[StrategyParams] = None,
+        position_size: float = 1000.0,
+        starting_balance: float = 10000.0,
+        include_trades: bool = False
+    ) -> Dict:
+        """Backtest one parameter set"""
+        return self.run_grid(
+            pair, ohlc, [params or StrategyParams()],
+            position_size=position_size,
+            starting_balance=starting_balance,
+            include_trades=include_trades
+        )[0]
+
+    def run_grid(
+        self,
+        pair: str,
+        ohlc: OHLCData,
+        param_grid: List[StrategyParams],
+        position_size: float = 1000.0,
+        starting_balance: float = 10000.0,
+        include_trades: bool = False
+    ) -> List[Dict]:
+        """Backtest many parameter sets over the same bars (features computed once)"""
+        features = compute_features(ohlc.close)
+        signals = generate_signals(features, param_grid)
+
+        results = []
+        for row, params in enumerate(param_grid):
+            account = self._simulate(
+                pair, ohlc,
+                signals["action"][row], signals["stop_loss"][row], signals["take_profit"][row],
+                position_size, starting_balance
+            )
+            result = {
+                "success": True,
+                "pair": pair,
+                "bars": len(ohlc),
+                "params": asdict(params),
+                "summary": self.paper_engine.account_summary(account),
+            }
+            if include_trades:
+                result["trades"] = [
+                    {**record, "entry_time": record["entry_time"].isoformat(),
+                     "exit_time": record["exit_time"].isoformat()}
+                    for record in account.closed_trades.rows()
+                ]
+            results.append(result)
+        return results
+
+    def _simulate(
+        self,
+        pair: str,
+        ohlc: OHLCData,
+        action: np.ndarray,
+        stop_loss: np.ndarray,
+        take_profit: np.ndarray,
+        position_size: float,
+        starting_balance: float
+    ) -> PaperTradingAccount:
+        """Walk entries and exits, settling each trade on a fresh paper account"""
+        bars = len(ohlc)
+        start_time = datetime.fromtimestamp(ohlc.timestamps[0]) if bars else datetime.now()
+        account = PaperTradingAccount(
+            account_id=f"backtest_{pair}_{start_time.timestamp()}",
+            user_id="backtest",
+            starting_balance=starting_balance,
+            current_balance=starting_balance,
+            available_margin=starting_balance,
+            created_at=start_time
+        )
+
+        entries = np.flatnonzero(action)
+        position = 0
+        while position < len(entries):
+            entry = int(entries[position])
+            entry_price = float(ohlc.close[entry])
+            notional = position_size * entry_price
+            if notional > account.available_margin:
+                position += 1
+                continue
+
+            side = int(action[entry])
+            trade = PaperTrade(
+                trade_id=f"bt_{pair}_{entry}",
+                user_id=account.user_id,
+                pair=pair,
+                action="BUY" if side == 1 else "SELL",
+                entry_price=entry_price,
+                entry_time=datetime.fromtimestamp(ohlc.timestamps[entry]),
+                position_size=position_size,
+                stop_loss=float(stop_loss[entry]),
+                take_profit=float(take_profit[entry]),
+            )
+            account.available_margin -= notional
+
+            exit_ = _first_exit(ohlc, entry + 1, side, trade.stop_loss, trade.take_profit)
+            if exit_ is None:
+                exit_bar, exit_price, status = bars - 1, float(ohlc.close[-1]), "closed"
+            else:
+                exit_bar, exit_price, status = exit_
+            self.paper_engine.settle_trade(
+                account, trade, exit_price, status,
+                exit_time=datetime.fromtimestamp(ohlc.timestamps[exit_bar])
+            )
+
+            # Next entry must come after this trade's exit bar
+            position = int(np.searchsorted(entries, exit_bar, side="right"))
+
+        return account
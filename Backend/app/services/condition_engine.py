@@ -0,0 +1,297 @@
+"""
+Conditional Order Evaluation
+Order conditions are compiled once into predicate slots shared by every order
+that uses the same (pair, operand, operator, level), so a tick costs one
+vectorized comparison per distinct predicate rather than one per order condition
+"""
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Dict, Hashable, Iterable, List, Optional, Set, Tuple
+import numpy as np
+
+
+COMPARISONS = (">", "<", ">=", "<=", "==", "!=")
+CROSSES = "crosses"
+OPERATOR_CODES = {op: code for code, op in enumerate(COMPARISONS + (CROSSES,))}
+CROSSES_CODE = OPERATOR_CODES[CROSSES]
+
+PRICE = "price"
+INDICATOR_OPERANDS = ("rsi", "macd", "macd_signal", "macd_histogram")
+
+# Truth of each comparison by sign(operand - level) + 1 (below, at, above)
+_TRUTH = np.array([
+    [False, False, True],   # >
+    [True, False, False],   # <
+    [False, True, True],    # >=
+    [True, True, False],    # <=
+    [False, True, False],   # ==
+    [True, False, True],    # !=
+    [False, False, False],  # crosses (computed from the previous operand)
+], dtype=bool)
+
+_PY_COMPARE = {
+    ">": lambda a, b: a > b,
+    "<": lambda a, b: a < b,
+    ">=": lambda a, b: a >= b,
+    "<=": lambda a, b: a <= b,
+    "==": lambda a, b: a == b,
+    "!=": lambda a, b: a != b,
+}
+
+# Guard closures see the evaluation time and the current trading session value
+Guard = Callable[[datetime, str], bool]
+
+
+class PredicateTable:
+    """
+    Levels and operators for one (pair, operand), evaluated together
+    Each slot is one distinct (operator, level); `dependents` holds the
+    orders that reference it. Freed slots are reused.
+    """
+
+    def __init__(self, capacity: int = 8):
+        self.levels = np.zeros(capacity, dtype=np.float64)
+        self.ops = np.zeros(capacity, dtype=np.int8)
+        self.state = np.zeros(capacity, dtype=bool)
+        self.dependents: List[Set[Hashable]] = []
+        self.slots: Dict[Tuple[int, float], int] = {}
+        self.free: List[int] = []
+        self.previous: Optional[float] = None  # Operand at the last evaluation (for crosses)
+
+    def __len__(self) -> int:
+        return len(self.slots)
+
+    def acquire(self, op_code: int, level: float, order_id: Hashable) -> int:
+        key = (op_code, level)
+        slot = self.slots.get(key)
+        if slot is None:
+            if self.free:
+                slot = self.free.pop()
+            else:
+                slot = len(self.dependents)
+                self.dependents.append(set())
+                if slot == len(self.levels):
+                    self._grow()
+            self.slots[key] = slot
+            self.levels[slot] = level
+            self.ops[slot] = op_code
+            self.state[slot] = False
+        self.dependents[slot].add(order_id)
+        return slot
+
+    def release(self, slot: int, order_id: Hashable):
+        dependents = self.dependents[slot]
+        dependents.discard(order_id)
+        if not dependents:
+            del self.slots[(int(self.ops[slot]), float(self.levels[slot]))]
+            self.state[slot] = False
+            self.free.append(slot)
+
+    def _grow(self):
+        size = len(self.levels) * 2
+        for name in ("levels", "ops", "state"):
+            column = getattr(self, name)
+            grown = np.zeros(size, dtype=column.dtype)
+            grown[:len(column)] = column
+            setattr(self, name, grown)
+
+    def evaluate(self, operand: float) -> np.ndarray:
+        """Update every slot's truth for `operand` and return the slots that flipped"""
+        n = len(self.dependents)
+        levels, ops = self.levels[:n], self.ops[:n]
+        side = np.sign(operand - levels).astype(np.int8) + 1
+        result = _TRUTH[ops, side]
+
+        crosses = ops == CROSSES_CODE
+        if crosses.any():
+            if self.previous is None:
+                result[crosses] = False
+            else:
+                # Strictly on one side before, at or beyond the level now
+                before = np.sign(self.previous - levels)
+                crossed = ((before < 0) & (side >= 1)) | ((before > 0) & (side <= 1))
+                result[crosses] = crossed[crosses]
+        self.previous = operand
+
+        if self.free:
+            result[self.free] = False
+        flipped = np.flatnonzero(result != self.state[:n])
+        self.state[:n] = result
+        return flipped
+
+
+@dataclass(slots=True)
+class CompiledOrder:
+    """An order's predicate slots, guard closures and satisfied-slot count"""
+    pair: str
+    slots: List[Tuple[str, int]]  # (operand, slot)
+    guards: List[Guard]
+    required: int  # Satisfied slots needed (all for AND, one for OR)
+    satisfied: int = 0
+
+
+def compile_guard(condition, created_at: datetime) -> Guard:
+    """Closure for a context condition (session, or hours elapsed since `created_at`)"""
+    if condition.condition_type == "session":
+        if condition.operator not in ("==", "!="):
+            raise ValueError("Session conditions support == and != only")
+        wanted = str(condition.value).lower()
+        if condition.operator == "==":
+            return lambda now, session: session == wanted
+        return lambda now, session: session != wanted
+
+    compare = _PY_COMPARE.get(condition.operator)
+    if compare is None:
+        raise ValueError(f"Unsupported operator for time conditions: {condition.operator}")
+    hours = ConditionBook._level(condition)
+    return lambda now, session: compare((now - created_at).total_seconds() / 3600, hours)
+
+
+class ConditionBook:
+    """
+    Compiled conditions for every monitored order, grouped by pair and operand
+
+    Price and indicator conditions become slots in per-(pair, operand)
+    predicate tables; orders keep a count of satisfied slots that is only
+    touched when a slot flips. Session and time conditions compile to guard
+    closures that are checked only for orders whose predicates are satisfied.
+    """
+
+    def __init__(self):
+        self.tables: Dict[str, Dict[str, PredicateTable]] = {}
+        self.orders: Dict[Hashable, CompiledOrder] = {}
+        self.ready: Dict[str, Set[Hashable]] = {}  # {pair: orders whose predicate count is met}
+
+    def __len__(self) -> int:
+        return len(self.orders)
+
+    def __contains__(self, order_id: Hashable) -> bool:
+        return order_id in self.orders
+
+    def add(
+        self,
+        order_id: Hashable,
+        pair: str,
+        conditions: Iterable,
+        all_must_match: bool = True,
+        guards: Iterable[Guard] = (),
+        created_at: Optional[datetime] = None
+    ):
+        """
+        Compile and register an order's conditions (raises ValueError if unsupported)
+        Conditions need `condition_type`, `operator`, `value` and, for
+        indicator conditions, `indicator`.
+        """
+        predicates: List[Tuple[str, int, float]] = []
+        compiled_guards = list(guards)
+        for condition in conditions:
+            if condition.condition_type in ("session", "time"):
+                compiled_guards.append(compile_guard(condition, created_at or datetime.now()))
+                continue
+            predicates.append(
+                (self._operand(condition), self._operator_code(condition), self._level(condition))
+            )
+
+        slots = []
+        tables = self.tables.setdefault(pair, {})
+        for operand, op_code, level in dict.fromkeys(predicates):
+            table = tables.get(operand)
+            if table is None:
+                table = tables[operand] = PredicateTable()
+            slot = table.acquire(op_code, level, order_id)
+            slots.append((operand, slot))
+
+        order = CompiledOrder(
+            pair=pair,
+            slots=slots,
+            guards=compiled_guards,
+            required=len(slots) if all_must_match else min(1, len(slots)),
+        )
+        # Levels already known to hold count immediately (a cross is an event, not a state)
+        order.satisfied = sum(
+            1 for operand, slot in slots
+            if tables[operand].state[slot] and tables[operand].ops[slot] != CROSSES_CODE
+        )
+        self.orders[order_id] = order
+        if order.satisfied >= order.required:
+            self.ready.setdefault(pair, set()).add(order_id)
+
+    def remove(self, order_id: Hashable):
+        order = self.orders.pop(order_id, None)
+        if order is None:
+            return
+        ready = self.ready.get(order.pair)
+        if ready is not None:
+            ready.discard(order_id)
+            if not ready:
+                del self.ready[order.pair]
+        tables = self.tables.get(order.pair, {})
+        for operand, slot in order.slots:
+            table = tables[operand]
+            table.release(slot, order_id)
+            if not table:
+                del tables[operand]
+        if not tables:
+            self.tables.pop(order.pair, None)
+
+    def operands(self, pair: str) -> Iterable[str]:
+        """Operands that have predicates on `pair`"""
+        return self.tables.get(pair, {}).keys()
+
+    def evaluate(self, pair: str, values: Dict[str, float], now: datetime, session: str) -> List[Hashable]:
+        """
+        Evaluate the pair's predicates and return (and remove) the orders now satisfied
+        `values` maps operand names to their current value; missing operands
+        keep their previous truth.
+        """
+        ready = self.ready.setdefault(pair, set())
+        for operand, table in self.tables.get(pair, {}).items():
+            value = values.get(operand)
+            if value is None:
+                continue
+            for slot in table.evaluate(value):
+                delta = 1 if table.state[slot] else -1
+                for order_id in table.dependents[slot]:
+                    order = self.orders[order_id]
+                    order.satisfied += delta
+                    if order.satisfied >= order.required:
+                        ready.add(order_id)
+                    else:
+                        ready.discard(order_id)
+
+        triggered = [
+            order_id for order_id in ready
+            if all(guard(now, session) for guard in self.orders[order_id].guards)
+        ]
+        for order_id in triggered:
+            self.remove(order_id)
+        if not ready:
+            self.ready.pop(pair, None)
+        return triggered
+
+    @staticmethod
+    def _operand(condition) -> str:
+        if condition.condition_type == "price_level":
+            return PRICE
+        if condition.condition_type == "indicator_value":
+            indicator = (getattr(condition, "indicator", None) or "rsi").lower()
+            if indicator not in INDICATOR_OPERANDS:
+                raise ValueError(
+                    f"Unknown indicator '{indicator}' (expected one of: {', '.join(INDICATOR_OPERANDS)})"
+                )
+            return indicator
+        raise ValueError(f"Unsupported condition type: {condition.condition_type}")
+
+    @staticmethod
+    def _operator_code(condition) -> int:
+        code = OPERATOR_CODES.get(condition.operator)
+        if code is None:
+            raise ValueError(f"Unsupported operator: {condition.operator}")
+        return code
+
+    @staticmethod
+    def _level(condition) -> float:
+        try:
+            return float(condition.value)
+        except (TypeError, ValueError):
+            raise ValueError(f"Condition value must be numeric: {condition.value!r}")
@@ -2,13 +2,22 @@
 Enhanced Multi-Channel Notification System
 Sends smart, contextual notifications via multiple channels
 """
+from collections import deque
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from typing import Deque, Dict, List, Optional, Set
 from enum import Enum
 import asyncio
+import itertools
 import json
 
+from .notification_delivery import ChannelConfig, DeliveryWorkerPool
+from .order_scheduler import OrderScheduler
+
+
+NOTIFICATION_TTL = timedelta(days=7)
+RATE_LIMIT_WINDOW = timedelta(hours=1)
+
 
 class NotificationChannel(Enum):
     """Notification delivery channels"""
@@ -54,7 +63,7 @@ class NotificationPreference:
     digest_frequency: str = "daily"  # "daily", "weekly", "hourly"
 
 
-@dataclass
+@dataclass(slots=True)
 class Notification:
     """Single notification object"""
     notification_id: str
@@ -84,6 +93,20 @@ class Notification:
     expires_at: Optional[datetime] = None
 
 
+@dataclass
+class DeferredBatch:
+    """Notifications held back during one user's quiet hours, with running digest counts"""
+    user_id: str
+    release_at: datetime
+    notifications: List[Notification] = field(default_factory=list)
+    by_category: Dict[str, int] = field(default_factory=dict)
+
+    def add(self, notification: Notification):
+        self.notifications.append(notification)
+        cat = notification.category.value
+        self.by_category[cat] = self.by_category.get(cat, 0) + 1
+
+
 @dataclass
 class NotificationTemplate:
     """Reusable notification templates"""
@@ -96,6 +119,34 @@ class NotificationTemplate:
     priority: NotificationPriority = NotificationPriority.MEDIUM
 
 
+class SlidingWindowRateLimiter:
+    """Per-key send times over a trailing window (each deque holds at most `limit` entries)"""
+
+    def __init__(self, window: timedelta = RATE_LIMIT_WINDOW):
+        self.window = window
+        self._sent: Dict[str, Deque[datetime]] = {}
+
+    def count(self, key: str, now: Optional[datetime] = None) -> int:
+        sent = self._sent.get(key)
+        if not sent:
+            return 0
+        horizon = (now or datetime.now()) - self.window
+        while sent and sent[0] <= horizon:
+            sent.popleft()
+        if not sent:
+            del self._sent[key]
+            return 0
+        return len(sent)
+
+    def try_acquire(self, key: str, limit: int, now: Optional[datetime] = None) -> bool:
+        """Record a send unless `limit` sends already happened within the window"""
+        now = now or datetime.now()
+        if self.count(key, now) >= limit:
+            return False
+        self._sent.setdefault(key, deque()).append(now)
+        return True
+
+
 class EnhancedNotificationService:
     """
     Multi-channel notification system with smart delivery
@@ -103,10 +154,34 @@ class EnhancedNotificationService:
     
     def __init__(self):
         self.user_preferences: Dict[str, NotificationPreference] = {}
-        self.notifications: List[Notification] = []
-        self.notification_queue: asyncio.Queue = asyncio.Queue()
+        # Notifications by id, plus each user's notifications oldest first
+        self.notifications: Dict[str, Notification] = {}
+        self.user_notifications: Dict[str, Deque[Notification]] = {}
+        # Every notification in creation order; with a fixed TTL this is also expiry order
+        self._expiry_order: Deque[Notification] = deque()
+        self.rate_limiter = SlidingWindowRateLimiter()
+        self._notification_seq = itertools.count(1)  # Keeps ids unique within one timestamp
+        
+        # Quiet hours: each user's held-back batch, and the users released at each time.
+        # One timer per distinct release time flushes every user due then in a single pass.
+        self.deferred: Dict[str, DeferredBatch] = {}
+        self._release_groups: Dict[datetime, Set[str]] = {}
+        self.release_scheduler = OrderScheduler()
         self.templates: Dict[str, NotificationTemplate] = {}
         self._initialize_templates()
+        # Background delivery: per-channel queues, worker counts and batching
+        self.delivery = DeliveryWorkerPool({
+            NotificationChannel.PUSH: ChannelConfig(
+                self._send_push, concurrency=4, send_batch=self._send_push_batch, batch_size=500
+            ),
+            NotificationChannel.EMAIL: ChannelConfig(
+                self._send_email, concurrency=2, send_batch=self._send_email_batch, batch_size=100
+            ),
+            NotificationChannel.IN_APP: ChannelConfig(self._store_in_app, concurrency=1),
+            NotificationChannel.TELEGRAM: ChannelConfig(self._send_telegram, concurrency=2),
+            NotificationChannel.WHATSAPP: ChannelConfig(self._send_whatsapp, concurrency=2),
+            NotificationChannel.SMS: ChannelConfig(self._send_sms, concurrency=2),
+        })
         
         # Channel integrations (placeholders)
         self.firebase_configured = False
@@ -247,15 +322,13 @@ class EnhancedNotificationService:
         if cat in prefs.disabled_categories:
             return {"success": False, "reason": "Category disabled by user"}
         
-        # Check quiet hours
-        if self._is_quiet_hours(prefs):
-            if priority not in [NotificationPriority.CRITICAL.value, NotificationPriority.HIGH.value]:
-                # Queue for morning delivery
-                return {"success": False, "reason": "Queued for quiet hours"}
+        # Check quiet hours (urgent notifications still go out)
+        defer = self._is_quiet_hours(prefs) and priority not in [
+            NotificationPriority.CRITICAL.value, NotificationPriority.HIGH.value
+        ]
         
-        # Check rate limit
-        hour_count = self._count_notifications_this_hour(user_id)
-        if hour_count >= prefs.max_notifications_per_hour:
+        # Check rate limit (and count this send against it)
+        if not defer and not self.rate_limiter.try_acquire(user_id, prefs.max_notifications_per_hour):
             return {"success": False, "reason": "Rate limit exceeded"}
         
         # Render notification from template
@@ -263,7 +336,8 @@ class EnhancedNotificationService:
         message = self._render_template(template.message_template, template_vars)
         short_msg = self._render_template(template.short_message_template or message, template_vars) if template.short_message_template else message
         
-        notification_id = f"notif_{user_id}_{datetime.now().timestamp()}"
+        now = datetime.now()
+        notification_id = self._next_notification_id(user_id, now)
         
         notification = Notification(
             notification_id=notification_id,
@@ -272,20 +346,28 @@ class EnhancedNotificationService:
             message=message,
             category=cat,
             priority=NotificationPriority[priority.upper()],
-            timestamp=datetime.now(),
+            timestamp=now,
             short_message=short_msg,
             rich_data=template_vars,
             channels_to_send=prefs.enabled_channels,
-            expires_at=datetime.now() + timedelta(days=7)
+            expires_at=now + NOTIFICATION_TTL
         )
         
-        self.notifications.append(notification)
-        
-        # Queue for delivery
-        await self.notification_queue.put(notification)
+        self._store_notification(notification)
+        
+        if defer:
+            # Queue for delivery when the user's quiet hours end
+            release_at = self._defer_notification(notification, prefs)
+            return {
+                "success": True,
+                "queued": True,
+                "reason": "Queued for quiet hours",
+                "notification_id": notification_id,
+                "deliver_at": release_at.isoformat()
+            }
         
-        # Process delivery
-        await self._deliver_notification(notification)
+        # Hand off to the delivery workers; channels are sent in the background
+        self.delivery.submit(notification)
         
         return {
             "success": True,
@@ -341,27 +423,6 @@ class EnhancedNotificationService:
             **template_vars
         )
 
-    async def _deliver_notification(self, notification: Notification):
-        """Deliver notification across enabled channels"""
-        for channel in notification.channels_to_send:
-            try:
-                if channel == NotificationChannel.PUSH:
-                    await self._send_push(notification)
-                elif channel == NotificationChannel.EMAIL:
-                    await self._send_email(notification)
-                elif channel == NotificationChannel.IN_APP:
-                    await self._store_in_app(notification)
-                elif channel == NotificationChannel.TELEGRAM:
-                    await self._send_telegram(notification)
-                elif channel == NotificationChannel.WHATSAPP:
-                    await self._send_whatsapp(notification)
-                elif channel == NotificationChannel.SMS:
-                    await self._send_sms(notification)
-                
-                notification.delivery_status[channel] = "sent"
-            except Exception as e:
-                notification.delivery_status[channel] = f"failed: {str(e)}"
-
     async def _send_push(self, notification: Notification):
         """Send push notification (Firebase Cloud Messaging)"""
         if not self.firebase_configured:
@@ -372,6 +433,16 @@ class EnhancedNotificationService:
         # fcm_client.send_notification(notification.user_id, notification.title, notification.message)
         print(f"[PUSH] Sent to {notification.user_id}")
 
+    async def _send_push_batch(self, notifications: List[Notification]):
+        """Send many push notifications in one FCM multicast request"""
+        if not self.firebase_configured:
+            for notification in notifications:
+                print(f"[PUSH] {notification.title}: {notification.message}")
+            return
+        
+        # Production: fcm_client.send_each(messages) (up to 500 per call)
+        print(f"[PUSH] Sent batch of {len(notifications)}")
+
     async def _send_email(self, notification: Notification):
         """Send email notification"""
         if not self.email_configured:
@@ -382,6 +453,16 @@ class EnhancedNotificationService:
         # email_client.send(to_email, subject=notification.title, body=notification.message)
         print(f"[EMAIL] Sent to {notification.user_id}")
 
+    async def _send_email_batch(self, notifications: List[Notification]):
+        """Send many emails in one provider request"""
+        if not self.email_configured:
+            for notification in notifications:
+                print(f"[EMAIL] To: {notification.user_id} - {notification.title}")
+            return
+        
+        # Production: SendGrid personalizations / SES bulk send
+        print(f"[EMAIL] Sent batch of {len(notifications)}")
+
     async def _send_telegram(self, notification: Notification):
         """Send Telegram message"""
         message = f"*{notification.title}*\n\n{notification.message}"
@@ -401,12 +482,12 @@ class EnhancedNotificationService:
         # Already stored in self.notifications
         print(f"[IN_APP] Stored notification for {notification.user_id}")
 
-    def _is_quiet_hours(self, prefs: NotificationPreference) -> bool:
+    def _is_quiet_hours(self, prefs: NotificationPreference, at: Optional[datetime] = None) -> bool:
         """Check if currently in quiet hours"""
         if not prefs.quiet_hours_start or not prefs.quiet_hours_end:
             return False
         
-        now = datetime.now().time()
+        now = (at or datetime.now()).time()
         start = datetime.strptime(prefs.quiet_hours_start, "%H:%M").time()
         end = datetime.strptime(prefs.quiet_hours_end, "%H:%M").time()
         
@@ -415,13 +496,126 @@ class EnhancedNotificationService:
         else:
             return now >= start or now < end
 
+    def _quiet_hours_end(self, prefs: NotificationPreference, now: datetime) -> datetime:
+        """Next time the user's quiet hours end"""
+        end = datetime.strptime(prefs.quiet_hours_end, "%H:%M").time()
+        release_at = datetime.combine(now.date(), end)
+        return release_at if release_at > now else release_at + timedelta(days=1)
+
+    def _defer_notification(self, notification: Notification, prefs: NotificationPreference) -> datetime:
+        """Hold a notification until the user's quiet hours end and return the release time"""
+        batch = self.deferred.get(notification.user_id)
+        if batch is None:
+            release_at = self._quiet_hours_end(prefs, notification.timestamp)
+            batch = self.deferred[notification.user_id] = DeferredBatch(notification.user_id, release_at)
+            group = self._release_groups.get(release_at)
+            if group is None:
+                group = self._release_groups[release_at] = set()
+                self.release_scheduler.schedule(release_at, release_at, self._release_deferred)
+            group.add(notification.user_id)
+        
+        batch.add(notification)
+        for channel in notification.channels_to_send:
+            notification.delivery_status[channel] = "deferred"
+        return batch.release_at
+
+    async def _release_deferred(self, release_at: datetime) -> int:
+        """
+        Deliver every batch due at `release_at`
+
+        Released notifications count against the user's hourly limit: digest-mode
+        users get one digest, everyone else gets notifications one by one until
+        the limit is reached and a digest of the rest.
+        """
+        released = 0
+        for user_id in self._release_groups.pop(release_at, ()):
+            batch = self.deferred.pop(user_id, None)
+            if batch is None:
+                continue
+            prefs = self.user_preferences.get(user_id)
+            if prefs is None:
+                for notification in batch.notifications:
+                    self.delivery.submit(notification)
+            elif prefs.digest_mode and len(batch.notifications) > 1:
+                self._submit_digest(batch, prefs)
+            else:
+                overflow = DeferredBatch(user_id=user_id, release_at=release_at)
+                for notification in batch.notifications:
+                    if not overflow.notifications and self.rate_limiter.try_acquire(
+                        user_id, prefs.max_notifications_per_hour
+                    ):
+                        self.delivery.submit(notification)
+                    else:
+                        overflow.add(notification)
+                if overflow.notifications:
+                    self._submit_digest(overflow, prefs)
+            released += len(batch.notifications)
+        return released
+
+    def _submit_digest(self, batch: DeferredBatch, prefs: NotificationPreference):
+        """Send one digest in place of a batch (always sent, but counted against the limit)"""
+        digest = self._digest_notification(batch, prefs)
+        self.rate_limiter.try_acquire(batch.user_id, prefs.max_notifications_per_hour)
+        self._store_notification(digest)
+        self.delivery.submit(digest)
+        for notification in batch.notifications:
+            for channel in notification.channels_to_send:
+                notification.delivery_status[channel] = f"digested: {digest.notification_id}"
+
+    def _digest_notification(self, batch: DeferredBatch, prefs: NotificationPreference) -> Notification:
+        """One notification summarising a deferred batch from its running counts"""
+        now = datetime.now()
+        summary = ", ".join(
+            f"{count} {cat.replace('_', ' ')}" for cat, count in sorted(batch.by_category.items())
+        )
+        return Notification(
+            notification_id=self._next_notification_id(batch.user_id, now),
+            user_id=batch.user_id,
+            title=f"While you were away: {len(batch.notifications)} notifications",
+            message=summary,
+            category=NotificationCategory.SYSTEM_UPDATE,
+            priority=NotificationPriority.LOW,
+            timestamp=now,
+            short_message=summary,
+            rich_data={
+                "summary": dict(batch.by_category),
+                "notification_ids": [n.notification_id for n in batch.notifications],
+            },
+            channels_to_send=prefs.enabled_channels,
+            expires_at=now + NOTIFICATION_TTL
+        )
+
+    def _next_notification_id(self, user_id: str, now: datetime) -> str:
+        return f"notif_{user_id}_{now.timestamp()}_{next(self._notification_seq)}"
+
     def _count_notifications_this_hour(self, user_id: str) -> int:
         """Count notifications sent this hour"""
-        now = datetime.now()
-        hour_ago = now - timedelta(hours=1)
-        
-        return len([n for n in self.notifications 
-                   if n.user_id == user_id and hour_ago < n.timestamp < now])
+        return self.rate_limiter.count(user_id)
+
+    def _store_notification(self, notification: Notification):
+        """Index a new notification (evicting expired ones first)"""
+        self._evict_expired(notification.timestamp)
+        self.notifications[notification.notification_id] = notification
+        self.user_notifications.setdefault(notification.user_id, deque()).append(notification)
+        self._expiry_order.append(notification)
+
+    def _evict_expired(self, now: Optional[datetime] = None):
+        """Drop notifications past `expires_at` from every index"""
+        now = now or datetime.now()
+        expiring = self._expiry_order
+        while expiring and expiring[0].expires_at and expiring[0].expires_at <= now:
+            notif = expiring.popleft()
+            self.notifications.pop(notif.notification_id, None)
+            user_notifs = self.user_notifications.get(notif.user_id)
+            if user_notifs and user_notifs[0] is notif:
+                user_notifs.popleft()
+                if not user_notifs:
+                    del self.user_notifications[notif.user_id]
+
+    def _recent_notifications(self, user_id: str):
+        """A user's live notifications, newest first"""
+        self._evict_expired()
+        return reversed(self.user_notifications.get(user_id, ()))
 
     def _render_template(self, template: str, variables: Dict) -> str:
         """Render template with variables"""
@@ -432,12 +626,12 @@ class EnhancedNotificationService:
 
     async def get_notifications(self, user_id: str, unread_only: bool = False, limit: int = 20) -> List[Dict]:
         """Get notifications for user"""
-        notifications = [n for n in self.notifications if n.user_id == user_id]
-        
-        if unread_only:
-            notifications = [n for n in notifications if not n.read]
-        
-        notifications = sorted(notifications, key=lambda x: x.timestamp, reverse=True)[:limit]
+        notifications = []
+        for n in self._recent_notifications(user_id):
+            if len(notifications) >= limit:
+                break
+            if not (unread_only and n.read):
+                notifications.append(n)
         
         return [
             {
@@ -455,7 +649,8 @@ class EnhancedNotificationService:
 
     async def mark_as_read(self, notification_id: str) -> Dict:
         """Mark notification as read"""
-        notif = next((n for n in self.notifications if n.notification_id == notification_id), None)
+        self._evict_expired()
+        notif = self.notifications.get(notification_id)
         if notif:
             notif.read = True
             notif.read_at = datetime.now()
@@ -495,11 +690,14 @@ class EnhancedNotificationService:
         
         cutoff = datetime.now() - timedelta(days=1 if period == "daily" else 7)
         
-        user_notifs = [n for n in self.notifications 
-                      if n.user_id == user_id and n.timestamp > cutoff]
+        user_notifs = []
+        for notif in self._recent_notifications(user_id):
+            if notif.timestamp <= cutoff:
+                break
+            user_notifs.append(notif)
         
         grouped = {}
-        for notif in user_notifs:
+        for notif in reversed(user_notifs):  # Oldest first within each category
             cat = notif.category.value
             if cat not in grouped:
                 grouped[cat] = []
@@ -509,11 +707,17 @@ class EnhancedNotificationService:
                 "timestamp": notif.timestamp.isoformat()
             })
         
+        batch = self.deferred.get(user_id)
+        
         return {
             "period": period,
             "generated_at": datetime.now().isoformat(),
             "summary": {
                 cat: len(notifs) for cat, notifs in grouped.items()
             },
-            "by_category": grouped
+            "by_category": grouped,
+            "deferred": {
+                "release_at": batch.release_at.isoformat(),
+                "summary": dict(batch.by_category),
+            } if batch else None
         }
@@ -7,6 +7,11 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Callable
 from enum import Enum
 import asyncio
+import itertools
+
+from .condition_engine import ConditionBook, INDICATOR_OPERANDS, PRICE
+from .market_data_bus import MarketDataBus, Tick, market_data_bus
+from .order_scheduler import OrderScheduler
 
 
 class TradingSession(Enum):
@@ -17,6 +22,10 @@ class TradingSession(Enum):
     OFF_HOURS = "off_hours"
 
 
+SESSION_CHANGE_HOURS_UTC = (8, 16, 22)  # Where _get_current_session changes value
+SESSION_CHANGE_TIMER = "session_change"
+
+
 class OrderType(Enum):
     """Types of conditional orders"""
     MARKET = "market"
@@ -43,9 +52,10 @@ class Condition:
     operator: str  # "==", ">", "<", ">=", "<=", "!=", "crosses"
     value: float
     description: str
+    indicator: Optional[str] = None  # For indicator_value: "rsi", "macd", "macd_signal", "macd_histogram"
 
 
-@dataclass
+@dataclass(slots=True)
 class ConditionalOrder:
     """Order with multiple execution conditions"""
     order_id: str
@@ -80,16 +90,91 @@ class SessionStatistics:
     peak_activity_hours: List[int]
 
 
+class OrderRegistry:
+    """
+    Conditional orders indexed by id, user and status
+
+    Per-user ids are kept in creation order and per-user history in the order
+    orders left PENDING. Status transitions move an order between indexes in O(1).
+    """
+
+    def __init__(self):
+        self.orders: Dict[str, ConditionalOrder] = {}
+        # Dicts used as insertion-ordered sets of order ids
+        self.by_user: Dict[str, Dict[str, None]] = {}
+        self.by_status: Dict[OrderStatus, Dict[str, None]] = {status: {} for status in OrderStatus}
+        self.history_by_user: Dict[str, Dict[str, None]] = {}
+
+    def __len__(self) -> int:
+        return len(self.orders)
+
+    def __contains__(self, order_id: str) -> bool:
+        return order_id in self.orders
+
+    def add(self, order: ConditionalOrder):
+        self.orders[order.order_id] = order
+        self.by_user.setdefault(order.user_id, {})[order.order_id] = None
+        self.by_status[order.status][order.order_id] = None
+        if order.status != OrderStatus.PENDING:
+            self.history_by_user.setdefault(order.user_id, {})[order.order_id] = None
+
+    def get(self, order_id: str) -> Optional[ConditionalOrder]:
+        return self.orders.get(order_id)
+
+    def transition(self, order: ConditionalOrder, status: OrderStatus):
+        """Set an order's status, moving it into its user's history when it leaves PENDING"""
+        if order.status == status:
+            return
+        self.by_status[order.status].pop(order.order_id, None)
+        self.by_status[status][order.order_id] = None
+        if order.status == OrderStatus.PENDING:
+            self.history_by_user.setdefault(order.user_id, {})[order.order_id] = None
+        order.status = status
+
+    def user_orders(self, user_id: str, status: Optional[OrderStatus] = None) -> List[ConditionalOrder]:
+        """A user's orders in creation order, optionally with one status"""
+        ids = self.by_user.get(user_id, {})
+        orders = (self.orders[order_id] for order_id in ids)
+        if status is None:
+            return list(orders)
+        return [order for order in orders if order.status == status]
+
+    def history(self, user_id: str, limit: int = 20) -> List[ConditionalOrder]:
+        """The user's `limit` most recently finished orders, oldest first"""
+        ids = self.history_by_user.get(user_id, {})
+        recent = []
+        for order_id in reversed(ids):
+            if len(recent) == limit:
+                break
+            recent.append(self.orders[order_id])
+        recent.reverse()
+        return recent
+
+    def count(self, status: Optional[OrderStatus] = None) -> int:
+        return len(self.orders) if status is None else len(self.by_status[status])
+
+
 class ExecutionIntelligenceService:
     """
     Handles conditional automation and intelligent order execution
     """
     
-    def __init__(self):
-        self.pending_orders: Dict[str, List[ConditionalOrder]] = {}
-        self.order_history: List[ConditionalOrder] = []
+    def __init__(self, tick_bus: Optional[MarketDataBus] = None, indicators=None):
+        self.orders = OrderRegistry()
+        self._order_seq = itertools.count(1)  # Keeps ids unique within one timestamp
         self.session_stats = self._initialize_session_stats()
-        self.monitoring_tasks: Dict[str, asyncio.Task] = {}
+        # Orders waiting on ticks: {pair: {order_id: order}}, one bus subscription per pair
+        self.tick_bus = tick_bus or market_data_bus
+        self.monitored_orders: Dict[str, Dict[str, ConditionalOrder]] = {}
+        self.pair_subscriptions: Dict[str, int] = {}
+        # Compiled conditions of monitored orders
+        self.conditions = ConditionBook()
+        # Expiry deadlines and session-change wakeups for every order, one runner task
+        self.scheduler = OrderScheduler()
+        if indicators is None:
+            from ..ai_forex_engine import ai_engine
+            indicators = ai_engine.indicators  # Live per-pair RSI/MACD fed by the forex stream
+        self.indicators = indicators
 
     def _initialize_session_stats(self) -> Dict[TradingSession, SessionStatistics]:
         """Initialize known session statistics"""
@@ -138,6 +223,117 @@ class ExecutionIntelligenceService:
         Create a conditional order
         Example: "Sell USD at 289 PKR only if RSI < 70 and trend is bearish"
         """
+        try:
+            order = self._build_order(
+                user_id, pair, action, conditions, position_size, stop_loss,
+                take_profit, max_hours, session_filter, order_type, notes
+            )
+        except ValueError as e:
+            return {"success": False, "error": str(e)}
+        
+        # Compile conditions and evaluate them on the pair's ticks
+        error = self._monitor_orders([order]).get(order.order_id)
+        if error:
+            return {"success": False, "error": error}
+        
+        # Store order
+        self.orders.add(order)
+        
+        return {
+            "success": True,
+            "order_id": order.order_id,
+            "message": f"Conditional order created with {len(order.conditions)} conditions",
+            "details": self._order_details(order)
+        }
+
+    async def create_conditional_orders(
+        self,
+        user_id: str,
+        orders: List[Dict],
+        risk_manager=None
+    ) -> Dict:
+        """
+        Create many conditional orders in one pass
+        Each dict takes the keyword arguments of `create_conditional_order`.
+        With a `risk_manager`, orders are validated together through
+        `validate_trades` (entry estimated from the pair's last tick). Invalid
+        orders are rejected individually; the rest are registered together.
+        """
+        built, rejected = [], []
+        for index, spec in enumerate(orders):
+            try:
+                built.append((index, self._build_order(
+                    user_id,
+                    spec.get("pair"),
+                    spec.get("action"),
+                    spec.get("conditions") or [],
+                    spec.get("position_size", 0),
+                    spec.get("stop_loss"),
+                    spec.get("take_profit"),
+                    spec.get("max_hours", 12),
+                    spec.get("session_filter"),
+                    spec.get("order_type", "market"),
+                    spec.get("notes") or ""
+                )))
+            except ValueError as e:
+                rejected.append({"index": index, "error": str(e)})
+        
+        if risk_manager is not None and built:
+            checks = await risk_manager.validate_trades(user_id, [
+                {
+                    "pair": order.pair,
+                    "action": order.action,
+                    "position_size": order.position_size,
+                    "stop_loss": order.stop_loss,
+                    "take_profit": order.take_profit,
+                    "entry_price": self.tick_bus.last_price(order.pair),
+                }
+                for _, order in built
+            ])
+            passed = []
+            for (index, order), (is_valid, reason) in zip(built, checks):
+                if is_valid:
+                    passed.append((index, order))
+                else:
+                    rejected.append({"index": index, "error": reason, "risk_check_failed": True})
+            built = passed
+        
+        errors = self._monitor_orders([order for _, order in built])
+        created = []
+        for index, order in built:
+            error = errors.get(order.order_id)
+            if error:
+                rejected.append({"index": index, "error": error})
+                continue
+            self.orders.add(order)
+            created.append({"index": index, "order_id": order.order_id, "details": self._order_details(order)})
+        
+        rejected.sort(key=lambda r: r["index"])
+        return {
+            "success": not rejected,
+            "created_count": len(created),
+            "rejected_count": len(rejected),
+            "created": created,
+            "rejected": rejected,
+        }
+
+    def _build_order(
+        self,
+        user_id: str,
+        pair: str,
+        action: str,
+        conditions: List[Dict],
+        position_size: float,
+        stop_loss: Optional[float],
+        take_profit: Optional[float],
+        max_hours: int,
+        session_filter: Optional[str],
+        order_type: str,
+        notes: str
+    ) -> ConditionalOrder:
+        """Parse request fields into a ConditionalOrder (raises ValueError)"""
+        if not pair or not action:
+            raise ValueError("pair and action are required")
         
         # Parse conditions
         parsed_conditions = []
@@ -146,11 +342,12 @@ class ExecutionIntelligenceService:
                 condition_type=cond.get("type"),
                 operator=cond.get("operator"),
                 value=cond.get("value"),
-                description=cond.get("description", "")
+                description=cond.get("description", ""),
+                indicator=cond.get("indicator")
             ))
         
         # Create order
-        order_id = f"order_{user_id}_{datetime.now().timestamp()}"
+        order_id = f"order_{user_id}_{datetime.now().timestamp()}_{next(self._order_seq)}"
         max_exec_time = datetime.now() + timedelta(hours=max_hours) if max_hours else None
         
         session = None
@@ -160,7 +357,12 @@ class ExecutionIntelligenceService:
             except KeyError:
                 pass
         
-        order = ConditionalOrder(
+        try:
+            parsed_type = OrderType[order_type.upper()] if order_type else OrderType.MARKET
+        except KeyError:
+            raise ValueError(f"Unknown order type: {order_type}")
+        
+        return ConditionalOrder(
             order_id=order_id,
             user_id=user_id,
             pair=pair,
@@ -171,63 +373,134 @@ class ExecutionIntelligenceService:
             take_profit=take_profit,
             max_execution_time=max_exec_time,
             session_filter=session,
-            order_type=OrderType[order_type.upper()] if order_type else OrderType.MARKET,
+            order_type=parsed_type,
             notes=notes
         )
-        
-        # Store order
-        if user_id not in self.pending_orders:
-            self.pending_orders[user_id] = []
-        self.pending_orders[user_id].append(order)
-        
-        # Start monitoring task
-        task = asyncio.create_task(self._monitor_order(order))
-        self.monitoring_tasks[order_id] = task
-        
+
+    def _order_details(self, order: ConditionalOrder) -> Dict:
         return {
-            "success": True,
-            "order_id": order_id,
-            "message": f"Conditional order created with {len(parsed_conditions)} conditions",
-            "details": {
-                "pair": pair,
-                "action": action,
-                "conditions": [c.description for c in parsed_conditions],
-                "max_execution_time": max_exec_time.isoformat() if max_exec_time else "indefinite",
-                "session_filter": session_filter or "any"
-            }
+            "pair": order.pair,
+            "action": order.action,
+            "conditions": [c.description for c in order.conditions],
+            "max_execution_time": order.max_execution_time.isoformat() if order.max_execution_time else "indefinite",
+            "session_filter": order.session_filter.value if order.session_filter else "any"
         }
 
-    async def _monitor_order(self, order: ConditionalOrder):
-        """Monitor a conditional order for execution"""
-        while order.status == OrderStatus.PENDING:
-            # Check if expired
-            if order.max_execution_time and datetime.now() > order.max_execution_time:
-                order.status = OrderStatus.EXPIRED
-                break
-            
-            # Check session filter
+    def _monitor_orders(self, orders: List[ConditionalOrder]) -> Dict[str, str]:
+        """
+        Monitor conditional orders for execution on their pairs' ticks
+        Compiles each order's conditions, subscribes new pairs and schedules
+        every expiry in one batch. Returns {order_id: error} for orders whose
+        conditions could not be compiled (those are not monitored).
+        """
+        errors = {}
+        expiries = []
+        for order in orders:
+            guards = []
             if order.session_filter:
-                current_session = self._get_current_session()
-                if current_session != order.session_filter:
-                    await asyncio.sleep(60)  # Check every minute
-                    continue
-            
-            # Check conditions (simulated)
-            # In production, this would fetch live data and evaluate conditions
-            conditions_met = await self._evaluate_conditions(order)
-            
-            if conditions_met:
-                order.status = OrderStatus.TRIGGERED
-                order.executed_at = datetime.now()
-                break
+                session = order.session_filter.value
+                guards.append(lambda now, current, session=session: current == session)
+            try:
+                self.conditions.add(
+                    order.order_id,
+                    order.pair,
+                    order.conditions,
+                    all_must_match=order.all_conditions_must_match,
+                    guards=guards,
+                    created_at=order.created_at
+                )
+            except ValueError as e:
+                errors[order.order_id] = f"Invalid condition: {e}"
+                continue
             
-            await asyncio.sleep(30)  # Check every 30 seconds
+            if order.max_execution_time:
+                expiries.append((order.order_id, order.max_execution_time, self._expire_order))
+            self.monitored_orders.setdefault(order.pair, {})[order.order_id] = order
+            if order.pair not in self.pair_subscriptions:
+                self.pair_subscriptions[order.pair] = self.tick_bus.subscribe(order.pair, self._on_tick)
+        
+        self.scheduler.schedule_many(expiries)
+        if self.monitored_orders and SESSION_CHANGE_TIMER not in self.scheduler:
+            self._schedule_session_change()
+        return errors
+
+    def _unmonitor_order(self, order: ConditionalOrder):
+        """Stop evaluating an order; the pair subscription goes with its last order"""
+        self.conditions.remove(order.order_id)
+        self.scheduler.cancel(order.order_id)
+        orders = self.monitored_orders.get(order.pair)
+        if orders is None:
+            return
+        orders.pop(order.order_id, None)
+        if not orders:
+            del self.monitored_orders[order.pair]
+            token = self.pair_subscriptions.pop(order.pair, None)
+            if token is not None:
+                self.tick_bus.unsubscribe(order.pair, token)
+        if not self.monitored_orders:
+            self.scheduler.cancel(SESSION_CHANGE_TIMER)
 
-    async def _evaluate_conditions(self, order: ConditionalOrder) -> bool:
-        """Evaluate if all conditions for an order are met"""
-        # Placeholder: In production, fetch live data and evaluate
-        # For now, return False (conditions not met)
-        return False
+    def _expire_order(self, order_id: str):
+        """Scheduler callback at an order's max_execution_time"""
+        order = self.orders.get(order_id)
+        if order is not None and order.status == OrderStatus.PENDING:
+            self.orders.transition(order, OrderStatus.EXPIRED)
+            self._unmonitor_order(order)
+
+    def _schedule_session_change(self):
+        """Wake up at the next trading-session boundary"""
+        now_utc = datetime.utcnow()
+        boundaries = [
+            now_utc.replace(hour=hour, minute=0, second=0, microsecond=0) for hour in SESSION_CHANGE_HOURS_UTC
+        ]
+        upcoming = min(b if b > now_utc else b + timedelta(days=1) for b in boundaries)
+        self.scheduler.schedule(
+            SESSION_CHANGE_TIMER, datetime.now() + (upcoming - now_utc), self._on_session_change
+        )
+
+    async def _on_session_change(self, _key=None):
+        """Release orders whose conditions already hold and were only waiting for the new session"""
+        now = datetime.now()
+        session = self._get_current_session().value
+        for pair in list(self.conditions.ready):
+            self._trigger_orders(pair, self.conditions.evaluate(pair, {}, now, session), now)
+        if self.monitored_orders:
+            self._schedule_session_change()
+
+    async def _on_tick(self, tick: Tick):
+        """Trigger the pair's orders whose compiled conditions now hold"""
+        now = datetime.now()
+        values = {PRICE: tick.price}
+        operands = self.conditions.operands(tick.pair)
+        if any(operand in INDICATOR_OPERANDS for operand in operands):
+            # Warm-up placeholders are left out, so those conditions keep their previous truth
+            if self.indicators.is_ready(tick.pair, "rsi"):
+                values["rsi"] = self.indicators.rsi(tick.pair)
+            if self.indicators.is_ready(tick.pair, "macd"):
+                macd = self.indicators.macd(tick.pair)
+                values.update({
+                    "macd": macd["macd"],
+                    "macd_signal": macd["signal"],
+                    "macd_histogram": macd["histogram"],
+                })
+        
+        session = self._get_current_session().value
+        self._trigger_orders(tick.pair, self.conditions.evaluate(tick.pair, values, now, session), now)
+
+    def _trigger_orders(self, pair: str, order_ids: List[str], now: datetime):
+        """Mark evaluated orders triggered at the pair's latest price (or expired if past due)"""
+        monitored = self.monitored_orders.get(pair, {})
+        for order_id in order_ids:
+            order = monitored.get(order_id)
+            if order is None:
+                continue
+            if order.max_execution_time and now > order.max_execution_time:
+                self.orders.transition(order, OrderStatus.EXPIRED)  # Deadline passed before its timer ran
+            else:
+                self.orders.transition(order, OrderStatus.TRIGGERED)
+                order.executed_at = now
+                order.execution_price = self.tick_bus.last_price(pair)
+            self._unmonitor_order(order)
 
     def _get_current_session(self) -> TradingSession:
         """Determine current trading session based on UTC time"""
@@ -247,54 +520,73 @@ class ExecutionIntelligenceService:
 
     async def get_order_status(self, order_id: str) -> Dict:
         """Get status of a conditional order"""
-        for orders_list in self.pending_orders.values():
-            for order in orders_list:
-                if order.order_id == order_id:
-                    return {
-                        "order_id": order_id,
-                        "status": order.status.value,
-                        "pair": order.pair,
-                        "action": order.action,
-                        "conditions": [
-                            {
-                                "type": c.condition_type,
-                                "operator": c.operator,
-                                "value": c.value,
-                                "description": c.description
-                            }
-                            for c in order.conditions
-                        ],
-                        "created_at": order.created_at.isoformat(),
-                        "max_execution_time": order.max_execution_time.isoformat() if order.max_execution_time else None,
-                        "executed_at": order.executed_at.isoformat() if order.executed_at else None,
-                    }
+        order = self.orders.get(order_id)
+        if order is None:
+            return {"error": "Order not found"}
         
-        return {"error": "Order not found"}
+        return {
+            "order_id": order_id,
+            "status": order.status.value,
+            "pair": order.pair,
+            "action": order.action,
+            "conditions": [
+                {
+                    "type": c.condition_type,
+                    "operator": c.operator,
+                    "value": c.value,
+                    "description": c.description
+                }
+                for c in order.conditions
+            ],
+            "created_at": order.created_at.isoformat(),
+            "max_execution_time": order.max_execution_time.isoformat() if order.max_execution_time else None,
+            "executed_at": order.executed_at.isoformat() if order.executed_at else None,
+        }
 
     async def cancel_order(self, order_id: str) -> Dict:
         """Cancel a pending conditional order"""
-        for user_id, orders_list in self.pending_orders.items():
-            for order in orders_list:
-                if order.order_id == order_id:
-                    order.status = OrderStatus.CANCELLED
-                    if order_id in self.monitoring_tasks:
-                        self.monitoring_tasks[order_id].cancel()
-                    return {
-                        "success": True,
-                        "message": f"Order {order_id} cancelled",
-                        "order_details": {
-                            "pair": order.pair,
-                            "action": order.action,
-                            "reason": "User initiated cancellation"
-                        }
-                    }
+        order = self.orders.get(order_id)
+        if order is None:
+            return {"error": "Order not found"}
+        if order.status != OrderStatus.PENDING:
+            return {"error": f"Order {order_id} is already {order.status.value}"}
         
-        return {"error": "Order not found"}
+        self.orders.transition(order, OrderStatus.CANCELLED)
+        self._unmonitor_order(order)
+        return {
+            "success": True,
+            "message": f"Order {order_id} cancelled",
+            "order_details": {
+                "pair": order.pair,
+                "action": order.action,
+                "reason": "User initiated cancellation"
+            }
+        }
+
+    async def cancel_orders(self, order_ids: List[str], user_id: Optional[str] = None) -> Dict:
+        """Cancel many pending orders (optionally only those owned by `user_id`)"""
+        cancelled, failed = [], []
+        for order_id in dict.fromkeys(order_ids):
+            order = self.orders.get(order_id)
+            if order is None or (user_id is not None and order.user_id != user_id):
+                failed.append({"order_id": order_id, "error": "Order not found"})
+            elif order.status != OrderStatus.PENDING:
+                failed.append({"order_id": order_id, "error": f"Order is already {order.status.value}"})
+            else:
+                self.orders.transition(order, OrderStatus.CANCELLED)
+                self._unmonitor_order(order)
+                cancelled.append(order_id)
+        
+        return {
+            "success": not failed,
+            "cancelled_count": len(cancelled),
+            "cancelled": cancelled,
+            "failed": failed,
+        }
 
     async def get_active_orders(self, user_id: str) -> List[Dict]:
         """Get all active conditional orders for a user"""
-        orders = self.pending_orders.get(user_id, [])
-        active = [o for o in orders if o.status == OrderStatus.PENDING]
+        active = self.orders.user_orders(user_id, OrderStatus.PENDING)
         
         return [
             {
@@ -447,8 +739,7 @@ class ExecutionIntelligenceService:
 
     async def get_order_history(self, user_id: str, limit: int = 20) -> List[Dict]:
         """Get order execution history"""
-        all_orders = [o for o in self.order_history if o.user_id == user_id]
-        recent = all_orders[-limit:]
+        recent = self.orders.history(user_id, limit)
         
         return [
             {
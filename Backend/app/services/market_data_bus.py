@@ -0,0 +1,200 @@
+"""
+Market Data Tick Bus
+One price producer per pair fans ticks out to every subscriber of that pair,
+so monitors react to ticks instead of each running its own polling loop
+"""
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, Optional
+import asyncio
+import itertools
+import os
+import time
+
+
+DEFAULT_TICK_INTERVAL = float(os.getenv("TICK_BUS_INTERVAL_SECONDS", "15"))
+
+
+@dataclass(slots=True)
+class Tick:
+    """Latest price for one pair"""
+    pair: str
+    price: float
+    bid: Optional[float] = None
+    ask: Optional[float] = None
+    timestamp: datetime = field(default_factory=datetime.now)
+
+
+TickHandler = Callable[[Tick], Awaitable[None]]
+# Returns a dict with "price" (and optionally "bid", "ask", "timestamp"), or None
+PriceSource = Callable[[str], Awaitable[Optional[Dict]]]
+
+
+class MarketDataBus:
+    """
+    Pair-keyed publish/subscribe for price ticks
+
+    Ticks arrive either from an external feed calling `publish`/`publish_rates`
+    or from a producer task the bus runs per subscribed pair using
+    `price_source`. A producer skips its fetch when the pair already got a
+    tick within the interval, and stops once the pair has no subscribers.
+    Subscribers may register a `fallback_source` for pairs the shared source
+    does not quote (it is asked only when the shared source returns nothing).
+    """
+
+    def __init__(self, price_source: Optional[PriceSource] = None, interval: float = DEFAULT_TICK_INTERVAL):
+        self.price_source = price_source
+        self.interval = interval
+        # {pair: {token: handler}}
+        self.subscribers: Dict[str, Dict[int, TickHandler]] = {}
+        self.producers: Dict[str, asyncio.Task] = {}
+        self.fallback_sources: Dict[str, PriceSource] = {}
+        self.last_ticks: Dict[str, Tick] = {}
+        self._last_published: Dict[str, float] = {}  # time.monotonic() per pair
+        self._tokens = itertools.count(1)
+
+        # Statistics
+        self.ticks_published = 0
+        self.deliveries = 0
+        self.handler_errors = 0
+        self.source_fetches = 0
+
+    def subscribe(self, pair: str, handler: TickHandler, fallback_source: Optional[PriceSource] = None) -> int:
+        """Register `handler` for a pair's ticks and return its subscription token"""
+        token = next(self._tokens)
+        self.subscribers.setdefault(pair, {})[token] = handler
+        if fallback_source is not None:
+            self.fallback_sources.setdefault(pair, fallback_source)
+        self._ensure_producer(pair)
+        return token
+
+    def unsubscribe(self, pair: str, token: int):
+        """Remove a subscription; the pair's producer stops with its last subscriber"""
+        handlers = self.subscribers.get(pair)
+        if handlers is None:
+            return
+        handlers.pop(token, None)
+        if not handlers:
+            del self.subscribers[pair]
+            self.fallback_sources.pop(pair, None)
+            producer = self.producers.pop(pair, None)
+            if producer is not None:
+                producer.cancel()
+
+    def subscriber_count(self, pair: Optional[str] = None) -> int:
+        if pair is not None:
+            return len(self.subscribers.get(pair, ()))
+        return sum(len(handlers) for handlers in self.subscribers.values())
+
+    async def publish(
+        self,
+        pair: str,
+        price: float,
+        bid: Optional[float] = None,
+        ask: Optional[float] = None,
+        timestamp: Optional[datetime] = None
+    ) -> Tick:
+        """Record a tick and deliver it to the pair's subscribers"""
+        tick = Tick(pair=pair, price=price, bid=bid, ask=ask, timestamp=timestamp or datetime.now())
+        self.last_ticks[pair] = tick
+        self._last_published[pair] = time.monotonic()
+        self.ticks_published += 1
+
+        # Copy so handlers can unsubscribe while the tick is being delivered
+        for handler in list(self.subscribers.get(pair, {}).values()):
+            try:
+                await handler(tick)
+                self.deliveries += 1
+            except Exception as e:
+                self.handler_errors += 1
+                print(f"Tick handler for {pair} failed: {e}")
+        return tick
+
+    async def publish_rates(self, rates: Dict[str, float]):
+        """Publish one tick per pair from a rates snapshot (pairs nobody watches are only recorded)"""
+        for pair, price in rates.items():
+            if price is not None:
+                await self.publish(pair, price)
+
+    def last_price(self, pair: str) -> Optional[float]:
+        tick = self.last_ticks.get(pair)
+        return tick.price if tick else None
+
+    def _ensure_producer(self, pair: str):
+        if self.price_source is None and pair not in self.fallback_sources:
+            return
+        producer = self.producers.get(pair)
+        if producer is not None and not producer.done():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # No running loop (e.g. synchronous setup); ticks can still be published externally
+        self.producers[pair] = loop.create_task(self._produce(pair))
+
+    async def _produce(self, pair: str):
+        """Fetch the pair's price every interval while it has subscribers"""
+        try:
+            while self.subscribers.get(pair):
+                await asyncio.sleep(self.interval)
+                last = self._last_published.get(pair)
+                if last is not None and time.monotonic() - last < self.interval:
+                    continue  # An external feed is already covering this pair
+
+                try:
+                    data = await self._fetch(pair)
+                except Exception as e:
+                    print(f"Price source failed for {pair}: {e}")
+                    continue
+                if data:
+                    await self.publish(
+                        pair, data["price"], data.get("bid"), data.get("ask"), data.get("timestamp")
+                    )
+        except asyncio.CancelledError:
+            pass
+        finally:
+            if self.producers.get(pair) is asyncio.current_task():
+                del self.producers[pair]
+
+    async def _fetch(self, pair: str) -> Optional[Dict]:
+        """Price from the shared source, or the pair's fallback when the shared source has none"""
+        data = None
+        if self.price_source is not None:
+            self.source_fetches += 1
+            data = await self.price_source(pair)
+        fallback = self.fallback_sources.get(pair)
+        if not data and fallback is not None:
+            self.source_fetches += 1
+            data = await fallback(pair)
+        return data
+
+    def stop(self):
+        """Cancel every producer"""
+        for producer in self.producers.values():
+            producer.cancel()
+        self.producers.clear()
+
+    def get_stats(self) -> Dict:
+        return {
+            "pairs": len(self.subscribers),
+            "subscribers": self.subscriber_count(),
+            "producers": len(self.producers),
+            "ticks_published": self.ticks_published,
+            "deliveries": self.deliveries,
+            "handler_errors": self.handler_errors,
+            "source_fetches": self.source_fetches,
+            "interval_seconds": self.interval,
+        }
+
+
+async def _cached_rate(pair: str) -> Optional[Dict]:
+    """Pair price from the shared, rate-cached forex service"""
+    from ..forex_data_service import forex_service
+
+    rates = await forex_service.get_currency_rates()
+    price = rates.get(pair)
+    return {"price": price} if price is not None else None
+
+
+# Global tick bus (also fed by the live forex stream)
+market_data_bus = MarketDataBus(price_source=_cached_rate)
@@ -369,6 +369,14 @@ class NaturalLanguageService:
                 "3. Alert will remain active until dismissed"
             ]
         
+        elif cmd_type == CommandType.PAPER_TRADE:
+            pairs = ", ".join(params.get("pairs") or []) or "selected pairs"
+            return [
+                f"1. Backtest {pairs} over {params.get('period') or 'the available history'}",
+                "2. POST /api/advanced/paper/backtest with historical bars (or use live history)",
+                "3. Review win rate, drawdown and return before paper trading live"
+            ]
+        
         elif cmd_type == CommandType.STOP_ALL:
             return [
                 "⚠️ CRITICAL ACTION - Are you sure?",
@@ -431,6 +439,9 @@ class NaturalLanguageService:
         elif cmd_type == CommandType.SET_ALERT:
             return f"🔔 Alert set! I'll notify you when {parsed.parameters.get('pair')} {parsed.parameters.get('condition')} {parsed.parameters.get('trigger_price')}"
         
+        elif cmd_type == CommandType.PAPER_TRADE:
+            return f"🧪 Backtest ready for {', '.join(parsed.parameters.get('pairs') or ['selected pairs'])} over {parsed.parameters.get('period') or 'the available history'}. Review the results before paper trading live."
+        
         elif cmd_type == CommandType.STOP_ALL:
             return "🛑 KILL SWITCH ACTIVATED! All trading stopped. All positions will be closed."
         
@@ -0,0 +1,169 @@
+"""
+Notification Delivery Workers
+Background per-channel queues and workers, so sending a notification only
+enqueues it and channel I/O never runs inside the caller's request
+"""
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+import asyncio
+
+
+DEFAULT_MAX_ATTEMPTS = 4
+DEFAULT_BACKOFF_SECONDS = 0.5
+
+Sender = Callable[[Any], Awaitable[None]]
+BatchSender = Callable[[List[Any]], Awaitable[None]]
+Job = Tuple[Any, int]  # (notification, attempt)
+
+
+@dataclass
+class ChannelConfig:
+    """How one channel delivers: a sender, its worker count and optional batching"""
+    send: Sender
+    concurrency: int = 2
+    send_batch: Optional[BatchSender] = None  # Provider call taking many notifications at once
+    batch_size: int = 50
+
+
+class DeliveryWorkerPool:
+    """
+    Per-channel delivery queues drained by a fixed number of workers each
+
+    `submit` fans a notification out to the queues of its `channels_to_send`
+    and returns immediately. Workers record the outcome in the
+    notification's `delivery_status`; failed sends are requeued with
+    exponential backoff until `max_attempts` is reached.
+    """
+
+    def __init__(
+        self,
+        channels: Dict[Hashable, ChannelConfig],
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        backoff: float = DEFAULT_BACKOFF_SECONDS
+    ):
+        self.channels = channels
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queues: Dict[Hashable, asyncio.Queue] = {}
+        self._workers: List[asyncio.Task] = []
+        self._outstanding = 0  # Jobs queued, in flight or waiting to retry
+        self._idle: Optional[asyncio.Event] = None
+
+        # Statistics
+        self.sent = 0
+        self.failed = 0
+        self.retries = 0
+        self.batches = 0
+
+    def submit(self, notification) -> int:
+        """Queue a notification on each of its channels and return how many were queued"""
+        self._ensure_workers()
+        queued = 0
+        for channel in notification.channels_to_send:
+            if channel not in self.channels:
+                notification.delivery_status[channel] = "skipped: no sender"
+                continue
+            notification.delivery_status[channel] = "pending"
+            self._enqueue(channel, (notification, 1))
+            queued += 1
+        return queued
+
+    def _enqueue(self, channel: Hashable, job: Job):
+        if job[1] == 1:
+            self._outstanding += 1
+            self._idle.clear()
+        self._queues[channel].put_nowait(job)
+
+    def _finish(self, count: int = 1):
+        self._outstanding -= count
+        if self._outstanding == 0:
+            self._idle.set()
+
+    def _ensure_workers(self):
+        """Start the workers on the running loop (moving queued jobs over if the loop changed)"""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        leftover = {channel: [] for channel in self.channels}
+        for channel, queue in self._queues.items():
+            while not queue.empty():
+                leftover[channel].append(queue.get_nowait())
+
+        self._loop = loop
+        self._idle = asyncio.Event()
+        self._queues = {channel: asyncio.Queue() for channel in self.channels}
+        self._workers = [
+            loop.create_task(self._worker(channel))
+            for channel, config in self.channels.items()
+            for _ in range(config.concurrency)
+        ]
+        self._outstanding = sum(len(jobs) for jobs in leftover.values())
+        for channel, jobs in leftover.items():
+            for job in jobs:
+                self._queues[channel].put_nowait(job)
+        if self._outstanding == 0:
+            self._idle.set()
+
+    async def _worker(self, channel: Hashable):
+        config = self.channels[channel]
+        queue = self._queues[channel]
+        try:
+            while True:
+                jobs = [await queue.get()]
+                if config.send_batch is not None:
+                    while len(jobs) < config.batch_size and not queue.empty():
+                        jobs.append(queue.get_nowait())
+
+                try:
+                    if config.send_batch is not None:
+                        await config.send_batch([notification for notification, _ in jobs])
+                        self.batches += 1
+                    else:
+                        await config.send(jobs[0][0])
+                except Exception as e:
+                    for job in jobs:
+                        self._retry(channel, job, e)
+                    continue
+
+                for notification, _ in jobs:
+                    notification.delivery_status[channel] = "sent"
+                self.sent += len(jobs)
+                self._finish(len(jobs))
+        except asyncio.CancelledError:
+            pass
+
+    def _retry(self, channel: Hashable, job: Job, error: Exception):
+        notification, attempt = job
+        if attempt >= self.max_attempts:
+            notification.delivery_status[channel] = f"failed: {str(error)}"
+            self.failed += 1
+            self._finish()
+            return
+        notification.delivery_status[channel] = "retrying"
+        self.retries += 1
+        delay = self.backoff * 2 ** (attempt - 1)
+        self._loop.call_later(delay, self._enqueue, channel, (notification, attempt + 1))
+
+    async def join(self):
+        """Wait until every queued delivery has been sent or has failed for good"""
+        if self._idle is not None:
+            await self._idle.wait()
+
+    def stop(self):
+        for worker in self._workers:
+            worker.cancel()
+        self._workers = []
+        self._loop = None
+
+    def get_stats(self) -> Dict:
+        return {
+            "queued": {str(getattr(c, "value", c)): q.qsize() for c, q in self._queues.items()},
+            "outstanding": self._outstanding,
+            "workers": len(self._workers),
+            "sent": self.sent,
+            "failed": self.failed,
+            "retries": self.retries,
+            "batches": self.batches,
+        }
@@ -0,0 +1,150 @@
+"""
+Order Scheduler
+One coroutine fires every timed order event (expiry deadlines, session
+boundaries) from a heap, sleeping until the earliest deadline
+"""
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+import asyncio
+import heapq
+import itertools
+
+
+TimerCallback = Callable[[Hashable], Optional[Awaitable[None]]]
+
+
+class OrderScheduler:
+    """
+    Heap of (deadline, seq, key) timers with lazy cancellation
+
+    Rescheduling a key replaces its previous timer. The runner task starts
+    with the first timer scheduled inside a running loop and is woken early
+    whenever a timer lands ahead of the one it is sleeping on.
+    """
+
+    def __init__(self):
+        self._heap: List[Tuple[datetime, int, Hashable]] = []
+        # {key: (seq, callback)} for timers that have not fired or been cancelled
+        self._timers: Dict[Hashable, Tuple[int, TimerCallback]] = {}
+        self._seq = itertools.count()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self.fired = 0
+
+    def __len__(self) -> int:
+        return len(self._timers)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._timers
+
+    def schedule(self, key: Hashable, when: datetime, callback: TimerCallback):
+        """Fire `callback(key)` at `when` (replacing any timer already set for `key`)"""
+        seq = next(self._seq)
+        self._timers[key] = (seq, callback)
+        heapq.heappush(self._heap, (when, seq, key))
+        self._compact()
+        self._ensure_runner()
+        if self._wakeup is not None and self._heap[0][1] == seq:
+            self._wakeup.set()
+
+    def schedule_many(self, timers: Iterable[Tuple[Hashable, datetime, TimerCallback]]):
+        """Add many timers with a single heapify and at most one runner wakeup"""
+        entries = []
+        for key, when, callback in timers:
+            seq = next(self._seq)
+            self._timers[key] = (seq, callback)
+            entries.append((when, seq, key))
+        if not entries:
+            return
+        earliest = self.next_deadline()
+        self._heap.extend(entries)
+        heapq.heapify(self._heap)
+        self._compact()
+        self._ensure_runner()
+        if self._wakeup is not None and (earliest is None or min(entries)[0] < earliest):
+            self._wakeup.set()
+
+    def cancel(self, key: Hashable):
+        self._timers.pop(key, None)
+
+    def next_deadline(self) -> Optional[datetime]:
+        """Earliest live deadline (dropping cancelled entries on the way)"""
+        while self._heap:
+            when, seq, key = self._heap[0]
+            timer = self._timers.get(key)
+            if timer is not None and timer[0] == seq:
+                return when
+            heapq.heappop(self._heap)
+        return None
+
+    async def run_due(self, now: Optional[datetime] = None) -> int:
+        """Fire every timer due at `now` and return how many fired"""
+        now = now or datetime.now()
+        fired = 0
+        while True:
+            when = self.next_deadline()
+            if when is None or when > now:
+                break
+            key = heapq.heappop(self._heap)[2]
+            _, callback = self._timers.pop(key)
+            try:
+                result = callback(key)
+                if asyncio.iscoroutine(result):
+                    await result
+            except Exception as e:
+                print(f"Order timer {key} failed: {e}")
+            fired += 1
+        self.fired += fired
+        return fired
+
+    def _compact(self):
+        """Rebuild the heap once cancelled entries dominate it"""
+        if len(self._heap) > 64 and len(self._heap) > 4 * len(self._timers):
+            self._heap = [
+                entry for entry in self._heap
+                if entry[2] in self._timers and self._timers[entry[2]][0] == entry[1]
+            ]
+            heapq.heapify(self._heap)
+
+    def _ensure_runner(self):
+        if self._task is not None and not self._task.done():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # No running loop; timers still fire through run_due()
+        self._wakeup = asyncio.Event()
+        self._task = loop.create_task(self._run())
+
+    async def _run(self):
+        try:
+            while self._timers:
+                self._wakeup.clear()
+                when = self.next_deadline()
+                if when is None:
+                    break
+                delay = (when - datetime.now()).total_seconds()
+                if delay > 0:
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                        continue  # An earlier timer arrived; recompute the deadline
+                    except asyncio.TimeoutError:
+                        pass
+                await self.run_due()
+        except asyncio.CancelledError:
+            pass
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def get_stats(self) -> Dict:
+        deadline = self.next_deadline()
+        return {
+            "timers": len(self._timers),
+            "heap_entries": len(self._heap),
+            "fired": self.fired,
+            "next_deadline": deadline.isoformat() if deadline else None,
+            "running": self._task is not None and not self._task.done(),
+        }
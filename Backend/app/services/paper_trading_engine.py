@@ -3,14 +3,17 @@ Paper Trading Engine
 Simulates live trading without real money
 Builds user confidence before enabling real trading
 """
-from dataclasses import dataclass, field
+from dataclasses import asdict, dataclass, field
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 from enum import Enum
 import random
 
+from .price_trigger_index import ABOVE, BELOW, PriceTriggerIndex
+from .trade_ledger import TradeLedger
 
-@dataclass
+
+@dataclass(slots=True)
 class PaperTrade:
     """Simulated trade"""
     trade_id: str
@@ -49,8 +52,8 @@ class PaperTradingAccount:
     max_drawdown: float = 0.0
     max_profit: float = 0.0
     
-    open_trades: List[PaperTrade] = field(default_factory=list)
-    closed_trades: List[PaperTrade] = field(default_factory=list)
+    open_trades: Dict[str, PaperTrade] = field(default_factory=dict)  # {trade_id: trade}
+    closed_trades: TradeLedger = field(default_factory=TradeLedger)
 
 
 class PaperTradingEngine:
@@ -61,7 +64,9 @@ class PaperTradingEngine:
     
     def __init__(self):
         self.accounts: Dict[str, PaperTradingAccount] = {}
-        self.all_trades: List[PaperTrade] = []
+        # Open trades by id, plus their stop/target levels indexed per pair
+        self.open_trades: Dict[str, PaperTrade] = {}
+        self.triggers = PriceTriggerIndex()
         
         # Simulated live prices (in production, fetch from real API)
         self.live_prices = {
@@ -147,9 +152,9 @@ class PaperTradingEngine:
             take_profit=take_profit or (current_price * 1.01 if action == "BUY" else current_price * 0.99),
         )
         
-        account.open_trades.append(trade)
+        account.open_trades[trade_id] = trade
         account.available_margin -= notional_value
-        self.all_trades.append(trade)
+        self._index_trade(trade)
         
         return {
             "success": True,
@@ -171,7 +176,8 @@ class PaperTradingEngine:
         self,
         user_id: str,
         trade_id: str,
-        exit_price: Optional[float] = None
+        exit_price: Optional[float] = None,
+        status: str = "closed"
     ) -> Dict:
         """Close a paper trade"""
         
@@ -179,13 +185,49 @@ class PaperTradingEngine:
         if not account:
             return {"error": "Account not found"}
         
-        trade = next((t for t in account.open_trades if t.trade_id == trade_id), None)
+        trade = account.open_trades.get(trade_id)
         if not trade:
             return {"error": "Trade not found"}
         
         # Calculate exit price
         exit_price = exit_price or self.live_prices.get(trade.pair, trade.entry_price)
         
+        del account.open_trades[trade_id]
+        self.open_trades.pop(trade_id, None)
+        self.triggers.discard(trade_id)
+        self.settle_trade(account, trade, exit_price, status)
+        pnl, pnl_percent = trade.profit_loss, trade.profit_loss_percent
+        
+        return {
+            "success": True,
+            "trade_id": trade_id,
+            "message": f"Paper trade closed with {pnl:+.2f} profit",
+            "details": {
+                "pair": trade.pair,
+                "action": trade.action,
+                "entry_price": trade.entry_price,
+                "exit_price": exit_price,
+                "position_size": trade.position_size,
+                "profit_loss": pnl,
+                "profit_loss_percent": f"{pnl_percent:+.2f}%",
+                "duration": str(trade.exit_time - trade.entry_time).split('.')[0]
+            }
+        }
+
+    def settle_trade(
+        self,
+        account: PaperTradingAccount,
+        trade: PaperTrade,
+        exit_price: float,
+        status: str = "closed",
+        exit_time: Optional[datetime] = None
+    ) -> Dict:
+        """
+        Apply a trade's exit to the trade and its account, recording it in the
+        account ledger; returns the ledger record
+        Shared by live closes and backtests so both report identical statistics.
+        """
+        
         # Calculate P&L
         if trade.action == "BUY":
             pnl = (exit_price - trade.entry_price) * trade.position_size
@@ -196,14 +238,14 @@ class PaperTradingEngine:
         
         # Update trade
         trade.exit_price = exit_price
-        trade.exit_time = datetime.now()
-        trade.status = "closed"
+        trade.exit_time = exit_time or datetime.now()
+        trade.status = status
         trade.profit_loss = pnl
         trade.profit_loss_percent = pnl_percent
         
         # Update account
-        account.open_trades.remove(trade)
-        account.closed_trades.append(trade)
+        record = self._trade_record(trade)
+        account.closed_trades.append(**record)
         account.current_balance += pnl
         account.available_margin += (trade.position_size * trade.entry_price)  # Free up margin
         account.total_trades += 1
@@ -219,21 +261,7 @@ class PaperTradingEngine:
         account.total_profit_loss += pnl
         account.win_rate = (account.winning_trades / max(account.total_trades, 1)) * 100
         
-        return {
-            "success": True,
-            "trade_id": trade_id,
-            "message": f"Paper trade closed with {pnl:+.2f} profit",
-            "details": {
-                "pair": trade.pair,
-                "action": trade.action,
-                "entry_price": trade.entry_price,
-                "exit_price": exit_price,
-                "position_size": trade.position_size,
-                "profit_loss": pnl,
-                "profit_loss_percent": f"{pnl_percent:+.2f}%",
-                "duration": str(trade.exit_time - trade.entry_time).split('.')[0]
-            }
-        }
+        return record
 
     async def get_paper_account_summary(self, user_id: str) -> Dict:
         """Get paper trading account summary"""
@@ -242,6 +270,10 @@ class PaperTradingEngine:
         if not account:
             return {"error": "Account not found"}
         
+        return self.account_summary(account)
+
+    def account_summary(self, account: PaperTradingAccount) -> Dict:
+        """Summary statistics for any paper account (live or backtest)"""
         return {
             "account_id": account.account_id,
             "balance": {
@@ -259,6 +291,7 @@ class PaperTradingEngine:
                 "max_profit": account.max_profit,
                 "max_drawdown": f"{account.max_drawdown:.2f}%",
             },
+            "performance": account.closed_trades.summary(starting_balance=account.starting_balance),
             "open_trades": len(account.open_trades),
             "closed_trades": len(account.closed_trades),
             "created_at": account.created_at.isoformat(),
@@ -274,36 +307,55 @@ class PaperTradingEngine:
         
         trades = []
         if status in ["all", "open"]:
-            trades.extend(account.open_trades)
+            trades.extend(asdict(t) for t in account.open_trades.values())
         if status in ["all", "closed"]:
-            trades.extend(account.closed_trades)
+            trades.extend(account.closed_trades.rows())
         
         return [
             {
-                "trade_id": t.trade_id,
-                "pair": t.pair,
-                "action": t.action,
-                "entry_price": t.entry_price,
-                "entry_time": t.entry_time.isoformat(),
-                "exit_price": t.exit_price,
-                "exit_time": t.exit_time.isoformat() if t.exit_time else None,
-                "position_size": t.position_size,
-                "status": t.status,
-                "profit_loss": t.profit_loss,
-                "profit_loss_percent": f"{t.profit_loss_percent:.2f}%" if t.profit_loss_percent else None,
+                "trade_id": t["trade_id"],
+                "pair": t["pair"],
+                "action": t["action"],
+                "entry_price": t["entry_price"],
+                "entry_time": t["entry_time"].isoformat(),
+                "exit_price": t["exit_price"],
+                "exit_time": t["exit_time"].isoformat() if t["exit_time"] else None,
+                "position_size": t["position_size"],
+                "status": t["status"],
+                "profit_loss": t["profit_loss"],
+                "profit_loss_percent": f"{t['profit_loss_percent']:.2f}%" if t["profit_loss_percent"] else None,
             }
             for t in trades
         ]
 
+    def _trade_record(self, trade: PaperTrade) -> Dict:
+        """Ledger fields for a closed trade"""
+        return {
+            "trade_id": trade.trade_id,
+            "user_id": trade.user_id,
+            "pair": trade.pair,
+            "action": trade.action,
+            "entry_price": trade.entry_price,
+            "position_size": trade.position_size,
+            "entry_time": trade.entry_time,
+            "status": trade.status,
+            "exit_price": trade.exit_price,
+            "exit_time": trade.exit_time,
+            "profit_loss": trade.profit_loss,
+            "profit_loss_percent": trade.profit_loss_percent,
+        }
+
     async def update_live_prices(self, price_data: Dict[str, float]) -> Dict:
         """Update simulated live prices"""
         
+        updated_pairs = []
         for pair, price in price_data.items():
             if pair in self.live_prices:
                 self.live_prices[pair] = price
+                updated_pairs.append(pair)
         
         # Check if any stop losses or take profits should be triggered
-        triggered = await self._check_trade_triggers()
+        triggered = await self._check_trade_triggers(updated_pairs)
         
         return {
             "success": True,
@@ -311,38 +363,54 @@ class PaperTradingEngine:
             "trades_triggered": triggered
         }
 
-    async def _check_trade_triggers(self) -> int:
-        """Check for stop loss / take profit triggers"""
+    def _index_trade(self, trade: PaperTrade):
+        """Register an open trade's stop loss and take profit levels"""
+        self.open_trades[trade.trade_id] = trade
+        if trade.action == "BUY":
+            self.triggers.add(trade.pair, trade.trade_id, trade.stop_loss, BELOW)
+            self.triggers.add(trade.pair, trade.trade_id, trade.take_profit, ABOVE)
+        else:
+            self.triggers.add(trade.pair, trade.trade_id, trade.stop_loss, ABOVE)
+            self.triggers.add(trade.pair, trade.trade_id, trade.take_profit, BELOW)
+
+    async def _check_trade_triggers(self, pairs: Optional[List[str]] = None) -> int:
+        """
+        Check for stop loss / take profit triggers
+        Only trades on the given pairs whose levels were crossed are visited.
+        """
         triggered_count = 0
         
-        for trade in self.all_trades:
-            if trade.status != "open":
-                continue
-            
-            current_price = self.live_prices.get(trade.pair, trade.entry_price)
-            
-            # Check stop loss
-            if trade.action == "BUY" and current_price <= trade.stop_loss:
-                await self.close_paper_trade(trade.user_id, trade.trade_id, trade.stop_loss)
-                trade.status = "stopped_out"
-                triggered_count += 1
-            
-            elif trade.action == "SELL" and current_price >= trade.stop_loss:
-                await self.close_paper_trade(trade.user_id, trade.trade_id, trade.stop_loss)
-                trade.status = "stopped_out"
-                triggered_count += 1
-            
-            # Check take profit
-            elif trade.action == "BUY" and current_price >= trade.take_profit:
-                await self.close_paper_trade(trade.user_id, trade.trade_id, trade.take_profit)
-                triggered_count += 1
-            
-            elif trade.action == "SELL" and current_price <= trade.take_profit:
-                await self.close_paper_trade(trade.user_id, trade.trade_id, trade.take_profit)
-                triggered_count += 1
+        for pair in (self.live_prices if pairs is None else pairs):
+            current_price = self.live_prices[pair]
+            for trade_id in self.triggers.pop_triggered(pair, current_price):
+                trade = self.open_trades.get(trade_id)
+                if trade and await self._apply_trigger(trade, current_price):
+                    triggered_count += 1
         
         return triggered_count
 
+    async def _apply_trigger(self, trade: PaperTrade, current_price: float) -> bool:
+        """Close a trade whose stop loss (checked first) or take profit was hit"""
+        
+        # Check stop loss
+        if trade.action == "BUY" and current_price <= trade.stop_loss:
+            await self.close_paper_trade(trade.user_id, trade.trade_id, trade.stop_loss, status="stopped_out")
+        
+        elif trade.action == "SELL" and current_price >= trade.stop_loss:
+            await self.close_paper_trade(trade.user_id, trade.trade_id, trade.stop_loss, status="stopped_out")
+        
+        # Check take profit
+        elif trade.action == "BUY" and current_price >= trade.take_profit:
+            await self.close_paper_trade(trade.user_id, trade.trade_id, trade.take_profit)
+        
+        elif trade.action == "SELL" and current_price <= trade.take_profit:
+            await self.close_paper_trade(trade.user_id, trade.trade_id, trade.take_profit)
+        
+        else:
+            return False
+        
+        return True
+
     async def compare_paper_vs_real(self, user_id: str) -> Dict:
         """
         Compare paper trading results with real trading results
@@ -0,0 +1,88 @@
+"""
+Price Trigger Index
+Per-pair heaps of price levels so a price update only touches the levels it
+actually crossed
+"""
+from typing import Dict, Hashable, List, Set, Tuple
+import heapq
+import itertools
+
+
+BELOW = "below"  # Fires when price <= level (e.g. BUY stop loss, SELL take profit)
+ABOVE = "above"  # Fires when price >= level (e.g. BUY take profit, SELL stop loss)
+
+
+class PriceTriggerIndex:
+    """
+    Heap-backed trigger levels keyed by pair
+
+    BELOW levels live in a max-heap and ABOVE levels in a min-heap, so
+    `pop_triggered` costs O(k log n) for k crossed levels instead of a scan of
+    every registered level. Removal is lazy: `discard` forgets a key and its
+    heap entries are dropped when they surface.
+    """
+
+    def __init__(self):
+        # {pair: heap of (sort_level, seq, key)}
+        self._below: Dict[str, List[Tuple[float, int, Hashable]]] = {}
+        self._above: Dict[str, List[Tuple[float, int, Hashable]]] = {}
+        # {key: pair} for keys that have not fired or been discarded
+        self._live: Dict[Hashable, str] = {}
+        self._pair_counts: Dict[str, int] = {}
+        self._seq = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._live)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._live
+
+    def add(self, pair: str, key: Hashable, level: float, direction: str):
+        """Register a trigger level for `key` (a key may hold several levels)"""
+        if direction == BELOW:
+            heapq.heappush(self._below.setdefault(pair, []), (-level, next(self._seq), key))
+        elif direction == ABOVE:
+            heapq.heappush(self._above.setdefault(pair, []), (level, next(self._seq), key))
+        else:
+            raise ValueError(f"Unknown trigger direction: {direction}")
+        if key not in self._live:
+            self._live[key] = pair
+            self._pair_counts[pair] = self._pair_counts.get(pair, 0) + 1
+
+    def discard(self, key: Hashable):
+        """Forget every level registered for `key`"""
+        pair = self._live.pop(key, None)
+        if pair is not None:
+            self._pair_counts[pair] -= 1
+
+    def pop_triggered(self, pair: str, price: float) -> List[Hashable]:
+        """Remove and return the live keys whose levels `price` has crossed (each key once)"""
+        triggered: List[Hashable] = []
+        seen: Set[Hashable] = set()
+
+        below = self._below.get(pair)
+        while below and -below[0][0] >= price:
+            key = heapq.heappop(below)[2]
+            if key in self._live and key not in seen:
+                seen.add(key)
+                triggered.append(key)
+
+        above = self._above.get(pair)
+        while above and above[0][0] <= price:
+            key = heapq.heappop(above)[2]
+            if key in self._live and key not in seen:
+                seen.add(key)
+                triggered.append(key)
+
+        for key in triggered:
+            self.discard(key)
+        self._compact(pair)
+        return triggered
+
+    def _compact(self, pair: str):
+        """Rebuild a pair's heaps once discarded entries dominate them"""
+        for heaps in (self._below, self._above):
+            heap = heaps.get(pair)
+            if heap and len(heap) > 64 and len(heap) > 4 * self._pair_counts.get(pair, 0):
+                heap[:] = [entry for entry in heap if entry[2] in self._live]
+                heapq.heapify(heap)
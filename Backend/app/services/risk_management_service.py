@@ -8,6 +8,8 @@ from typing import Dict, List, Optional, Tuple
 from enum import Enum
 import asyncio
 
+from .trade_ledger import TradeLedger
+
 
 class RiskLevel(Enum):
     """Risk levels for trading"""
@@ -29,7 +31,7 @@ class RiskLimits:
     kill_switch_enabled: bool = True
 
 
-@dataclass
+@dataclass(slots=True)
 class TradeExecution:
     """Track individual trade execution"""
     trade_id: str
@@ -57,7 +59,7 @@ class DailyTradingStats:
     losing_trades: int = 0
     total_profit_loss: float = 0.0
     max_drawdown: float = 0.0
-    trades: List[TradeExecution] = field(default_factory=list)
+    trades: TradeLedger = field(default_factory=TradeLedger)  # Settled trades
     kill_switch_triggered: bool = False
 
 
@@ -98,29 +100,44 @@ class RiskManagementService:
         Validate if a trade can be executed based on risk limits
         Returns: (is_valid, reason_if_invalid)
         """
+        return (await self.validate_trades(user_id, [trade_params]))[0]
+
+    async def validate_trades(self, user_id: str, trades: List[Dict]) -> List[Tuple[bool, str]]:
+        """
+        Validate a batch of trades for one user
+        Account-level checks run once; each trade gets its own (is_valid, reason).
+        """
         if not self.user_limits.get(user_id):
-            return False, "User risk limits not configured"
+            return [(False, "User risk limits not configured")] * len(trades)
         
         if self.kill_switch_active.get(user_id, False):
-            return False, "KILL SWITCH ACTIVE - All trading disabled"
+            return [(False, "KILL SWITCH ACTIVE - All trading disabled")] * len(trades)
         
         limits = self.user_limits[user_id]
+        account_reason = None
+        
+        # Open positions limit
+        open_positions = len(self.active_trades.get(user_id, []))
+        if open_positions >= limits.max_open_positions:
+            account_reason = f"Already have {open_positions} open positions (max: {limits.max_open_positions})"
+        
+        # Daily loss limit
+        daily_stat = self.daily_stats.get(user_id)
+        if account_reason is None and daily_stat and daily_stat.total_profit_loss < -limits.daily_loss_limit:
+            account_reason = f"Daily loss limit reached: {daily_stat.total_profit_loss}% (limit: -{limits.daily_loss_limit}%)"
         
+        return [self._check_trade(limits, trade_params, account_reason) for trade_params in trades]
+
+    def _check_trade(self, limits: RiskLimits, trade_params: Dict, account_reason: Optional[str]) -> Tuple[bool, str]:
+        """Per-trade checks, in the same order as a single validation"""
         # Check 1: Position size limit
         position_size = trade_params.get("position_size", 0)
         if position_size > limits.max_trade_size:
             return False, f"Position size {position_size} exceeds max {limits.max_trade_size}"
         
-        # Check 2: Open positions limit
-        open_positions = len(self.active_trades.get(user_id, []))
-        if open_positions >= limits.max_open_positions:
-            return False, f"Already have {open_positions} open positions (max: {limits.max_open_positions})"
-        
-        # Check 3: Daily loss limit
-        today = datetime.now().strftime("%Y-%m-%d")
-        daily_stat = self.daily_stats.get(user_id)
-        if daily_stat and daily_stat.total_profit_loss < -limits.daily_loss_limit:
-            return False, f"Daily loss limit reached: {daily_stat.total_profit_loss}% (limit: -{limits.daily_loss_limit}%)"
+        # Checks 2-3: Open positions and daily loss (account level)
+        if account_reason:
+            return False, account_reason
         
         # Check 4: Mandatory Stop-Loss & Take-Profit
         if limits.mandatory_stop_loss and not trade_params.get("stop_loss"):
@@ -179,7 +196,6 @@ class RiskManagementService:
         if user_id not in self.daily_stats:
             self.daily_stats[user_id] = DailyTradingStats(date=today)
         self.daily_stats[user_id].total_trades += 1
-        self.daily_stats[user_id].trades.append(trade)
         
         return {
             "success": True,
@@ -212,10 +228,12 @@ class RiskManagementService:
         trade.exit_price = exit_price
         trade.profit_loss = profit_loss
         trade.status = "closed"
+        active_trades.remove(trade)
         
         # Update daily stats
         daily_stat = self.daily_stats.get(user_id)
         if daily_stat:
+            self._record_settled(daily_stat, trade)
             daily_stat.total_profit_loss += (profit_loss / trade.position_size) if trade.position_size else 0
             if profit_loss > 0:
                 daily_stat.winning_trades += 1
@@ -238,15 +256,19 @@ class RiskManagementService:
         
         # Close all open trades at market price (simulated)
         active_trades = self.active_trades.get(user_id, [])
+        daily_stat = self.daily_stats.get(user_id)
         closed_count = 0
         for trade in active_trades:
             if trade.status == "open":
                 trade.status = "closed_emergency"
                 closed_count += 1
+                if daily_stat:
+                    self._record_settled(daily_stat, trade)
+        active_trades[:] = [t for t in active_trades if t.status == "open"]
         
         # Update daily stats
-        if user_id in self.daily_stats:
-            self.daily_stats[user_id].kill_switch_triggered = True
+        if daily_stat:
+            daily_stat.kill_switch_triggered = True
         
         return {
             "success": True,
@@ -255,6 +277,22 @@ class RiskManagementService:
             "timestamp": datetime.now().isoformat()
         }
 
+    def _record_settled(self, daily_stat: DailyTradingStats, trade: TradeExecution):
+        """Move a settled trade into the day's ledger"""
+        daily_stat.trades.append(
+            trade_id=trade.trade_id,
+            user_id=trade.user_id,
+            pair=trade.pair,
+            action=trade.action,
+            entry_price=trade.entry_price,
+            position_size=trade.position_size,
+            entry_time=trade.timestamp,
+            status=trade.status,
+            exit_price=trade.exit_price,
+            exit_time=datetime.now(),
+            profit_loss=trade.profit_loss
+        )
+
     async def get_risk_assessment(self, user_id: str) -> Dict:
         """Get current risk assessment and status"""
         limits = self.user_limits.get(user_id)
@@ -339,8 +377,9 @@ class RiskManagementService:
                 "trades_count": total_trades,
                 "profit_loss": daily_stat.total_profit_loss,
             },
+            "performance": daily_stat.trades.summary(),
             "risk_metrics": {
                 "kill_switch_triggered": daily_stat.kill_switch_triggered,
-                "emergency_closures": len([t for t in daily_stat.trades if t.status == "closed_emergency"]),
+                "emergency_closures": daily_stat.trades.count(status="closed_emergency"),
             }
         }
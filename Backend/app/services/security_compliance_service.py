@@ -2,13 +2,16 @@
 Security & Compliance Models
 Handles API security, audit logs, and legal compliance
 """
+from collections import deque
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from typing import Deque, Dict, List, Optional
 from enum import Enum
 import hashlib
 import json
 
+from .audit_log_store import AuditLogStore
+
 
 class APIKeyScope(Enum):
     """API key permission scopes"""
@@ -131,14 +134,85 @@ class ComplianceReport:
     warnings: List[str] = field(default_factory=list)
 
 
+# Rolling windows behind the compliance report
+TRADE_WINDOW = timedelta(days=1)
+KILL_SWITCH_WINDOW = timedelta(days=7)
+
+
+class RollingWindow:
+    """
+    Count and sum of values over a trailing window
+
+    Values land in fixed-width buckets, so memory is bounded by
+    window / resolution and a value leaves the window up to one
+    resolution step late.
+    """
+
+    def __init__(self, window: timedelta, resolution: timedelta):
+        self.window = window.total_seconds()
+        self.resolution = resolution.total_seconds()
+        self._buckets: Deque[List[float]] = deque()  # [bucket_start, count, total], oldest first
+        self._count = 0
+        self._total = 0.0
+
+    def add(self, when: datetime, value: float = 0.0):
+        ts = when.timestamp()
+        start = ts - ts % self.resolution
+        # Entries arrive in time order except while seeding, so search from the newest bucket
+        index = len(self._buckets)
+        while index and self._buckets[index - 1][0] > start:
+            index -= 1
+        if index and self._buckets[index - 1][0] == start:
+            bucket = self._buckets[index - 1]
+            bucket[1] += 1
+            bucket[2] += value
+        else:
+            self._buckets.insert(index, [start, 1, value])
+        self._count += 1
+        self._total += value
+
+    def _evict(self, now: datetime):
+        horizon = now.timestamp() - self.window
+        while self._buckets and self._buckets[0][0] + self.resolution <= horizon:
+            _, count, total = self._buckets.popleft()
+            self._count -= count
+            self._total -= total
+
+    def count(self, now: Optional[datetime] = None) -> int:
+        self._evict(now or datetime.now())
+        return int(self._count)
+
+    def total(self, now: Optional[datetime] = None) -> float:
+        self._evict(now or datetime.now())
+        return self._total if self._buckets else 0.0
+
+
+@dataclass
+class UserComplianceCounters:
+    """Per-user rolling counters, updated as audit entries are logged"""
+    trades: RollingWindow = field(default_factory=lambda: RollingWindow(TRADE_WINDOW, timedelta(minutes=1)))
+    kill_switches: RollingWindow = field(
+        default_factory=lambda: RollingWindow(KILL_SWITCH_WINDOW, timedelta(hours=1))
+    )
+    total_entries: int = 0
+
+    def record(self, action: AuditActionType, timestamp: datetime, metadata: Dict):
+        self.total_entries += 1
+        if action == AuditActionType.TRADE_EXECUTED:
+            self.trades.add(timestamp, float(metadata.get("quantity") or 0))
+        elif action == AuditActionType.KILL_SWITCH_ACTIVATED:
+            self.kill_switches.add(timestamp)
+
+
 class SecurityComplianceService:
     """
     Comprehensive security and compliance management
     """
     
-    def __init__(self):
+    def __init__(self, audit_store: Optional[AuditLogStore] = None):
         self.api_keys: Dict[str, APIKeyCredential] = {}
-        self.audit_logs: List[AuditLogEntry] = []
+        self.audit_store = audit_store or AuditLogStore()
+        self.compliance_counters: Dict[str, UserComplianceCounters] = {}
         self.legal_acknowledgements: Dict[str, UserLegalAcknowledgement] = {}
         self.compliance_alerts: Dict[str, List[str]] = {}
 
@@ -260,13 +334,15 @@ class SecurityComplianceService:
         metadata: Optional[Dict] = None
     ) -> str:
         """Log an auditable action"""
-        log_id = f"audit_{user_id}_{datetime.now().timestamp()}"
+        counters = await self._user_counters(user_id)
+        now = datetime.now()
+        log_id = f"audit_{user_id}_{now.timestamp()}"
         
         entry = AuditLogEntry(
             log_id=log_id,
             user_id=user_id,
             action=action,
-            timestamp=datetime.now(),
+            timestamp=now,
             pair=pair,
             trade_id=trade_id,
             success=success,
@@ -274,7 +350,8 @@ class SecurityComplianceService:
             metadata=metadata or {}
         )
         
-        self.audit_logs.append(entry)
+        self.audit_store.append(entry)  # Written in the background with the next batch
+        counters.record(action, entry.timestamp, entry.metadata)
         
         # Alert on critical actions
         if action in [
@@ -288,6 +365,28 @@ class SecurityComplianceService:
         
         return log_id
 
+    async def _user_counters(self, user_id: str) -> UserComplianceCounters:
+        """A user's rolling counters, rebuilt from the stored audit log the first time"""
+        counters = self.compliance_counters.get(user_id)
+        if counters is None:
+            counters = self.compliance_counters[user_id] = UserComplianceCounters()
+            # Entries logged from here on are recorded live, so only read what came before
+            until = datetime.now()
+            trades = await self.audit_store.query(
+                user_id, since=until - TRADE_WINDOW, until=until,
+                action=AuditActionType.TRADE_EXECUTED.value, limit=None
+            )
+            for l in trades:
+                counters.trades.add(l["timestamp"], float(l["metadata"].get("quantity") or 0))
+            kill_switches = await self.audit_store.query(
+                user_id, since=until - KILL_SWITCH_WINDOW, until=until,
+                action=AuditActionType.KILL_SWITCH_ACTIVATED.value, limit=None
+            )
+            for l in kill_switches:
+                counters.kill_switches.add(l["timestamp"])
+            counters.total_entries += await self.audit_store.count(user_id, until=until)
+        return counters
+
     async def log_trade_execution(
         self,
         user_id: str,
@@ -314,23 +413,17 @@ class SecurityComplianceService:
     async def get_audit_log(self, user_id: str, limit: int = 50, days: int = 30) -> List[Dict]:
         """Get audit log for a user"""
         cutoff_date = datetime.now() - timedelta(days=days)
-        
-        logs = [
-            l for l in self.audit_logs
-            if l.user_id == user_id and l.timestamp > cutoff_date
-        ]
-        
-        logs = sorted(logs, key=lambda x: x.timestamp, reverse=True)[:limit]
+        logs = await self.audit_store.query(user_id, since=cutoff_date, limit=limit)
         
         return [
             {
-                "log_id": l.log_id,
-                "action": l.action.value,
-                "timestamp": l.timestamp.isoformat(),
-                "success": l.success,
-                "pair": l.pair,
-                "trade_id": l.trade_id[:20] + "..." if l.trade_id else None,
-                "error_message": l.error_message,
+                "log_id": l["log_id"],
+                "action": l["action"],
+                "timestamp": l["timestamp"].isoformat(),
+                "success": l["success"],
+                "pair": l["pair"],
+                "trade_id": l["trade_id"][:20] + "..." if l["trade_id"] else None,
+                "error_message": l["error_message"],
             }
             for l in logs
         ]
@@ -427,20 +520,18 @@ class SecurityComplianceService:
 
     async def generate_compliance_report(self, user_id: str) -> Dict:
         """Generate comprehensive compliance report"""
-        logs = [l for l in self.audit_logs if l.user_id == user_id]
+        counters = await self._user_counters(user_id)
         violations = []
         warnings = []
         
         # Check for suspicious patterns
-        trades_today = len([l for l in logs if l.action == AuditActionType.TRADE_EXECUTED and
-                           (datetime.now() - l.timestamp).days == 0])
+        trades_today = counters.trades.count()
         
         if trades_today > 20:
             warnings.append(f"High trade frequency today: {trades_today} trades")
         
         # Check for multiple kill switch activations
-        kill_switches = len([l for l in logs if l.action == AuditActionType.KILL_SWITCH_ACTIVATED and
-                            (datetime.now() - l.timestamp).days <= 7])
+        kill_switches = counters.kill_switches.count()
         
         if kill_switches > 2:
             violations.append("Multiple kill switch activations detected")
@@ -453,7 +544,7 @@ class SecurityComplianceService:
             report_date=datetime.now(),
             status=ComplianceStatus.COMPLIANT if legal_status["compliant"] else ComplianceStatus.WARNING,
             daily_trade_count=trades_today,
-            daily_volume=0,  # Would calculate from trade logs
+            daily_volume=counters.trades.total(),
             unusual_activity=len(warnings) > 0,
             violations_detected=violations,
             warnings=warnings,
@@ -467,6 +558,7 @@ class SecurityComplianceService:
             "report_date": report.report_date.isoformat(),
             "summary": {
                 "daily_trades": report.daily_trade_count,
+                "daily_volume": report.daily_volume,
                 "unusual_activity": report.unusual_activity,
                 "violations": len(report.violations_detected),
                 "warnings": len(report.warnings),
@@ -476,14 +568,19 @@ class SecurityComplianceService:
                 "warnings": report.warnings,
                 "legal_compliant": legal_status["compliant"],
             },
-            "audit_trail_size": len([l for l in logs if l.user_id == user_id]),
+            "audit_trail_size": counters.total_entries,
         }
 
+    def close(self):
+        """Flush queued audit entries to disk (call on shutdown)"""
+        self.audit_store.close()
+
     async def get_security_dashboard(self, user_id: str) -> Dict:
         """Get security & compliance dashboard"""
         api_keys = await self.get_user_api_keys(user_id)
         legal_status = await self.get_legal_status(user_id)
         alerts = self.compliance_alerts.get(user_id, [])
+        counters = await self._user_counters(user_id)
         
         return {
             "security_status": {
@@ -491,6 +588,11 @@ class SecurityComplianceService:
                 "legal_compliant": legal_status["compliant"],
                 "security_alerts": len(alerts),
             },
+            "activity": {
+                "daily_trades": counters.trades.count(),
+                "daily_volume": counters.trades.total(),
+                "kill_switches_7d": counters.kill_switches.count(),
+            },
             "api_keys": api_keys,
             "legal_status": legal_status,
             "recent_alerts": alerts[-5:],  # Last 5 alerts
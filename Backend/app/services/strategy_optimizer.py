@@ -0,0 +1,252 @@
+"""
+Strategy Parameter Sweep Optimizer
+Evaluates grids of signal thresholds over historical bars in a process pool.
+Price arrays are placed in shared memory once per pair, so workers attach
+to them instead of receiving a pickled copy with every task.
+"""
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import asdict, fields
+from multiprocessing import shared_memory
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import itertools
+import math
+import multiprocessing
+import os
+import threading
+
+import numpy as np
+
+from .backtest_engine import BacktestEngine, OHLCData, StrategyParams
+
+
+RANK_METRICS = (
+    "total_profit_loss", "return_percent", "win_rate",
+    "profit_factor", "risk_adjusted_return", "max_drawdown_percent",
+)
+PARALLEL_MIN_COMBINATIONS = 64  # Smaller sweeps run inline
+MAX_GRID_COMBINATIONS = int(os.getenv("OPTIMIZER_MAX_COMBINATIONS", "5000"))
+
+
+def build_grid(
+    ranges: Dict[str, Sequence[float]],
+    max_combinations: int = MAX_GRID_COMBINATIONS
+) -> List[StrategyParams]:
+    """Cartesian product of per-parameter value lists (unlisted parameters keep defaults)"""
+    names = {f.name for f in fields(StrategyParams)}
+    unknown = set(ranges) - names
+    if unknown:
+        raise ValueError(f"Unknown strategy parameters: {', '.join(sorted(unknown))}")
+
+    # Size the product before materializing it
+    combinations = math.prod(len(values) for values in ranges.values())
+    if combinations > max_combinations:
+        raise ValueError(f"Grid has {combinations} combinations (maximum {max_combinations})")
+
+    keys = list(ranges)
+    return [
+        StrategyParams(**dict(zip(keys, values)))
+        for values in itertools.product(*(ranges[k] for k in keys))
+    ]
+
+
+# ============================================================================
+# SHARED-MEMORY PRICE ARRAYS
+# ============================================================================
+
+class SharedPriceArrays:
+    """
+    One pair's close/high/low/timestamps stacked in a shared memory block
+    The owning process creates and unlinks it; workers attach by name.
+    """
+
+    def __init__(self, ohlc: OHLCData):
+        stacked = np.vstack([ohlc.close, ohlc.high, ohlc.low, ohlc.timestamps])
+        self.shape = stacked.shape
+        self.block = shared_memory.SharedMemory(create=True, size=max(stacked.nbytes, 1))
+        np.ndarray(self.shape, dtype=np.float64, buffer=self.block.buf)[:] = stacked
+
+    @property
+    def handle(self) -> Tuple[str, Tuple[int, int]]:
+        """Picklable (name, shape) reference for workers"""
+        return self.block.name, self.shape
+
+    def close(self):
+        self.block.close()
+        self.block.unlink()
+
+
+def _attach(handle: Tuple[str, Tuple[int, int]]) -> Tuple[shared_memory.SharedMemory, OHLCData]:
+    name, shape = handle
+    block = shared_memory.SharedMemory(name=name)
+    arrays = np.ndarray(shape, dtype=np.float64, buffer=block.buf)
+    return block, OHLCData(close=arrays[0], high=arrays[1], low=arrays[2], timestamps=arrays[3])
+
+
+def _result_row(result: Dict) -> Dict:
+    """Flatten a backtest result into one ranking-table row"""
+    summary = result["summary"]
+    performance = summary["performance"]
+    std = performance["return_std_percent"]
+    return {
+        "params": result["params"],
+        "total_trades": performance["total_trades"],
+        "win_rate": performance["win_rate"],
+        "total_profit_loss": performance["total_profit_loss"],
+        "return_percent": summary["balance"]["return_percent"],
+        "max_drawdown_percent": performance["max_drawdown_percent"] or 0.0,
+        "profit_factor": performance["profit_factor"],
+        "risk_adjusted_return": performance["average_return_percent"] / std if std else 0.0,
+    }
+
+
+def evaluate_params(
+    pair: str,
+    ohlc: OHLCData,
+    params: List[Dict],
+    position_size: float,
+    starting_balance: float
+) -> List[Dict]:
+    """Backtest a list of parameter dicts and return ranking rows"""
+    grid = [StrategyParams(**p) for p in params]
+    results = BacktestEngine().run_grid(pair, ohlc, grid, position_size, starting_balance)
+    return [_result_row(result) for result in results]
+
+
+def evaluate_shared_chunk(
+    handle: Tuple[str, Tuple[int, int]],
+    pair: str,
+    params: List[Dict],
+    position_size: float,
+    starting_balance: float
+) -> List[Dict]:
+    """Process-pool entry point: attach to the shared prices and evaluate one chunk"""
+    block, ohlc = _attach(handle)
+    try:
+        return evaluate_params(pair, ohlc, params, position_size, starting_balance)
+    finally:
+        del ohlc
+        block.close()
+
+
+# ============================================================================
+# OPTIMIZER
+# ============================================================================
+
+class StrategyOptimizer:
+    """
+    Parallel parameter sweeps ranked by a chosen metric
+    Each worker computes features once per chunk and evaluates the chunk's
+    parameter sets in one vectorized signal pass.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max_workers or max(1, min(8, os.cpu_count() or 1))
+        self.best_params: Dict[str, StrategyParams] = {}
+        # Spawned once and reused: spawn start-up re-imports numpy and the app
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_lock = threading.Lock()  # Sweeps run in worker threads
+
+    def sweep(
+        self,
+        pair: str,
+        ohlc: OHLCData,
+        grid: List[StrategyParams],
+        metric: str = "total_profit_loss",
+        top: Optional[int] = 20,
+        min_trades: int = 1,
+        position_size: float = 1000.0,
+        starting_balance: float = 10000.0
+    ) -> Dict:
+        """Evaluate every parameter set for one pair and return the ranked table"""
+        if metric not in RANK_METRICS:
+            raise ValueError(f"metric must be one of: {', '.join(RANK_METRICS)}")
+
+        params = [asdict(p) for p in grid]
+        if self.max_workers > 1 and len(params) >= PARALLEL_MIN_COMBINATIONS:
+            rows = self._evaluate_parallel(pair, ohlc, params, position_size, starting_balance)
+        else:
+            rows = evaluate_params(pair, ohlc, params, position_size, starting_balance)
+
+        table = self._rank(rows, metric, min_trades)
+        if table:
+            self.best_params[pair] = StrategyParams(**table[0]["params"])
+
+        return {
+            "success": True,
+            "pair": pair,
+            "bars": len(ohlc),
+            "combinations": len(params),
+            "metric": metric,
+            "results": table[:top] if top else table,
+        }
+
+    def sweep_pairs(self, histories: Dict[str, OHLCData], grid: List[StrategyParams], **options) -> Dict[str, Dict]:
+        """Per-pair sweeps over the same grid"""
+        return {pair: self.sweep(pair, ohlc, grid, **options) for pair, ohlc in histories.items()}
+
+    def _evaluate_parallel(
+        self,
+        pair: str,
+        ohlc: OHLCData,
+        params: List[Dict],
+        position_size: float,
+        starting_balance: float
+    ) -> List[Dict]:
+        shared = SharedPriceArrays(ohlc)
+        chunk_size = max(1, -(-len(params) // (self.max_workers * 4)))
+        chunks = [params[i:i + chunk_size] for i in range(0, len(params), chunk_size)]
+        try:
+            pool = self._get_pool()
+            futures = [
+                pool.submit(evaluate_shared_chunk, shared.handle, pair, chunk, position_size, starting_balance)
+                for chunk in chunks
+            ]
+            rows = []
+            for future in as_completed(futures):
+                rows.extend(future.result())
+            return rows
+        except BrokenProcessPool:
+            print("Optimizer process pool failed; evaluating inline")
+            self.shutdown()  # The next sweep starts a fresh pool
+            return evaluate_params(pair, ohlc, params, position_size, starting_balance)
+        finally:
+            shared.close()
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._pool
+
+    def shutdown(self):
+        """Stop the worker pool (called on app shutdown)"""
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+    def _rank(self, rows: Iterable[Dict], metric: str, min_trades: int) -> List[Dict]:
+        """Sort best-first (lowest drawdown is best); rows below `min_trades` are dropped"""
+        eligible = [row for row in rows if row["total_trades"] >= min_trades]
+        descending = metric != "max_drawdown_percent"
+
+        def key(row):
+            value = row[metric]
+            if value is None:  # Profit factor with no losing trades: unbeatable if it traded at all
+                if not row["total_trades"]:
+                    return (1, 0.0)  # Nothing to rank on; sorts last
+                value = float("inf")
+            return (0, -value if descending else value)
+
+        eligible.sort(key=key)
+        for rank, row in enumerate(eligible, start=1):
+            row["rank"] = rank
+        return eligible
+
+
+# Global optimizer instance
+strategy_optimizer = StrategyOptimizer()
@@ -0,0 +1,192 @@
+"""
+Columnar Trade Ledger
+Append-only trade history stored as NumPy columns with interned pair, user,
+side and status codes, so history stays compact and aggregates vectorize
+"""
+from datetime import datetime
+from typing import Dict, List, Optional
+import numpy as np
+
+
+class _Interner:
+    """Maps repeated strings to small integer codes"""
+
+    def __init__(self):
+        self.values: List[str] = []
+        self.codes: Dict[str, int] = {}
+
+    def code(self, value: str) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self.codes[value] = code
+            self.values.append(value)
+        return code
+
+
+class TradeLedger:
+    """
+    Append-only columnar trade history
+
+    Prices, sizes, P&L and timestamps (epoch seconds) are float64 columns;
+    missing values are NaN. Pair, user, side and status are interned int32
+    codes. Columns grow by doubling, so appends are amortized O(1).
+    """
+
+    FLOAT_COLUMNS = (
+        "entry_price", "exit_price", "position_size",
+        "profit_loss", "profit_loss_percent", "entry_time", "exit_time",
+    )
+    CODE_COLUMNS = ("user_id", "pair", "action", "status")
+
+    def __init__(self, capacity: int = 16):
+        self._size = 0
+        self._capacity = max(1, capacity)
+        self._columns: Dict[str, np.ndarray] = {
+            name: np.empty(self._capacity, dtype=np.float64) for name in self.FLOAT_COLUMNS
+        }
+        self._columns.update({
+            name: np.empty(self._capacity, dtype=np.int32) for name in self.CODE_COLUMNS
+        })
+        self._interners: Dict[str, _Interner] = {name: _Interner() for name in self.CODE_COLUMNS}
+        self.trade_ids: List[str] = []
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _grow(self):
+        self._capacity *= 2
+        for name, column in self._columns.items():
+            grown = np.empty(self._capacity, dtype=column.dtype)
+            grown[:self._size] = column[:self._size]
+            self._columns[name] = grown
+
+    def append(
+        self,
+        trade_id: str,
+        user_id: str,
+        pair: str,
+        action: str,
+        entry_price: float,
+        position_size: float,
+        entry_time: datetime,
+        status: str,
+        exit_price: Optional[float] = None,
+        exit_time: Optional[datetime] = None,
+        profit_loss: Optional[float] = None,
+        profit_loss_percent: Optional[float] = None
+    ) -> int:
+        """Record one trade and return its row index"""
+        if self._size == self._capacity:
+            self._grow()
+
+        row = self._size
+        values = {
+            "entry_price": entry_price,
+            "exit_price": exit_price,
+            "position_size": position_size,
+            "profit_loss": profit_loss,
+            "profit_loss_percent": profit_loss_percent,
+            "entry_time": entry_time.timestamp() if entry_time else None,
+            "exit_time": exit_time.timestamp() if exit_time else None,
+        }
+        for name, value in values.items():
+            self._columns[name][row] = np.nan if value is None else value
+
+        codes = {"user_id": user_id, "pair": pair, "action": action, "status": status}
+        for name, value in codes.items():
+            self._columns[name][row] = self._interners[name].code(value)
+
+        self.trade_ids.append(trade_id)
+        self._size += 1
+        return row
+
+    def column(self, name: str) -> np.ndarray:
+        """Read-only view of a column's recorded rows"""
+        view = self._columns[name][:self._size]
+        view.flags.writeable = False
+        return view
+
+    def mask(
+        self,
+        user_id: Optional[str] = None,
+        pair: Optional[str] = None,
+        action: Optional[str] = None,
+        status: Optional[str] = None
+    ) -> np.ndarray:
+        """Boolean row mask for the given filters (all rows when none are given)"""
+        selected = np.ones(self._size, dtype=bool)
+        for name, value in (("user_id", user_id), ("pair", pair), ("action", action), ("status", status)):
+            if value is None:
+                continue
+            code = self._interners[name].codes.get(value)
+            if code is None:
+                return np.zeros(self._size, dtype=bool)
+            selected &= self._columns[name][:self._size] == code
+        return selected
+
+    def count(self, **filters) -> int:
+        """Number of rows matching `mask(**filters)`"""
+        return int(np.count_nonzero(self.mask(**filters)))
+
+    def row(self, index: int) -> Dict:
+        """One trade as a dict (NaN columns become None, times become datetimes)"""
+        record = {"trade_id": self.trade_ids[index]}
+        for name in self.CODE_COLUMNS:
+            record[name] = self._interners[name].values[self._columns[name][index]]
+        for name in self.FLOAT_COLUMNS:
+            value = float(self._columns[name][index])
+            if np.isnan(value):
+                value = None
+            elif name.endswith("_time"):
+                value = datetime.fromtimestamp(value)
+            record[name] = value
+        return record
+
+    def rows(self, mask: Optional[np.ndarray] = None) -> List[Dict]:
+        """Trades as dicts, optionally restricted to a mask"""
+        indices = range(self._size) if mask is None else np.flatnonzero(mask)
+        return [self.row(int(i)) for i in indices]
+
+    def summary(self, mask: Optional[np.ndarray] = None, starting_balance: Optional[float] = None) -> Dict:
+        """
+        Vectorized performance statistics over closed trades (rows with P&L)
+        Drawdown follows the equity curve in ledger (close) order; the percent
+        variant needs `starting_balance`.
+        """
+        pnl = self._columns["profit_loss"][:self._size]
+        returns = self._columns["profit_loss_percent"][:self._size]
+        if mask is not None:
+            pnl, returns = pnl[mask], returns[mask]
+        settled = ~np.isnan(pnl)
+        pnl, returns = pnl[settled], returns[settled]
+
+        count = len(pnl)
+        wins = pnl[pnl > 0]
+        losses = pnl[pnl <= 0]
+        gross_loss = float(-losses.sum())
+
+        equity = np.concatenate(([0.0], np.cumsum(pnl))) + (starting_balance or 0.0)
+        peaks = np.maximum.accumulate(equity)
+        drawdowns = peaks - equity
+        max_drawdown = float(drawdowns.max()) if count else 0.0
+        drawdown_percent = None
+        if starting_balance:
+            ratios = np.divide(drawdowns, peaks, out=np.zeros_like(drawdowns), where=peaks > 0)
+            drawdown_percent = float(ratios.max() * 100)
+
+        returns = returns[~np.isnan(returns)]
+        return {
+            "total_trades": count,
+            "winning_trades": len(wins),
+            "losing_trades": len(losses),
+            "win_rate": (len(wins) / count * 100) if count else 0.0,
+            "total_profit_loss": float(pnl.sum()),
+            "average_win": float(wins.mean()) if len(wins) else 0.0,
+            "average_loss": float(losses.mean()) if len(losses) else 0.0,
+            "profit_factor": float(wins.sum() / gross_loss) if gross_loss > 0 else None,
+            "max_drawdown": max_drawdown,
+            "max_drawdown_percent": drawdown_percent,
+            "average_return_percent": float(returns.mean()) if len(returns) else 0.0,
+            "return_std_percent": float(returns.std()) if len(returns) > 1 else 0.0,
+        }
@@ -1,19 +1,32 @@
 import asyncio
 from datetime import datetime
+from typing import Optional
 from .forex_data_service import ForexDataService
 from .ai_analysis_service import AIAnalysisService
 from .notification_service import NotificationService, NotificationType
+from .market_data_bus import MarketDataBus, Tick, market_data_bus
+from .price_trigger_index import ABOVE, BELOW, PriceTriggerIndex
 
 class TradingBotService:
     """
     Manages automated trading logic, including execution, monitoring,
     and risk management.
     """
-    def __init__(self, forex_service: ForexDataService, ai_service: AIAnalysisService, notification_service: NotificationService):
+    def __init__(
+        self,
+        forex_service: ForexDataService,
+        ai_service: AIAnalysisService,
+        notification_service: NotificationService,
+        tick_bus: Optional[MarketDataBus] = None
+    ):
         self._forex_service = forex_service
         self._ai_service = ai_service
         self._notification_service = notification_service
         self._active_trades = {}  # Stores and tracks active trades
+        # Process-wide tick bus: one price producer per pair, shared with every other monitor
+        self._tick_bus = tick_bus or market_data_bus
+        self._triggers = PriceTriggerIndex()  # Stop-loss / take-profit levels by pair
+        self._pair_subscriptions = {}  # {currency_pair: (bus token, active trade count)}
 
     async def execute_trade(self, user_id: str, trade_params: dict):
         """
@@ -66,8 +79,8 @@ class TradingBotService:
         
         self._active_trades[trade_id] = trade_details
 
-        # Start monitoring this trade in the background
-        asyncio.create_task(self._monitor_trade(trade_id))
+        # Watch this trade's levels on its pair's ticks
+        self._monitor_trade(trade_id)
 
         await self._notification_service.send_notification(
             user_id,
@@ -77,55 +90,67 @@ class TradingBotService:
 
         return {"success": True, "trade": trade_details}
 
-    async def _monitor_trade(self, trade_id: str):
+    def _monitor_trade(self, trade_id: str):
         """
         Monitors an active trade for stop-loss or take-profit triggers.
-        Runs as a background task.
+        Registers its levels and subscribes to the pair's ticks (once per pair).
         """
         trade = self._active_trades.get(trade_id)
         if not trade:
             return
 
-        user_id = trade["user_id"]
         currency_pair = trade["currency_pair"]
-        action = trade["action"]
-        stop_loss = trade["stop_loss"]
-        take_profit = trade["take_profit"]
+        if trade["action"] == "buy":
+            self._triggers.add(currency_pair, trade_id, trade["stop_loss"], BELOW)
+            self._triggers.add(currency_pair, trade_id, trade["take_profit"], ABOVE)
+        else:
+            self._triggers.add(currency_pair, trade_id, trade["stop_loss"], ABOVE)
+            self._triggers.add(currency_pair, trade_id, trade["take_profit"], BELOW)
+
+        token, count = self._pair_subscriptions.get(currency_pair, (None, 0))
+        if token is None:
+            # The shared feed only quotes the USD majors; other pairs poll the bot's own source
+            token = self._tick_bus.subscribe(
+                currency_pair, self._on_tick, fallback_source=self._forex_service.get_realtime_price
+            )
+        self._pair_subscriptions[currency_pair] = (token, count + 1)
 
         print(f"Monitoring trade {trade_id} for {currency_pair}...")
 
-        while trade["status"] == "active":
-            await asyncio.sleep(15) # Check every 15 seconds. In production, use WebSockets for live ticks.
+    def _unmonitor_trade(self, trade_id: str, currency_pair: str):
+        """Drops a trade's levels and the pair subscription once no trade needs it."""
+        self._triggers.discard(trade_id)
+        token, count = self._pair_subscriptions.get(currency_pair, (None, 0))
+        if token is None:
+            return
+        if count <= 1:
+            del self._pair_subscriptions[currency_pair]
+            self._tick_bus.unsubscribe(currency_pair, token)
+        else:
+            self._pair_subscriptions[currency_pair] = (token, count - 1)
 
-            live_price_data = await self._forex_service.get_realtime_price(currency_pair)
-            if not live_price_data:
+    async def _on_tick(self, tick: Tick):
+        """
+        Closes every trade on the tick's pair whose stop-loss or take-profit was crossed.
+        Only trades with crossed levels are visited.
+        """
+        current_price = tick.price
+        for trade_id in self._triggers.pop_triggered(tick.pair, current_price):
+            trade = self._active_trades.get(trade_id)
+            if not trade or trade["status"] != "active":
                 continue
 
-            current_price = live_price_data['price']
-            
-            # --- Check for stop-loss or take-profit ---
-            closed = False
-            close_reason = ""
-            
-            if action == "buy":
-                if current_price <= stop_loss:
-                    closed = True
-                    close_reason = f"Stop-loss triggered at {current_price}"
-                elif current_price >= take_profit:
-                    closed = True
-                    close_reason = f"Take-profit triggered at {current_price}"
-            
-            elif action == "sell":
-                if current_price >= stop_loss:
-                    closed = True
-                    close_reason = f"Stop-loss triggered at {current_price}"
-                elif current_price <= take_profit:
-                    closed = True
-                    close_reason = f"Take-profit triggered at {current_price}"
-
-            if closed:
-                await self.close_trade(trade_id, close_reason, current_price)
-                break
+            # --- Stop-loss takes precedence over take-profit ---
+            if trade["action"] == "buy":
+                stopped = current_price <= trade["stop_loss"]
+            else:
+                stopped = current_price >= trade["stop_loss"]
+
+            if stopped:
+                close_reason = f"Stop-loss triggered at {current_price}"
+            else:
+                close_reason = f"Take-profit triggered at {current_price}"
+            await self.close_trade(trade_id, close_reason, current_price)
     
     async def close_trade(self, trade_id: str, reason: str, close_price: float):
         """
@@ -136,6 +161,7 @@ class TradingBotService:
             return
 
         trade["status"] = "closed"
+        self._unmonitor_trade(trade_id, trade["currency_pair"])
         trade["close_price"] = close_price
         trade["close_reason"] = reason
         trade["close_timestamp"] = datetime.now()
@@ -159,10 +185,8 @@ class TradingBotService:
         
         # Here you might save the closed trade to a database
         
-        # Remove from active trades after a delay to ensure no more monitoring
-        await asyncio.sleep(5)
-        if trade_id in self._active_trades:
-            del self._active_trades[trade_id]
+        # Its levels are already out of the trigger index, so no tick can reach it
+        self._active_trades.pop(trade_id, None)
 
 async def main():
     """ Test function for TradingBotService. """
@@ -183,7 +207,8 @@ async def main():
     forex = MockForex()
     ai = MockAI()
     notify = MockNotify()
-    bot = TradingBotService(forex, ai, notify)
+    # Private bus fed by the mock prices, so the demo stays off the shared live feed
+    bot = TradingBotService(forex, ai, notify, tick_bus=MarketDataBus(forex.get_realtime_price, interval=2))
     
     # --- Test Trade Execution ---
     print("--- Executing a test trade ---")
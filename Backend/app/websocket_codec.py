@@ -0,0 +1,150 @@
+"""
+WebSocket Update Encodings
+Clients pick a compact encoding through the WebSocket subprotocol; everyone
+else keeps the JSON envelope (string id, ISO timestamp).
+
+Compact encodings use monotonic integer ids and epoch-millisecond timestamps:
+- tajir.msgpack.v1: every message as MessagePack (needs the `msgpack` package)
+- tajir.binary.v1: forex snapshots/deltas in the fixed binary tick layout
+  below, everything else as compact JSON text
+"""
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Union
+import itertools
+import json
+import struct
+import uuid
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    msgpack = None
+    MSGPACK_AVAILABLE = False
+
+
+JSON_ENCODING = "json"
+MSGPACK_SUBPROTOCOL = "tajir.msgpack.v1"
+BINARY_SUBPROTOCOL = "tajir.binary.v1"
+
+TICK_TYPES = {"forex_snapshot": 1, "forex_delta": 2}
+
+# Binary tick layout (little-endian):
+#   header  <B version><B kind><I seq><q timestamp_ms><H pair_count>
+#   pairs   pair_count x (<B name_len><name ascii><d price>)
+#   extras  <I extras_len><extras: compact JSON of removed/news/sentiment>
+TICK_VERSION = 1
+_TICK_HEADER = struct.Struct("<BBIqH")
+_PRICE = struct.Struct("<d")
+_LENGTH = struct.Struct("<I")
+
+_message_ids = itertools.count(1)
+
+Payload = Union[str, bytes]
+
+
+def next_message_id() -> int:
+    """Monotonic per-process message id (replaces uuid4 in compact encodings)"""
+    return next(_message_ids)
+
+
+def epoch_millis(moment: Optional[datetime] = None) -> int:
+    return int((moment or datetime.now()).timestamp() * 1000)
+
+
+def supported_subprotocols() -> List[str]:
+    """Compact encodings this server can speak, in preference order"""
+    if MSGPACK_AVAILABLE:
+        return [MSGPACK_SUBPROTOCOL, BINARY_SUBPROTOCOL]
+    return [BINARY_SUBPROTOCOL]
+
+
+def negotiate(requested: Iterable[str]) -> Optional[str]:
+    """First subprotocol the client offered that the server supports"""
+    supported = supported_subprotocols()
+    for subprotocol in requested:
+        if subprotocol in supported:
+            return subprotocol
+    return None
+
+
+def _compact_timestamp(message: Dict) -> Dict:
+    timestamp = message.get("timestamp")
+    if isinstance(timestamp, str):
+        try:
+            return {**message, "timestamp": epoch_millis(datetime.fromisoformat(timestamp))}
+        except ValueError:
+            pass
+    return message
+
+
+def _json(message: Dict) -> str:
+    return json.dumps(message, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def _legacy_envelope(message: Dict) -> Dict:
+    """Envelope as JSON clients know it: uuid string id and ISO timestamp"""
+    return {
+        **message,
+        "id": str(uuid.uuid4()),
+        "timestamp": datetime.fromtimestamp(message["timestamp"] / 1000).isoformat(),
+    }
+
+
+def pack_tick(message: Dict) -> bytes:
+    """Encode a forex snapshot/delta in the fixed binary tick layout"""
+    message = _compact_timestamp(message)
+    rates = {pair: price for pair, price in (message.get("rates") or {}).items() if price is not None}
+
+    parts = [_TICK_HEADER.pack(
+        TICK_VERSION,
+        TICK_TYPES[message["type"]],
+        message.get("seq", 0),
+        message.get("timestamp") or 0,
+        len(rates)
+    )]
+    for pair, price in rates.items():
+        name = pair.encode("ascii")
+        parts.append(bytes((len(name),)) + name + _PRICE.pack(price))
+
+    extras = {key: message[key] for key in ("removed", "news", "sentiment") if key in message}
+    extras_bytes = _json(extras).encode("utf-8") if extras else b""
+    parts.append(_LENGTH.pack(len(extras_bytes)) + extras_bytes)
+    return b"".join(parts)
+
+
+def unpack_tick(payload: bytes) -> Dict:
+    """Decode a binary tick (reference implementation for clients and tests)"""
+    version, kind, seq, timestamp, count = _TICK_HEADER.unpack_from(payload, 0)
+    offset = _TICK_HEADER.size
+    rates = {}
+    for _ in range(count):
+        length = payload[offset]
+        pair = payload[offset + 1:offset + 1 + length].decode("ascii")
+        offset += 1 + length
+        rates[pair] = _PRICE.unpack_from(payload, offset)[0]
+        offset += _PRICE.size
+
+    (extras_length,) = _LENGTH.unpack_from(payload, offset)
+    offset += _LENGTH.size
+    extras = json.loads(payload[offset:offset + extras_length]) if extras_length else {}
+
+    kinds = {code: name for name, code in TICK_TYPES.items()}
+    return {"type": kinds[kind], "seq": seq, "timestamp": timestamp, "rates": rates, **extras}
+
+
+def encode(message: Dict, encoding: str, envelope: bool = False) -> Payload:
+    """
+    Encode one outbound message
+    `envelope` marks task/broadcast updates built with an integer id and
+    epoch-millisecond timestamp; JSON clients get them in legacy form.
+    """
+    if encoding == MSGPACK_SUBPROTOCOL:
+        return msgpack.packb(_compact_timestamp(message), default=str)
+    if encoding == BINARY_SUBPROTOCOL:
+        if message.get("type") in TICK_TYPES:
+            return pack_tick(message)
+        return _json(_compact_timestamp(message))
+    if envelope:
+        return _json(_legacy_envelope(message))
+    return _json(message)
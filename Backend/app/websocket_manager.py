@@ -1,16 +1,38 @@
 from fastapi import WebSocket, WebSocketDisconnect
-from typing import Dict, Set
+from typing import Dict, Optional, Set
 import json
 import asyncio
 from datetime import datetime
 import uuid
 
+from .websocket_outbound import (
+    OutboundConnection,
+    OutboundStats,
+    OverflowPolicy,
+    DEFAULT_MAX_QUEUE,
+    DEFAULT_SEND_TIMEOUT,
+    DEFAULT_OVERFLOW_POLICY
+)
+
 class ConnectionManager:
-    def __init__(self):
+    def __init__(
+        self,
+        max_queue: int = DEFAULT_MAX_QUEUE,
+        send_timeout: float = DEFAULT_SEND_TIMEOUT,
+        overflow_policy: OverflowPolicy = DEFAULT_OVERFLOW_POLICY
+    ):
         # Map of task_id to set of WebSocket connections
         self.active_connections: Dict[str, Set[WebSocket]] = {}
         # Map of WebSocket to task_id for cleanup
         self.connection_tasks: Dict[WebSocket, str] = {}
+        # Per-socket outbound queue + writer task
+        self.outbound: Dict[WebSocket, OutboundConnection] = {}
+
+        self.max_queue = max_queue
+        self.send_timeout = send_timeout
+        self.overflow_policy = overflow_policy
+        self.slow_clients_disconnected = 0
+        self.released_stats = OutboundStats()
     
     async def connect(self, websocket: WebSocket, task_id: str):
         """Connect a client to a specific task's updates"""
@@ -21,11 +43,26 @@ class ConnectionManager:
         
         self.active_connections[task_id].add(websocket)
         self.connection_tasks[websocket] = task_id
+
+        connection = OutboundConnection(
+            websocket,
+            max_queue=self.max_queue,
+            send_timeout=self.send_timeout,
+            overflow_policy=self.overflow_policy,
+            on_failure=self._on_send_failure
+        )
+        self.outbound[websocket] = connection
+        connection.start()
         
         print(f"Client connected to task {task_id}. Total connections: {len(self.active_connections[task_id])}")
     
     def disconnect(self, websocket: WebSocket):
         """Disconnect a client and cleanup"""
+        connection = self.outbound.pop(websocket, None)
+        if connection:
+            connection.stop()
+            self.released_stats.add(connection.stats)
+
         if websocket in self.connection_tasks:
             task_id = self.connection_tasks[websocket]
             
@@ -39,25 +76,55 @@ class ConnectionManager:
             del self.connection_tasks[websocket]
             print(f"Client disconnected from task {task_id}")
     
-    async def send_update(self, task_id: str, update: dict):
-        """Send an update to all clients subscribed to a task"""
+    async def send_update(self, task_id: str, update: dict, coalesce_key: Optional[str] = None):
+        """
+        Queue an update for all clients subscribed to a task
+        Never waits on a client; queued updates sharing `coalesce_key` are
+        replaced by the newest one.
+        """
         if task_id not in self.active_connections:
             return
-        
-        # Create list of connections to avoid modification during iteration
-        connections = list(self.active_connections[task_id])
-        disconnected = []
-        
-        for connection in connections:
-            try:
-                await connection.send_json(update)
-            except Exception as e:
-                print(f"Error sending to connection: {e}")
-                disconnected.append(connection)
-        
-        # Clean up disconnected clients
-        for connection in disconnected:
-            self.disconnect(connection)
+
+        text = json.dumps(update, default=str)
+        slow_clients = [
+            websocket for websocket in self.active_connections[task_id]
+            if not self._enqueue(websocket, text, coalesce_key)
+        ]
+
+        # Disconnect clients that can't keep up
+        for websocket in slow_clients:
+            self._drop_slow_client(websocket)
+
+    async def send_personal(self, websocket: WebSocket, update: dict):
+        """Queue an update for a single client"""
+        if not self._enqueue(websocket, json.dumps(update, default=str)):
+            self._drop_slow_client(websocket)
+
+    async def send_text(self, websocket: WebSocket, text: str):
+        """Queue raw text (e.g. heartbeat replies) for a single client"""
+        if not self._enqueue(websocket, text):
+            self._drop_slow_client(websocket)
+
+    def _enqueue(self, websocket: WebSocket, text: str, coalesce_key: Optional[str] = None) -> bool:
+        connection = self.outbound.get(websocket)
+        return connection is None or connection.enqueue(text, coalesce_key)
+
+    def _drop_slow_client(self, websocket: WebSocket):
+        self.slow_clients_disconnected += 1
+        print("Dropping slow client: outbound queue full")
+        self.disconnect(websocket)
+        asyncio.create_task(self._close_quietly(websocket, code=1013))
+
+    async def _on_send_failure(self, websocket: WebSocket, reason: str):
+        print(f"Error sending to connection: {reason}")
+        self.disconnect(websocket)
+        await self._close_quietly(websocket, code=1011)
+
+    async def _close_quietly(self, websocket: WebSocket, code: int = 1000):
+        try:
+            await websocket.close(code=code)
+        except Exception:
+            pass
     
     async def broadcast_update(self, update: dict):
         """Broadcast an update to all connected clients"""
@@ -68,6 +135,27 @@ class ConnectionManager:
         """Get the number of active connections for a task"""
         return len(self.active_connections.get(task_id, set()))
 
+    def get_delivery_stats(self) -> Dict:
+        """Outbound queue depth, drop and coalescing statistics"""
+        totals = OutboundStats()
+        totals.add(self.released_stats)
+        depths = []
+        for connection in self.outbound.values():
+            totals.add(connection.stats)
+            depths.append(connection.qsize())
+        return {
+            "connections": len(self.connection_tasks),
+            "queued_messages": sum(depths),
+            "max_queue_depth": max(depths, default=0),
+            "queue_capacity": self.max_queue,
+            "overflow_policy": self.overflow_policy.value,
+            "messages_enqueued": totals.enqueued,
+            "messages_sent": totals.sent,
+            "messages_coalesced": totals.coalesced,
+            "messages_dropped": totals.dropped,
+            "slow_clients_disconnected": self.slow_clients_disconnected,
+        }
+
 
 class LiveUpdateService:
     def __init__(self, manager: ConnectionManager):
@@ -91,9 +179,17 @@ class LiveUpdateService:
     
     async def send_progress(self, task_id: str, message: str, progress: float):
         """Send a progress update"""
-        await self._send_update(task_id, message, "progress", progress)
+        # A newer progress value supersedes any still queued for slow clients
+        await self._send_update(task_id, message, "progress", progress, coalesce_key="progress")
     
-    async def _send_update(self, task_id: str, message: str, update_type: str, progress: float = None):
+    async def _send_update(
+        self,
+        task_id: str,
+        message: str,
+        update_type: str,
+        progress: float = None,
+        coalesce_key: Optional[str] = None
+    ):
         """Internal method to send updates"""
         update = {
             "id": str(uuid.uuid4()),
@@ -104,7 +200,7 @@ class LiveUpdateService:
             "progress": progress
         }
         
-        await self.manager.send_update(task_id, update)
+        await self.manager.send_update(task_id, update, coalesce_key)
 
 
 # Global instance
@@ -0,0 +1,161 @@
+"""
+Per-Socket Outbound Delivery
+Each WebSocket gets a bounded outbound queue drained by its own writer task,
+so producers never await a client's network I/O
+"""
+from fastapi import WebSocket
+from collections import deque
+from dataclasses import dataclass
+from enum import Enum
+from typing import Awaitable, Callable, Deque, Dict, Optional, Union
+import asyncio
+import os
+
+
+class OverflowPolicy(Enum):
+    """What to do when a client's outbound queue is full"""
+    DISCONNECT = "disconnect"  # Shed the slow client entirely
+    DROP_OLDEST = "drop_oldest"  # Keep the freshest messages
+    DROP_NEWEST = "drop_newest"  # Keep what is already queued
+
+
+@dataclass
+class OutboundStats:
+    """Delivery counters for one socket (or aggregated across sockets)"""
+    enqueued: int = 0
+    sent: int = 0
+    coalesced: int = 0
+    dropped: int = 0
+
+    def add(self, other: "OutboundStats"):
+        self.enqueued += other.enqueued
+        self.sent += other.sent
+        self.coalesced += other.coalesced
+        self.dropped += other.dropped
+
+
+class _Pending:
+    """Queued message; `payload` is replaced in place when a newer message supersedes it"""
+    __slots__ = ("payload", "key")
+
+    def __init__(self, payload: Union[str, bytes], key: Optional[str]):
+        self.payload = payload
+        self.key = key
+
+
+class OutboundConnection:
+    """
+    Bounded outbound queue plus writer task for one WebSocket
+    Producers call `enqueue()` (non-blocking) with pre-serialized text or bytes.
+    Messages sharing a `coalesce_key` replace each other while still queued,
+    so a slow client only ever receives the latest one. When the queue is
+    full, `overflow_policy` decides between dropping and disconnecting;
+    a send exceeding `send_timeout` is reported through `on_failure`.
+    """
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        max_queue: int = 100,
+        send_timeout: float = 5.0,
+        overflow_policy: OverflowPolicy = OverflowPolicy.DISCONNECT,
+        on_failure: Optional[Callable[[WebSocket, str], Awaitable[None]]] = None
+    ):
+        self.websocket = websocket
+        self.max_queue = max_queue
+        self.send_timeout = send_timeout
+        self.overflow_policy = overflow_policy
+        self.on_failure = on_failure
+        self.closed = False
+        self.stats = OutboundStats()
+
+        self._pending: Deque[_Pending] = deque()
+        self._by_key: Dict[str, _Pending] = {}
+        self._ready = asyncio.Event()
+        self._writer: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Start the writer task"""
+        if self._writer is None:
+            self._writer = asyncio.create_task(self._run())
+
+    def qsize(self) -> int:
+        return len(self._pending)
+
+    def enqueue(self, payload: Union[str, bytes], coalesce_key: Optional[str] = None) -> bool:
+        """
+        Queue a serialized message
+        Returns False only when the client is closed or should be disconnected.
+        """
+        if self.closed:
+            return False
+
+        if coalesce_key is not None:
+            queued = self._by_key.get(coalesce_key)
+            if queued is not None:
+                queued.payload = payload
+                self.stats.coalesced += 1
+                return True
+
+        if len(self._pending) >= self.max_queue:
+            if self.overflow_policy == OverflowPolicy.DISCONNECT:
+                return False
+            self.stats.dropped += 1
+            if self.overflow_policy == OverflowPolicy.DROP_NEWEST:
+                return True
+            oldest = self._pending.popleft()
+            if oldest.key is not None and self._by_key.get(oldest.key) is oldest:
+                del self._by_key[oldest.key]
+
+        pending = _Pending(payload, coalesce_key)
+        self._pending.append(pending)
+        if coalesce_key is not None:
+            self._by_key[coalesce_key] = pending
+        self.stats.enqueued += 1
+        self._ready.set()
+        return True
+
+    async def _run(self):
+        try:
+            while True:
+                if not self._pending:
+                    self._ready.clear()
+                    await self._ready.wait()
+                    continue
+
+                pending = self._pending.popleft()
+                if pending.key is not None and self._by_key.get(pending.key) is pending:
+                    del self._by_key[pending.key]
+
+                if isinstance(pending.payload, bytes):
+                    send = self.websocket.send_bytes(pending.payload)
+                else:
+                    send = self.websocket.send_text(pending.payload)
+                await asyncio.wait_for(send, self.send_timeout)
+                self.stats.sent += 1
+        except asyncio.CancelledError:
+            raise
+        except asyncio.TimeoutError:
+            await self._fail("send timeout")
+        except Exception as e:
+            await self._fail(str(e) or type(e).__name__)
+
+    async def _fail(self, reason: str):
+        self.closed = True
+        if self.on_failure:
+            await self.on_failure(self.websocket, reason)
+
+    def stop(self):
+        """Stop the writer task and discard pending messages"""
+        self.closed = True
+        self.stats.dropped += len(self._pending)
+        self._pending.clear()
+        self._by_key.clear()
+        if self._writer and not self._writer.done() and self._writer is not asyncio.current_task():
+            self._writer.cancel()
+
+
+# Defaults shared by the WebSocket managers (configurable via environment)
+DEFAULT_MAX_QUEUE = int(os.getenv("WS_MAX_QUEUE", "100"))
+DEFAULT_SEND_TIMEOUT = float(os.getenv("WS_SEND_TIMEOUT_SECONDS", "5"))
+DEFAULT_OVERFLOW_POLICY = OverflowPolicy(os.getenv("WS_OVERFLOW_POLICY", OverflowPolicy.DISCONNECT.value))
@@ -8,6 +8,8 @@ import asyncio
 
 from .enhanced_websocket_manager import ws_manager
 from .forex_data_service import forex_service
+from .rate_cache import rate_cache
+from .websocket_codec import negotiate
 
 router = APIRouter(prefix="/api", tags=["Live Updates"])
 
@@ -23,20 +25,41 @@ class UpdateRequest(BaseModel):
 # WebSocket Endpoint
 # ============================================================================
 
+async def handle_forex_command(websocket: WebSocket, data: str) -> bool:
+    """
+    Forex delta protocol commands; returns True when `data` was one
+    - "forex:delta": switch to snapshot + sequenced per-pair deltas
+    - "resync": request a fresh snapshot after a sequence gap
+    """
+    if data == "forex:delta":
+        await ws_manager.enable_forex_deltas(websocket)
+        return True
+    if data == "resync":
+        await ws_manager.send_forex_snapshot(websocket)
+        return True
+    return False
+
+
 @router.websocket("/ws/{task_id}")
-async def websocket_endpoint(websocket: WebSocket, task_id: str):
+async def websocket_endpoint(websocket: WebSocket, task_id: str, forex: str = "full"):
     """
     WebSocket endpoint for real-time updates for a specific task.
 
     Connect to: ws://localhost:8080/api/ws/{task_id}
+    Add ?forex=delta to receive a forex snapshot followed by per-pair deltas.
+    Offer the "tajir.msgpack.v1" or "tajir.binary.v1" subprotocol for compact
+    encodings (integer ids and epoch-millisecond timestamps).
     """
-    await ws_manager.connect(websocket, task_id)
+    subprotocol = negotiate(websocket.scope.get("subprotocols", []))
+    await ws_manager.connect(websocket, task_id, subprotocol=subprotocol)
     try:
+        if forex == "delta":
+            await ws_manager.enable_forex_deltas(websocket)
         while True:
             data = await websocket.receive_text()
             if data == "ping":
-                await websocket.send_text("pong")
-            else:
+                await ws_manager.send_text(websocket, "pong")
+            elif not await handle_forex_command(websocket, data):
                 await ws_manager.send_update(
                     task_id=task_id,
                     message=f"Received: {data}",
@@ -44,30 +67,35 @@ async def websocket_endpoint(websocket: WebSocket, task_id: str):
                     websocket=websocket
                 )
     except WebSocketDisconnect:
-        ws_manager.disconnect(websocket, task_id)
+        ws_manager.disconnect_all(websocket)
     except Exception as e:
         print(f"WebSocket error for task {task_id}: {e}")
-        ws_manager.disconnect(websocket, task_id)
+        ws_manager.disconnect_all(websocket)
 
 
 @router.websocket("/ws")
-async def websocket_global(websocket: WebSocket):
+async def websocket_global(websocket: WebSocket, forex: str = "full"):
     """
     Global WebSocket endpoint for broadcasts.
 
     Connect to: ws://localhost:8080/api/ws
+    Add ?forex=delta to receive a forex snapshot followed by per-pair deltas.
     """
     await ws_manager.connect(websocket, "global")
     try:
+        if forex == "delta":
+            await ws_manager.enable_forex_deltas(websocket)
         while True:
             data = await websocket.receive_text()
             if data == "ping":
-                await websocket.send_text("pong")
+                await ws_manager.send_text(websocket, "pong")
+            else:
+                await handle_forex_command(websocket, data)
     except WebSocketDisconnect:
-        ws_manager.disconnect(websocket, "global")
+        ws_manager.disconnect_all(websocket)
     except Exception as e:
         print(f"Global WebSocket error: {e}")
-        ws_manager.disconnect(websocket, "global")
+        ws_manager.disconnect_all(websocket)
 
 
 # ============================================================================
@@ -91,7 +119,8 @@ async def get_all_connections():
     """Get total number of active WebSocket connections."""
     return {
         "total_connections": ws_manager.get_connection_count(),
-        "tasks": list(ws_manager.active_connections.keys())
+        "tasks": list(ws_manager.active_connections.keys()),
+        "delivery": ws_manager.get_delivery_stats()
     }
 
 
@@ -116,34 +145,28 @@ async def stop_forex_stream():
 @router.get("/forex/rates")
 async def get_forex_rates():
     """Get current forex exchange rates."""
-    try:
-        await forex_service.initialize()
-        rates = await forex_service.get_currency_rates()
-        return {"status": "success", "rates": rates}
-    finally:
-        await forex_service.close()
+    rates = await forex_service.get_currency_rates()
+    return {"status": "success", "rates": rates}
 
 
 @router.get("/forex/news")
 async def get_forex_news():
     """Get latest forex news and economic calendar."""
-    try:
-        await forex_service.initialize()
-        news = await forex_service.get_forex_factory_news()
-        return {"status": "success", "news": news}
-    finally:
-        await forex_service.close()
+    news = await forex_service.get_forex_factory_news()
+    return {"status": "success", "news": news}
 
 
 @router.get("/forex/sentiment")
 async def get_market_sentiment():
     """Get current market sentiment analysis."""
-    try:
-        await forex_service.initialize()
-        sentiment = await forex_service.get_market_sentiment()
-        return {"status": "success", "sentiment": sentiment}
-    finally:
-        await forex_service.close()
+    sentiment = await forex_service.get_market_sentiment()
+    return {"status": "success", "sentiment": sentiment}
+
+
+@router.get("/forex/cache-stats")
+async def get_rate_cache_stats():
+    """Get exchange-rate cache hit/miss statistics."""
+    return {"status": "success", "cache": rate_cache.get_stats()}
 
 
 # ============================================================================
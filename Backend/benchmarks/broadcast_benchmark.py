@@ -0,0 +1,79 @@
+"""
+Broadcast fan-out benchmark for EnhancedWebSocketManager
+
+Simulates N connected clients (a fraction of them slow) receiving one
+forex update per tick and reports how long the producer spends per tick
+and how quickly every client drains its queue.
+
+Run from Backend/:  python -m benchmarks.broadcast_benchmark --clients 10000
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import random
+import time
+
+from app.enhanced_websocket_manager import EnhancedWebSocketManager
+
+
+class FakeWebSocket:
+    """Minimal stand-in for a Starlette WebSocket with configurable latency"""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.received = 0
+
+    async def accept(self, subprotocol=None):
+        pass
+
+    async def send_text(self, text: str):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        self.received += 1
+
+    async def close(self, code: int = 1000):
+        pass
+
+
+async def run(clients: int, ticks: int, interval: float, slow_fraction: float):
+    manager = EnhancedWebSocketManager(max_queue=10, send_timeout=2.0)
+    sockets = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for i in range(clients):
+            latency = 5.0 if random.random() < slow_fraction else random.uniform(0, 0.005)
+            websocket = FakeWebSocket(latency)
+            sockets.append(websocket)
+            await manager.connect(websocket, f"task_{i % 100}")
+
+    payload = {
+        "rates": {f"PAIR{i}/USD": 1.0 + i / 100 for i in range(30)},
+        "news": [{"event": "Non-Farm Payrolls", "impact": "high"}] * 3,
+    }
+
+    produce_times = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(ticks):
+            start = time.perf_counter()
+            await manager.send_forex_update(payload)
+            produce_times.append(time.perf_counter() - start)
+            await asyncio.sleep(interval)
+
+    fast = [s for s in sockets if s.latency < 1]
+    delivered = sum(s.received for s in fast)
+    stats = manager.get_delivery_stats()
+    print(f"clients={clients} ticks={ticks} slow={len(sockets) - len(fast)}")
+    print(f"producer time per tick: avg={sum(produce_times) / ticks * 1000:.1f}ms "
+          f"max={max(produce_times) * 1000:.1f}ms")
+    print(f"fast-client delivery: {delivered}/{len(fast) * (ticks + 1)} messages")
+    print(f"delivery stats: {stats}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=10000)
+    parser.add_argument("--ticks", type=int, default=5)
+    parser.add_argument("--interval", type=float, default=1.0)
+    parser.add_argument("--slow-fraction", type=float, default=0.01)
+    args = parser.parse_args()
+    asyncio.run(run(args.clients, args.ticks, args.interval, args.slow_fraction))
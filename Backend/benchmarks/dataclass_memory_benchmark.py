@@ -0,0 +1,105 @@
+"""
+Memory / attribute-access benchmark for the slotted trading dataclasses
+
+For each hot dataclass, builds an equivalent dict-backed twin (same fields,
+no __slots__) and reports allocated bytes per instance, construction time
+and attribute read time for both.
+
+Run from Backend/:  python -m benchmarks.dataclass_memory_benchmark --count 100000
+"""
+import argparse
+import dataclasses
+import gc
+import time
+import tracemalloc
+from datetime import datetime
+
+from app.ai_forex_engine import MarketCondition, TradingSignal
+from app.services.enhanced_notification_service import (
+    Notification,
+    NotificationCategory,
+    NotificationPriority,
+)
+from app.services.execution_intelligence_service import Condition, ConditionalOrder
+from app.services.paper_trading_engine import PaperTrade
+from app.services.risk_management_service import TradeExecution
+
+
+NOW = datetime.now()
+
+SAMPLES = {
+    PaperTrade: lambda i: PaperTrade(
+        f"pt_{i}", "user", "EUR/USD", "BUY", 1.1, NOW, 1000, 1.09, 1.12
+    ),
+    TradeExecution: lambda i: TradeExecution(
+        f"trade_{i}", "user", "EUR/USD", "BUY", 1.1, 1.09, 1.12, 1000, NOW, "open"
+    ),
+    TradingSignal: lambda i: TradingSignal(
+        "EUR/USD", "BUY", 0.8, 1.1, 1.09, 1.12, "RSI oversold", NOW
+    ),
+    MarketCondition: lambda i: MarketCondition(
+        "EUR/USD", 1.1, "BULLISH", 0.01, 1.09, 1.12, 55.0, {"macd": 0.1, "signal": 0.05}
+    ),
+    ConditionalOrder: lambda i: ConditionalOrder(
+        f"order_{i}", "user", "EUR/USD", "BUY", [Condition("price_level", "<", 1.1, "dip")]
+    ),
+    Notification: lambda i: Notification(
+        f"n_{i}", "user", "Trade executed", "BUY EUR/USD filled",
+        NotificationCategory.TRADE_EXECUTION, NotificationPriority.MEDIUM, NOW
+    ),
+}
+
+
+def dict_backed_twin(cls):
+    """Same fields and defaults as `cls`, but an ordinary __dict__ dataclass"""
+    spec = []
+    for f in dataclasses.fields(cls):
+        if f.default is not dataclasses.MISSING:
+            spec.append((f.name, f.type, dataclasses.field(default=f.default)))
+        elif f.default_factory is not dataclasses.MISSING:
+            spec.append((f.name, f.type, dataclasses.field(default_factory=f.default_factory)))
+        else:
+            spec.append((f.name, f.type))
+    return dataclasses.make_dataclass(f"{cls.__name__}Dict", spec)
+
+
+def measure(factory, count: int):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    instances = [factory(i) for i in range(count)]
+    build = time.perf_counter() - start
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    attr = dataclasses.fields(instances[0])[1].name
+    start = time.perf_counter()
+    for instance in instances:
+        getattr(instance, attr)
+    read = time.perf_counter() - start
+    return allocated / count, build / count * 1e9, read / count * 1e9
+
+
+def main(count: int):
+    print(f"{'class':<18}{'bytes/obj':>22}{'build ns':>20}{'getattr ns':>20}")
+    for cls, sample in SAMPLES.items():
+        twin = dict_backed_twin(cls)
+        fields = [f.name for f in dataclasses.fields(cls)]
+
+        # Build constructor arguments up front so only construction is measured
+        args = [{name: getattr(sample(i), name) for name in fields} for i in range(count)]
+        slotted = measure(lambda i: cls(**args[i]), count)
+        dict_backed = measure(lambda i: twin(**args[i]), count)
+        del args
+
+        print(f"{cls.__name__:<18}"
+              f"{dict_backed[0]:>10.0f} -> {slotted[0]:<9.0f}"
+              f"{dict_backed[1]:>9.0f} -> {slotted[1]:<8.0f}"
+              f"{dict_backed[2]:>9.1f} -> {slotted[2]:<8.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--count", type=int, default=100000)
+    args = parser.parse_args()
+    main(args.count)
@@ -0,0 +1,101 @@
+import asyncio
+from datetime import datetime, timedelta
+from app.services.audit_log_store import AuditLogStore
+from app.services.security_compliance_service import (
+    AuditActionType,
+    AuditLogEntry,
+    RollingWindow,
+    SecurityComplianceService,
+)
+
+
+def _entry(user_id, when, action=AuditActionType.TRADE_EXECUTED, n=0):
+    return AuditLogEntry(log_id=f"audit_{user_id}_{n}", user_id=user_id, action=action, timestamp=when)
+
+
+def test_queries_span_buffered_and_partitioned_entries(tmp_path):
+    async def scenario():
+        store = AuditLogStore(str(tmp_path / "audit.db"), retention_days=3650, batch_size=100, flush_interval=60)
+        now = datetime.now()
+        for n in range(300):  # Ten users, entries reaching back about three months
+            store.append(_entry(f"u{n % 10}", now - timedelta(hours=n * 7), n=n))
+        store.append(_entry("u1", now, AuditActionType.KILL_SWITCH_ACTIVATED, n=999))
+
+        latest = await store.query("u1", limit=5)
+        assert latest[0]["log_id"] == "audit_u1_999" and latest[0]["action"] == "kill_switch_activated"
+        assert [r["log_id"] for r in latest[1:]] == [f"audit_u1_{n}" for n in (1, 11, 21, 31)]
+
+        await store.flush()
+        assert store.get_stats()["partitions"] >= 3
+        assert await store.query("u1", limit=5) == latest
+        assert await store.count("u1") == 31
+        assert await store.count("u1", action="trade_executed", since=now - timedelta(days=1)) == 1
+        assert len(await store.query("u1", since=now - timedelta(days=30), limit=1000)) == 12
+        store.close()
+
+    asyncio.run(scenario())
+
+
+def test_retention_drops_whole_expired_partitions(tmp_path):
+    store = AuditLogStore(str(tmp_path / "audit.db"), retention_days=30)
+    now = datetime.now()
+    store.append(_entry("u1", now - timedelta(days=120), n=1))
+    store.append(_entry("u1", now, n=2))
+    store.close()  # Flushes the buffer synchronously
+
+    reopened = AuditLogStore(str(tmp_path / "audit.db"), retention_days=30)
+    assert asyncio.run(reopened.count("u1")) == 1
+    assert reopened.get_stats()["partitions"] == 1
+    reopened.close()
+
+
+def test_compliance_report_counts_from_the_store(tmp_path):
+    service = SecurityComplianceService(AuditLogStore(str(tmp_path / "audit.db")))
+    for n in range(22):
+        asyncio.run(service.log_trade_execution("u1", f"trade_{n}", "EUR/USD", "BUY", 1000, 1.1))
+    for _ in range(3):
+        asyncio.run(service._log_audit("u1", AuditActionType.KILL_SWITCH_ACTIVATED))
+
+    report = asyncio.run(service.generate_compliance_report("u1"))
+    assert report["summary"]["daily_trades"] == 22
+    assert report["summary"]["daily_volume"] == 22000
+    assert report["details"]["violations"] == ["Multiple kill switch activations detected"]
+    assert report["audit_trail_size"] == 25
+    assert len(asyncio.run(service.get_audit_log("u1", limit=10))) == 10
+    service.close()
+
+
+def test_rolling_window_evicts_whole_buckets():
+    window = RollingWindow(timedelta(days=1), timedelta(minutes=1))
+    base = datetime(2024, 1, 1, 12, 0)
+    for minutes in (0, 0, 30, 600):
+        window.add(base + timedelta(minutes=minutes), 100)
+    window.add(base - timedelta(minutes=5), 50)  # Out of order, as when seeding
+
+    assert window.count(base + timedelta(hours=1)) == 5
+    assert window.total(base + timedelta(days=1)) == 400  # Only the -5 min bucket has aged out
+    assert window.total(base + timedelta(days=1, minutes=1)) == 200
+    assert window.count(base + timedelta(days=2)) == 0 and window.total(base + timedelta(days=2)) == 0.0
+
+
+def test_counters_are_rebuilt_from_the_store_after_restart(tmp_path):
+    path = str(tmp_path / "audit.db")
+    store = AuditLogStore(path)
+    now = datetime.now()
+    for n, (hours, action) in enumerate([
+        (2, AuditActionType.TRADE_EXECUTED),
+        (30, AuditActionType.TRADE_EXECUTED),  # Outside the daily window
+        (48, AuditActionType.KILL_SWITCH_ACTIVATED),
+        (24 * 10, AuditActionType.KILL_SWITCH_ACTIVATED),  # Outside the 7-day window
+    ]):
+        entry = _entry("u1", now - timedelta(hours=hours), action, n=n)
+        entry.metadata = {"quantity": 500}
+        store.append(entry)
+    store.close()
+
+    service = SecurityComplianceService(AuditLogStore(path))
+    asyncio.run(service.log_trade_execution("u1", "trade_new", "EUR/USD", "BUY", 1000, 1.1))
+    dashboard = asyncio.run(service.get_security_dashboard("u1"))
+    assert dashboard["activity"] == {"daily_trades": 2, "daily_volume": 1500.0, "kill_switches_7d": 1}
+    assert asyncio.run(service.generate_compliance_report("u1"))["audit_trail_size"] == 5
+    service.close()
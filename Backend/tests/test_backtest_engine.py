@@ -0,0 +1,78 @@
+import asyncio
+import numpy as np
+from app.ai_forex_engine import ForexAIEngine, MarketCondition
+from app.services.backtest_engine import (
+    BacktestEngine,
+    OHLCData,
+    StrategyParams,
+    compute_features,
+    generate_signals,
+)
+
+
+def _random_walk(bars=600, seed=7):
+    rng = np.random.default_rng(seed)
+    close = 1.1 * np.exp(np.cumsum(rng.normal(0, 0.002, bars)))
+    spread = np.abs(rng.normal(0, 0.001, bars))
+    return OHLCData.from_arrays(close, close * (1 + spread), close * (1 - spread))
+
+
+def test_vectorized_signals_match_generate_trading_signal():
+    ohlc = _random_walk()
+    features = compute_features(ohlc.close)
+    signals = generate_signals(features, [StrategyParams()])
+    engine = ForexAIEngine()
+    trends = {1: "BULLISH", -1: "BEARISH", 0: "SIDEWAYS"}
+    actions = {"BUY": 1, "SELL": -1, "HOLD": 0}
+
+    async def expected(i):
+        condition = MarketCondition(
+            pair="EUR/USD",
+            current_price=float(features["close"][i]),
+            trend=trends[int(features["trend"][i])],
+            volatility=0.0,
+            support_level=float(features["support"][i]),
+            resistance_level=float(features["resistance"][i]),
+            rsi=float(features["rsi"][i]),
+            macd={"histogram": float(features["histogram"][i])}
+        )
+        return await engine.generate_trading_signal("EUR/USD", condition, {})
+
+    for i in range(50, len(ohlc), 7):
+        signal = asyncio.run(expected(i))
+        assert signals["action"][0, i] == actions[signal.action], i
+        if signal.action != "HOLD":
+            assert np.isclose(signals["stop_loss"][0, i], signal.stop_loss)
+            assert np.isclose(signals["take_profit"][0, i], signal.take_profit)
+
+
+def test_backtest_reports_paper_account_statistics():
+    ohlc = _random_walk(2000)
+    grid = [StrategyParams(), StrategyParams(rsi_oversold=40, rsi_overbought=60, take_profit_pct=0.005)]
+    results = BacktestEngine().run_grid("EUR/USD", ohlc, grid, include_trades=True)
+
+    for result in results:
+        statistics = result["summary"]["statistics"]
+        trades = result["trades"]
+        assert statistics["total_trades"] == len(trades) > 0
+        assert statistics["winning_trades"] == sum(t["profit_loss"] > 0 for t in trades)
+        assert np.isclose(result["summary"]["balance"]["total_profit_loss"], sum(t["profit_loss"] for t in trades))
+        # One position at a time: each entry comes after the previous exit
+        assert all(a["exit_time"] <= b["entry_time"] for a, b in zip(trades, trades[1:]))
+    assert results[0]["params"] != results[1]["params"]
+
+
+def test_live_history_bars_are_copied_off_the_ring_buffer():
+    from app.advanced_features_routes import _load_ohlc
+    from app.price_history import price_history
+
+    pair = "TST/BT"
+    for i in range(price_history.capacity):  # Full buffer: every append now overwrites
+        price_history.append(pair, 1.0 + i * 1e-4, float(i))
+    ohlc = _load_ohlc(pair)
+    before = ohlc.close.copy(), ohlc.timestamps.copy()
+
+    for i in range(50):
+        price_history.append(pair, 9.0, 1e9 + i)
+    assert (ohlc.close == before[0]).all() and (ohlc.timestamps == before[1]).all()
+    del price_history.buffers[pair]
@@ -0,0 +1,74 @@
+import asyncio
+from app.indicator_engine import IndicatorEngine
+from app.services.execution_intelligence_service import ExecutionIntelligenceService, OrderStatus
+from app.services.market_data_bus import MarketDataBus
+from app.services.risk_management_service import RiskLimits, RiskManagementService
+
+
+def _risk_manager():
+    risk = RiskManagementService()
+    limits = RiskLimits(max_trade_size=5000, daily_loss_limit=5, max_open_positions=10, max_drawdown_percent=20)
+    asyncio.run(risk.initialize_user_limits("bot", limits))
+    return risk
+
+
+def _grid(count, pair="EUR/USD"):
+    return [
+        {
+            "pair": pair,
+            "action": "BUY",
+            "conditions": [{"type": "price_level", "operator": "<=", "value": 1.08 - i * 1e-4}],
+            "position_size": 1000,
+            "stop_loss": 1.0,
+            "take_profit": 1.2,
+            "max_hours": 8,
+        }
+        for i in range(count)
+    ]
+
+
+def test_batch_validation_matches_single_validation():
+    risk = _risk_manager()
+    trades = [
+        {"position_size": 9000, "stop_loss": 1.0, "take_profit": 1.2},
+        {"position_size": 1000, "take_profit": 1.2},
+        {"position_size": 1000, "stop_loss": 1.099, "take_profit": 1.2, "entry_price": 1.1},
+        {"position_size": 1000, "stop_loss": 1.0, "take_profit": 1.2, "entry_price": 1.1},
+    ]
+    batch = asyncio.run(risk.validate_trades("bot", trades))
+    single = [asyncio.run(risk.validate_trade("bot", trade)) for trade in trades]
+    assert batch == single
+    assert [ok for ok, _ in batch] == [False, False, False, True]
+    assert asyncio.run(risk.validate_trades("nobody", trades))[0] == (False, "User risk limits not configured")
+
+
+def test_bulk_create_registers_valid_orders_in_one_pass():
+    risk = _risk_manager()
+
+    async def scenario():
+        bus = MarketDataBus()
+        service = ExecutionIntelligenceService(tick_bus=bus, indicators=IndicatorEngine())
+        orders = _grid(300) + _grid(100, "GBP/USD")
+        orders[5]["position_size"] = 10000  # Over the risk limit
+        orders[7]["conditions"] = [{"type": "sentiment", "operator": ">", "value": 0.5}]
+        orders[9]["order_type"] = "iceberg"
+
+        result = await service.create_conditional_orders("bot", orders, risk_manager=risk)
+        assert result["created_count"] == 397
+        assert [r["index"] for r in result["rejected"]] == [5, 7, 9]
+        assert result["rejected"][0]["risk_check_failed"]
+
+        assert bus.subscriber_count("EUR/USD") == 1 and bus.subscriber_count("GBP/USD") == 1
+        assert len(service.scheduler) == 397 + 1  # Expiries plus one session wakeup
+
+        await bus.publish("EUR/USD", 1.0795)  # Crosses the first six EUR/USD levels
+        assert service.orders.count(OrderStatus.TRIGGERED) == 5  # Index 5 was rejected
+
+        created = [c["order_id"] for c in result["created"]]
+        cancel = await service.cancel_orders(created[:50] + ["order_missing"], user_id="bot")
+        assert cancel["cancelled_count"] == 45  # Five of them already triggered
+        assert len(cancel["failed"]) == 6
+        assert service.orders.count(OrderStatus.PENDING) == 397 - 50
+        service.scheduler.stop()
+
+    asyncio.run(scenario())
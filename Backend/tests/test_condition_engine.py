@@ -0,0 +1,135 @@
+import asyncio
+from datetime import datetime, timedelta
+from app.indicator_engine import IndicatorEngine
+from app.services.condition_engine import ConditionBook
+from app.services.execution_intelligence_service import (
+    Condition,
+    ExecutionIntelligenceService,
+    OrderStatus,
+)
+from app.services.market_data_bus import MarketDataBus
+
+
+NOW = datetime(2024, 1, 2, 10, 0)
+
+
+def _cond(type_, operator, value, indicator=None):
+    return Condition(type_, operator, value, "", indicator)
+
+
+def _run(book, pair, prices, session="london"):
+    return [book.evaluate(pair, {"price": p}, NOW, session) for p in prices]
+
+
+def test_identical_conditions_share_one_predicate_slot():
+    book = ConditionBook()
+    for i in range(1000):
+        book.add(f"o{i}", "EUR/USD", [_cond("price_level", "<", 1.08)])
+    book.add("other", "EUR/USD", [_cond("price_level", ">", 1.12)])
+
+    table = book.tables["EUR/USD"]["price"]
+    assert len(table) == 2
+
+    first, second = _run(book, "EUR/USD", [1.10, 1.07])
+    assert first == []
+    assert sorted(second) == sorted(f"o{i}" for i in range(1000))
+    assert len(book) == 1 and len(table) == 1
+
+
+def test_crosses_fires_only_on_the_crossing_tick():
+    book = ConditionBook()
+    book.add("first", "EUR/USD", [_cond("price_level", "crosses", 1.10)])
+    # The first tick has no previous price; sitting above the level is not a cross
+    assert _run(book, "EUR/USD", [1.11, 1.12]) == [[], []]
+
+    book.add("second", "EUR/USD", [_cond("price_level", "crosses", 1.10)])
+    assert sorted(_run(book, "EUR/USD", [1.10])[0]) == ["first", "second"]
+
+    book.add("again", "EUR/USD", [_cond("price_level", "crosses", 1.10)])
+    # Leaving the level does not count as a fresh cross
+    assert _run(book, "EUR/USD", [1.105, 1.095]) == [[], ["again"]]
+
+
+def test_and_or_logic_and_guards():
+    book = ConditionBook()
+    conditions = [_cond("price_level", "<", 1.10), _cond("indicator_value", "<", 30, "rsi")]
+    book.add("and", "EUR/USD", conditions)
+    book.add("or", "EUR/USD", conditions, all_must_match=False)
+    book.add("session", "EUR/USD", [_cond("price_level", "<", 1.10), _cond("session", "==", "new_york")])
+
+    assert book.evaluate("EUR/USD", {"price": 1.09, "rsi": 45}, NOW, "london") == ["or"]
+    assert book.evaluate("EUR/USD", {"price": 1.09, "rsi": 25}, NOW, "london") == ["and"]
+    assert book.evaluate("EUR/USD", {"price": 1.09, "rsi": 25}, NOW, "new_york") == ["session"]
+
+    book.add("late", "EUR/USD", [_cond("time", ">=", 2)], created_at=NOW)
+    assert book.evaluate("EUR/USD", {"price": 1.09}, NOW + timedelta(hours=1), "london") == []
+    assert book.evaluate("EUR/USD", {"price": 1.09}, NOW + timedelta(hours=2), "london") == ["late"]
+
+
+def test_unsupported_conditions_are_rejected():
+    service = ExecutionIntelligenceService(tick_bus=MarketDataBus(), indicators=IndicatorEngine())
+    for condition in (
+        {"type": "sentiment", "operator": ">", "value": 0.5},
+        {"type": "price_level", "operator": "~", "value": 1.1},
+        {"type": "indicator_value", "operator": "<", "value": 30, "indicator": "stochastic"},
+    ):
+        result = asyncio.run(service.create_conditional_order("u1", "EUR/USD", "BUY", [condition], 1000))
+        assert result["success"] is False
+    assert len(service.orders) == 0 and len(service.conditions) == 0
+
+
+def test_orders_trigger_on_ticks_with_live_indicators():
+    async def scenario():
+        bus = MarketDataBus()
+        indicators = IndicatorEngine()
+        service = ExecutionIntelligenceService(tick_bus=bus, indicators=indicators)
+        result = await service.create_conditional_order(
+            "u1", "EUR/USD", "BUY",
+            [
+                {"type": "price_level", "operator": "crosses", "value": 1.10},
+                {"type": "indicator_value", "operator": "<", "value": 50, "indicator": "rsi"},
+            ],
+            position_size=1000
+        )
+        order = service.orders.get(result["order_id"])
+
+        for price in [1.12 - 0.001 * i for i in range(15)]:
+            indicators.update("EUR/USD", price)
+            await bus.publish("EUR/USD", price)
+        assert order.status == OrderStatus.PENDING  # Still above 1.10
+
+        indicators.update("EUR/USD", 1.099)
+        await bus.publish("EUR/USD", 1.099)
+        assert order.status == OrderStatus.TRIGGERED
+        assert order.execution_price == 1.099
+        assert bus.subscriber_count("EUR/USD") == 0
+        assert result["success"]
+
+    asyncio.run(scenario())
+
+
+def test_indicator_conditions_wait_for_warm_up():
+    async def scenario():
+        bus = MarketDataBus()
+        indicators = IndicatorEngine(rsi_period=14)
+        service = ExecutionIntelligenceService(tick_bus=bus, indicators=indicators)
+        result = await service.create_conditional_order(
+            "u1", "EUR/USD", "BUY",
+            [{"type": "indicator_value", "operator": "<", "value": 70, "indicator": "rsi"}],
+            position_size=1000
+        )
+        order = service.orders.get(result["order_id"])
+
+        prices = [1.10 + 0.001 * (i % 2) for i in range(15)]  # Choppy, so the real RSI sits near 50
+        for price in prices[:14]:
+            indicators.update("EUR/USD", price)
+            await bus.publish("EUR/USD", price)
+            assert not indicators.is_ready("EUR/USD", "rsi")
+        assert order.status == OrderStatus.PENDING  # Placeholder RSI of 50 was never evaluated
+
+        indicators.update("EUR/USD", prices[14])
+        await bus.publish("EUR/USD", prices[14])
+        assert indicators.is_ready("EUR/USD", "rsi")
+        assert order.status == OrderStatus.TRIGGERED
+
+    asyncio.run(scenario())
@@ -0,0 +1,53 @@
+from app.forex_delta import ForexDeltaTracker
+
+
+def test_delta_contains_only_changed_pairs():
+    tracker = ForexDeltaTracker()
+    first = tracker.apply({"rates": {"EUR": 0.9, "GBP": 0.8}, "news": [], "sentiment": {"timestamp": "t1", "bias": "up"}})
+    second = tracker.apply({"rates": {"EUR": 0.91, "GBP": 0.8}, "news": [], "sentiment": {"timestamp": "t2", "bias": "up"}})
+
+    assert first["seq"] == 1 and first["rates"] == {"EUR": 0.9, "GBP": 0.8}
+    assert second["seq"] == 2
+    assert second["rates"] == {"EUR": 0.91}
+    assert "sentiment" not in second and "news" not in second
+
+
+def test_unchanged_tick_does_not_advance_sequence():
+    tracker = ForexDeltaTracker()
+    data = {"rates": {"EUR": 0.9}, "news": [], "sentiment": {}}
+    tracker.apply(data)
+
+    assert tracker.apply(dict(data)) is None
+    assert tracker.seq == 1
+
+
+def test_removed_pairs_and_snapshot():
+    tracker = ForexDeltaTracker()
+    tracker.apply({"rates": {"EUR": 0.9, "JPY": 150.0}})
+    delta = tracker.apply({"rates": {"EUR": 0.9}})
+    snapshot = tracker.snapshot()
+
+    assert delta["removed"] == ["JPY"]
+    assert snapshot["type"] == "forex_snapshot"
+    assert snapshot["seq"] == delta["seq"] == 2
+    assert snapshot["rates"] == {"EUR": 0.9}
+
+
+def test_single_pair_change_with_live_payload_shape_yields_only_rates():
+    def payload(rates, stamp):
+        news = [{"time": stamp, "currency": "USD", "event": "Non-Farm Payrolls", "forecast": "180K"}]
+        sentiment = {"timestamp": stamp, "trend": "bullish", "major_pairs": dict(rates), "volatility": "medium"}
+        return {"timestamp": stamp, "rates": rates, "news": news, "sentiment": sentiment}
+
+    rates = {f"P{i}": 1.0 + i for i in range(7)}
+    tracker = ForexDeltaTracker()
+    tracker.apply(payload(rates, "t1"))
+    delta = tracker.apply(payload({**rates, "P3": 4.5}, "t2"))
+
+    assert set(delta) == {"type", "seq", "timestamp", "rates"}
+    assert delta["rates"] == {"P3": 4.5}
+    assert "major_pairs" not in tracker.snapshot()["sentiment"]
+
+    changed_news = payload({**rates, "P3": 4.5}, "t3")
+    changed_news["news"][0]["forecast"] = "190K"
+    assert set(tracker.apply(changed_news)) == {"type", "seq", "timestamp", "news"}
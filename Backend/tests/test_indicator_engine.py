@@ -0,0 +1,47 @@
+import numpy as np
+from app.indicator_engine import IndicatorEngine, ema_series, rsi_series
+from app.ai_forex_engine import ForexAIEngine
+
+rng = np.random.default_rng(7)
+PRICES = 1.1 + np.cumsum(rng.normal(0, 0.001, 200))
+
+
+def test_incremental_matches_batch():
+    engine = IndicatorEngine()
+    series = engine.compute_series(PRICES)
+
+    for i, price in enumerate(PRICES):
+        engine.update("EUR/USD", price)
+        if i >= 26:
+            macd = engine.macd("EUR/USD")
+            assert np.isclose(macd["macd"], series["macd"][0, i])
+            assert np.isclose(macd["signal"], series["signal"][0, i])
+        if i >= 15:
+            assert np.isclose(engine.rsi("EUR/USD"), series["rsi"][0, i])
+
+
+def test_seed_then_update_matches_full_replay():
+    seeded, replayed = IndicatorEngine(), IndicatorEngine()
+    seeded.seed("GBP/USD", PRICES[:100])
+    for price in PRICES[100:]:
+        seeded.update("GBP/USD", price)
+    for price in PRICES:
+        replayed.update("GBP/USD", price)
+
+    assert np.isclose(seeded.rsi("GBP/USD"), replayed.rsi("GBP/USD"))
+    assert np.isclose(seeded.macd("GBP/USD")["histogram"], replayed.macd("GBP/USD")["histogram"])
+
+
+def test_batch_rows_are_independent():
+    matrix = np.vstack([PRICES, PRICES[::-1]])
+    rsi = rsi_series(matrix)
+    assert np.allclose(rsi[0], rsi_series(PRICES)[0])
+    assert np.allclose(rsi[1], rsi_series(PRICES[::-1])[0])
+    assert np.allclose(ema_series(matrix, 12)[1], ema_series(PRICES[::-1], 12))
+
+
+def test_engine_warmup_defaults():
+    engine = ForexAIEngine()
+    assert engine.calculate_rsi([1.0] * 10) == 50.0
+    assert engine.calculate_rsi(list(np.linspace(1.0, 1.1, 30))) == 100.0
+    assert engine.calculate_macd([1.0] * 20) == {"macd": 0, "signal": 0, "histogram": 0}
@@ -0,0 +1,118 @@
+import asyncio
+from app.services.execution_intelligence_service import ExecutionIntelligenceService, OrderStatus
+from app.services.market_data_bus import MarketDataBus
+
+
+def test_one_producer_per_pair_fans_out_to_all_subscribers():
+    fetches = []
+
+    async def source(pair):
+        fetches.append(pair)
+        return {"price": 1.1, "bid": 1.0999, "ask": 1.1001}
+
+    async def scenario():
+        bus = MarketDataBus(price_source=source, interval=0.01)
+        received = []
+
+        async def handler(tick):
+            received.append(tick.price)
+
+        tokens = [bus.subscribe("EUR/USD", handler) for _ in range(500)]
+        assert len(bus.producers) == 1
+
+        await asyncio.sleep(0.035)
+        ticks = bus.ticks_published
+        assert ticks >= 1
+        assert len(fetches) == ticks  # One fetch per tick, not per subscriber
+        assert len(received) == 500 * ticks
+
+        for token in tokens:
+            bus.unsubscribe("EUR/USD", token)
+        await asyncio.sleep(0)
+        assert not bus.producers and bus.subscriber_count() == 0
+
+    asyncio.run(scenario())
+
+
+def test_external_ticks_suppress_producer_fetches():
+    fetches = []
+
+    async def source(pair):
+        fetches.append(pair)
+        return {"price": 1.0}
+
+    async def scenario():
+        bus = MarketDataBus(price_source=source, interval=0.05)
+        prices = []
+
+        async def handler(tick):
+            prices.append(tick.price)
+
+        bus.subscribe("GBP/USD", handler)
+        for price in (1.27, 1.28, 1.29, 1.30):
+            await bus.publish_rates({"GBP/USD": price, "USD/JPY": 157.0})
+            await asyncio.sleep(0.02)
+
+        assert prices[:4] == [1.27, 1.28, 1.29, 1.30]
+        assert fetches == []
+        assert bus.last_price("USD/JPY") == 157.0
+        bus.stop()
+
+    asyncio.run(scenario())
+
+
+def test_execution_orders_share_one_subscription_per_pair():
+    async def scenario():
+        bus = MarketDataBus()
+        service = ExecutionIntelligenceService(tick_bus=bus)
+        order_ids = []
+        for i in range(3):
+            result = await service.create_conditional_order(
+                user_id=f"u{i}", pair="EUR/USD", action="BUY",
+                conditions=[{"type": "price_level", "operator": "<", "value": 1.0, "description": "dip"}],
+                position_size=1000, max_hours=0
+            )
+            order_ids.append(result["order_id"])
+        assert bus.subscriber_count("EUR/USD") == 1
+
+        await bus.publish("EUR/USD", 1.1)
+        assert len(service.monitored_orders["EUR/USD"]) == 3
+
+        for order_id in order_ids:
+            await service.cancel_order(order_id)
+        assert bus.subscriber_count("EUR/USD") == 0
+        assert service.orders.count(OrderStatus.CANCELLED) == 3
+
+    asyncio.run(scenario())
+
+
+def test_pairs_outside_the_shared_feed_use_the_subscriber_fallback():
+    async def shared(pair):  # Like the cached rates feed: USD majors only
+        return {"price": 1.1} if pair == "EUR/USD" else None
+
+    fallback_calls = []
+
+    async def realtime(pair):
+        fallback_calls.append(pair)
+        return {"price": 0.85}
+
+    async def scenario():
+        bus = MarketDataBus(price_source=shared, interval=0.01)
+        received = []
+
+        async def handler(tick):
+            received.append((tick.pair, tick.price))
+
+        cross = bus.subscribe("EUR/GBP", handler, fallback_source=realtime)
+        major = bus.subscribe("EUR/USD", handler, fallback_source=realtime)
+        await asyncio.sleep(0.035)
+
+        assert ("EUR/GBP", 0.85) in received and ("EUR/USD", 1.1) in received
+        assert set(fallback_calls) == {"EUR/GBP"}  # Majors never reach the fallback
+
+        bus.unsubscribe("EUR/GBP", cross)
+        bus.unsubscribe("EUR/USD", major)
+        assert bus.fallback_sources == {}
+        bus.stop()
+
+    asyncio.run(scenario())
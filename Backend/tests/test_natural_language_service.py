@@ -0,0 +1,15 @@
+import asyncio
+from app.services.natural_language_service import CommandType, NaturalLanguageService
+
+
+def test_paper_trade_command_gets_a_text_response():
+    async def scenario():
+        nlp = NaturalLanguageService()
+        parsed = await nlp.parse_command("paper trade EUR/USD for 1 month")
+        assert parsed.command_type == CommandType.PAPER_TRADE
+        result = await nlp.execute_parsed_command(parsed)
+        return await nlp.generate_nlp_response(parsed, result)
+
+    response = asyncio.run(scenario())
+    assert isinstance(response, str)
+    assert "EUR/USD" in response and "1 month" in response
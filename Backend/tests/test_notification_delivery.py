@@ -0,0 +1,70 @@
+import asyncio
+from app.services.enhanced_notification_service import EnhancedNotificationService, NotificationChannel
+from app.services.notification_delivery import ChannelConfig, DeliveryWorkerPool
+
+
+class _Notification:
+    def __init__(self, n, channels):
+        self.n = n
+        self.channels_to_send = channels
+        self.delivery_status = {}
+
+
+def test_channels_deliver_concurrently_with_limits_batches_and_retries():
+    async def scenario():
+        active = {"sms": 0, "peak": 0}
+        batches = []
+        attempts = {}
+
+        async def send_sms(notification):
+            active["sms"] += 1
+            active["peak"] = max(active["peak"], active["sms"])
+            await asyncio.sleep(0.01)
+            active["sms"] -= 1
+            attempts[notification.n] = attempts.get(notification.n, 0) + 1
+            if notification.n == 3 and attempts[3] < 3:
+                raise ConnectionError("gateway timeout")
+            if notification.n == 4:
+                raise ConnectionError("invalid number")
+
+        async def send_push_batch(notifications):
+            batches.append(len(notifications))
+
+        pool = DeliveryWorkerPool({
+            "sms": ChannelConfig(send_sms, concurrency=2),
+            "push": ChannelConfig(None, concurrency=1, send_batch=send_push_batch, batch_size=4),
+        }, max_attempts=3, backoff=0.01)
+
+        notifications = [_Notification(n, ["sms", "push", "fax"]) for n in range(10)]
+        assert [pool.submit(n) for n in notifications] == [2] * 10  # Returns without sending
+        assert notifications[0].delivery_status == {"sms": "pending", "push": "pending", "fax": "skipped: no sender"}
+
+        await asyncio.wait_for(pool.join(), timeout=2)
+        assert active["peak"] == 2
+        assert batches == [4, 4, 2]
+        assert notifications[3].delivery_status["sms"] == "sent" and attempts[3] == 3
+        assert notifications[4].delivery_status["sms"] == "failed: invalid number"
+        assert pool.get_stats()["sent"] == 19 and pool.failed == 1 and pool.retries == 4
+        pool.stop()
+
+    asyncio.run(scenario())
+
+
+def test_send_notification_returns_before_delivery():
+    async def scenario():
+        service = EnhancedNotificationService()
+        await service.set_notification_preferences("u1", enabled_channels=["push", "email", "sms"])
+        result = await service.send_notification(
+            "u1", "trade_executed", "TRADE_EXECUTION", "high",
+            pair="EUR/USD", action="BUY", price=1.1, sl=1.09, tp=1.12
+        )
+        notification = service.notifications[result["notification_id"]]
+        assert set(notification.delivery_status.values()) == {"pending"}
+
+        await asyncio.wait_for(service.delivery.join(), timeout=2)
+        assert notification.delivery_status == {
+            NotificationChannel.PUSH: "sent", NotificationChannel.EMAIL: "sent", NotificationChannel.SMS: "sent"
+        }
+        service.delivery.stop()
+
+    asyncio.run(scenario())
@@ -0,0 +1,59 @@
+import asyncio
+from datetime import datetime, timedelta
+from app.services.enhanced_notification_service import (
+    EnhancedNotificationService,
+    SlidingWindowRateLimiter,
+)
+
+
+def _service():
+    service = EnhancedNotificationService()
+    for user_id in ("u1", "u2"):
+        asyncio.run(service.set_notification_preferences(user_id, max_per_hour=5, digest_mode=True))
+    return service
+
+
+def _send(service, user_id, n):  # High priority, so quiet hours never hold it back
+    return asyncio.run(service.send_notification(
+        user_id, "daily_performance", "PERFORMANCE", "high", trades=n, win_rate=50, pnl=n
+    ))
+
+
+def test_sliding_window_limiter_frees_slots_as_sends_age_out():
+    limiter = SlidingWindowRateLimiter(timedelta(hours=1))
+    base = datetime(2024, 1, 1, 12, 0)
+    assert all(limiter.try_acquire("u1", 3, base + timedelta(minutes=m)) for m in (0, 10, 20))
+    assert not limiter.try_acquire("u1", 3, base + timedelta(minutes=30))
+    assert limiter.try_acquire("u2", 3, base + timedelta(minutes=30))
+    assert limiter.try_acquire("u1", 3, base + timedelta(minutes=61))
+    assert limiter.count("u1", base + timedelta(hours=3)) == 0
+
+
+def test_per_user_index_serves_reads_and_rate_limits():
+    service = _service()
+    sent = [_send(service, "u1", n) for n in range(7)]
+    assert [r["success"] for r in sent] == [True] * 5 + [False] * 2
+    assert sent[-1]["reason"] == "Rate limit exceeded"
+    assert _send(service, "u2", 0)["success"]  # Other users keep their own budget
+
+    ids = [r["notification_id"] for r in sent[:5]]
+    asyncio.run(service.mark_as_read(ids[4]))
+    unread = asyncio.run(service.get_notifications("u1", unread_only=True, limit=2))
+    assert [n["notification_id"] for n in unread] == [ids[3], ids[2]]
+    assert "error" in asyncio.run(service.mark_as_read("notif_missing"))
+
+    digest = asyncio.run(service.generate_digest("u1"))
+    assert digest["summary"] == {"performance": 5}
+    assert digest["by_category"]["performance"][0]["message"].startswith("Today: 0 trades")
+
+
+def test_expired_notifications_leave_every_index():
+    service = _service()
+    ids = [_send(service, "u1", n)["notification_id"] for n in range(3)]
+    for notif in list(service.notifications.values())[:2]:
+        notif.expires_at = datetime.now() - timedelta(seconds=1)
+
+    remaining = asyncio.run(service.get_notifications("u1"))
+    assert [n["notification_id"] for n in remaining] == [ids[2]]
+    assert list(service.notifications) == [ids[2]]
+    assert "error" in asyncio.run(service.mark_as_read(ids[0]))
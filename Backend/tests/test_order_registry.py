@@ -0,0 +1,49 @@
+import asyncio
+from app.indicator_engine import IndicatorEngine
+from app.services.execution_intelligence_service import ExecutionIntelligenceService, OrderStatus
+from app.services.market_data_bus import MarketDataBus
+
+
+def _service():
+    return ExecutionIntelligenceService(tick_bus=MarketDataBus(), indicators=IndicatorEngine())
+
+
+def _create(service, user_id, level):
+    return asyncio.run(service.create_conditional_order(
+        user_id, "EUR/USD", "BUY",
+        [{"type": "price_level", "operator": "<", "value": level}],
+        position_size=1000, max_hours=0
+    ))["order_id"]
+
+
+def test_lookups_and_transitions_use_the_indexes():
+    service = _service()
+    ids = [_create(service, f"user{i % 10}", 1.0 + i * 1e-4) for i in range(200)]
+    assert len(set(ids)) == 200
+
+    target = ids[57]
+    assert asyncio.run(service.get_order_status(target))["status"] == "pending"
+    assert asyncio.run(service.cancel_order(target))["success"]
+    assert "error" in asyncio.run(service.cancel_order(target))
+    assert asyncio.run(service.get_order_status(target))["status"] == "cancelled"
+
+    assert service.orders.count(OrderStatus.PENDING) == 199
+    assert service.orders.count(OrderStatus.CANCELLED) == 1
+    active = asyncio.run(service.get_active_orders("user7"))
+    assert [o["order_id"] for o in active] == [i for i in ids[7::10] if i != target]
+    assert "error" in asyncio.run(service.get_order_status("order_missing"))
+
+
+def test_history_lists_finished_orders_most_recent_last():
+    service = _service()
+    ids = [_create(service, "u1", 1.0) for _ in range(5)]
+    for order_id in (ids[3], ids[0], ids[4]):
+        asyncio.run(service.cancel_order(order_id))
+    asyncio.run(service.tick_bus.publish("EUR/USD", 0.99))  # Triggers the two still pending
+
+    history = asyncio.run(service.get_order_history("u1", limit=4))
+    assert [h["order_id"] for h in history[:2]] == [ids[0], ids[4]]
+    assert {h["order_id"] for h in history[2:]} == {ids[1], ids[2]}  # Same tick, either order
+    assert [h["status"] for h in history] == ["cancelled", "cancelled", "triggered", "triggered"]
+    assert history[-1]["execution_price"] == 0.99
+    assert asyncio.run(service.get_active_orders("u1")) == []
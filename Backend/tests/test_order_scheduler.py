@@ -0,0 +1,85 @@
+import asyncio
+from datetime import datetime, timedelta
+from app.indicator_engine import IndicatorEngine
+from app.services.execution_intelligence_service import (
+    ExecutionIntelligenceService,
+    OrderStatus,
+    SESSION_CHANGE_TIMER,
+)
+from app.services.market_data_bus import MarketDataBus
+from app.services.order_scheduler import OrderScheduler
+
+
+def test_timers_fire_in_deadline_order_with_replace_and_cancel():
+    scheduler = OrderScheduler()
+    base = datetime(2024, 1, 1, 12, 0)
+    fired = []
+
+    for i, minutes in enumerate([30, 10, 20, 40]):
+        scheduler.schedule(f"t{i}", base + timedelta(minutes=minutes), fired.append)
+    scheduler.schedule("t0", base + timedelta(minutes=5), fired.append)  # Replaces the 30 min timer
+    scheduler.cancel("t3")
+
+    assert asyncio.run(scheduler.run_due(base + timedelta(minutes=15))) == 2
+    assert fired == ["t0", "t1"]
+    assert asyncio.run(scheduler.run_due(base + timedelta(hours=1))) == 1
+    assert fired == ["t0", "t1", "t2"]
+    assert len(scheduler) == 0 and scheduler.next_deadline() is None
+
+
+def test_single_runner_wakes_for_earlier_timers():
+    async def scenario():
+        scheduler = OrderScheduler()
+        fired = []
+        scheduler.schedule("late", datetime.now() + timedelta(seconds=0.2), fired.append)
+        await asyncio.sleep(0)
+        scheduler.schedule("early", datetime.now() + timedelta(seconds=0.02), fired.append)
+        await asyncio.sleep(0.08)
+        assert fired == ["early"]
+        await asyncio.sleep(0.2)
+        assert fired == ["early", "late"]
+        scheduler.stop()
+
+    asyncio.run(scenario())
+
+
+def test_orders_expire_from_the_scheduler_without_ticks():
+    async def scenario():
+        bus = MarketDataBus()
+        service = ExecutionIntelligenceService(tick_bus=bus, indicators=IndicatorEngine())
+        await service.create_conditional_order(
+            "u1", "EUR/USD", "BUY",
+            [{"type": "price_level", "operator": "<", "value": 1.0}],
+            position_size=1000, max_hours=1
+        )
+        order = service.orders.user_orders("u1")[0]
+        assert SESSION_CHANGE_TIMER in service.scheduler
+
+        await service.scheduler.run_due(datetime.now() + timedelta(hours=2))
+        assert order.status == OrderStatus.EXPIRED
+        assert bus.subscriber_count() == 0
+        assert len(service.scheduler) == 0  # Session wakeups stop with the last order
+        service.scheduler.stop()
+
+    asyncio.run(scenario())
+
+
+def test_session_change_releases_orders_waiting_on_their_session():
+    async def scenario():
+        bus = MarketDataBus()
+        service = ExecutionIntelligenceService(tick_bus=bus, indicators=IndicatorEngine())
+        sessions = iter(["asian", "london"])
+        service._get_current_session = lambda: type("S", (), {"value": next(sessions)})()
+
+        await service.create_session_aware_order("u1", "EUR/USD", "BUY", 1000, 1.0, 1.2, "london")
+        order = service.orders.user_orders("u1")[0]
+
+        await bus.publish("EUR/USD", 1.1)  # Asian session: guard holds the order
+        assert order.status == OrderStatus.PENDING
+
+        await service._on_session_change()  # London opens, no tick needed
+        assert order.status == OrderStatus.TRIGGERED
+        assert order.execution_price == 1.1
+        service.scheduler.stop()
+
+    asyncio.run(scenario())
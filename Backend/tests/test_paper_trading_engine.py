@@ -0,0 +1,41 @@
+import asyncio
+from app.services.paper_trading_engine import PaperTradingEngine
+
+
+def test_price_update_triggers_only_crossed_levels():
+    async def run():
+        engine = PaperTradingEngine()
+        await engine.create_paper_trading_account("u1", 1_000_000)
+        buy = await engine.open_paper_trade("u1", "EUR/USD", "BUY", 1000, entry_price=1.1, stop_loss=1.09, take_profit=1.12)
+        sell = await engine.open_paper_trade("u1", "EUR/USD", "SELL", 1000, entry_price=1.1, stop_loss=1.12, take_profit=1.09)
+        other = await engine.open_paper_trade("u1", "GBP/USD", "BUY", 1000, entry_price=1.27, stop_loss=1.26, take_profit=1.28)
+
+        first = await engine.update_live_prices({"EUR/USD": 1.085})
+        second = await engine.update_live_prices({"EUR/USD": 1.1})
+        trades = {t["trade_id"]: t for t in await engine.get_paper_trades("u1")}
+        return engine, first, second, trades, buy["trade_id"], sell["trade_id"], other["trade_id"]
+
+    engine, first, second, trades, buy_id, sell_id, other_id = asyncio.run(run())
+    assert first["trades_triggered"] == 2
+    assert second["trades_triggered"] == 0
+    assert trades[buy_id]["status"] == "stopped_out"
+    assert trades[buy_id]["exit_price"] == 1.09
+    assert trades[sell_id]["status"] == "closed"
+    assert trades[sell_id]["exit_price"] == 1.09
+    assert trades[other_id]["status"] == "open"
+    assert set(engine.open_trades) == {other_id}
+
+
+def test_manually_closed_trade_is_not_triggered():
+    async def run():
+        engine = PaperTradingEngine()
+        await engine.create_paper_trading_account("u1", 1_000_000)
+        trade = await engine.open_paper_trade("u1", "EUR/USD", "BUY", 1000, entry_price=1.1, stop_loss=1.09, take_profit=1.12)
+        await engine.close_paper_trade("u1", trade["trade_id"], 1.105)
+        result = await engine.update_live_prices({"EUR/USD": 1.0})
+        summary = await engine.get_paper_account_summary("u1")
+        return result, summary
+
+    result, summary = asyncio.run(run())
+    assert result["trades_triggered"] == 0
+    assert summary["statistics"]["total_trades"] == 1
@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+from app.price_history import PriceHistoryStore, PriceRingBuffer
+
+
+def test_window_is_contiguous_view_after_wraparound():
+    buffer = PriceRingBuffer(capacity=5)
+    buffer.extend(range(12))
+
+    window = buffer.window(3)
+    assert list(window) == [9, 10, 11]
+    assert np.shares_memory(window, buffer.window())
+    assert list(buffer.window()) == [7, 8, 9, 10, 11]
+    with pytest.raises(ValueError):
+        window[0] = 0.0
+
+
+def test_view_survives_capacity_minus_size_appends():
+    buffer = PriceRingBuffer(capacity=10)
+    buffer.extend(range(10))
+    window = buffer.window(4)
+    buffer.extend([100, 101, 102, 103, 104, 105])
+    assert list(window) == [6, 7, 8, 9]
+
+
+def test_store_appends_ticks_per_pair():
+    store = PriceHistoryStore(capacity=8)
+    store.append_many({"EUR/USD": 1.10, "GBP/USD": 1.27})
+    store.append("EUR/USD", 1.11)
+
+    assert list(store.window("EUR/USD", 10)) == [1.10, 1.11]
+    assert store.latest("GBP/USD") == 1.27
+    assert store.window("USD/JPY", 10) is None
+
+
+def test_analysis_padding_stays_out_of_the_shared_store():
+    from app.ai_task_routes import HISTORY_WINDOW, get_price_window
+    from app.price_history import price_history
+
+    pair = "TST/PAD"
+    price_history.append_many({pair: 1.5})
+    window = get_price_window(pair, {pair: 1.5})
+
+    assert window.size == HISTORY_WINDOW and window[-1] == 1.5
+    assert not window.flags.writeable
+    assert price_history.size(pair) == 1  # Backtests only ever see the real tick
+    del price_history.buffers[pair]
@@ -0,0 +1,83 @@
+import asyncio
+from datetime import datetime, timedelta
+from app.services.enhanced_notification_service import EnhancedNotificationService
+
+
+def _quiet_now(service, user_id, digest_mode=False, max_per_hour=100):
+    now = datetime.now()
+    asyncio.run(service.set_notification_preferences(
+        user_id,
+        enabled_channels=["push", "email"],
+        quiet_hours_start=(now - timedelta(hours=1)).strftime("%H:%M"),
+        quiet_hours_end=(now + timedelta(hours=1)).strftime("%H:%M"),
+        max_per_hour=max_per_hour,
+        digest_mode=digest_mode
+    ))
+
+
+def _alert(service, user_id, template_id="price_alert", category="PRICE_ALERT", priority="medium"):
+    return asyncio.run(service.send_notification(
+        user_id, template_id, category, priority, pair="EUR/USD", level=1.1, target_percent=1, current=1.1
+    ))
+
+
+def test_quiet_hours_hold_notifications_until_one_release_per_time():
+    async def release(service, when):
+        await service.release_scheduler.run_due(when)
+        await asyncio.wait_for(service.delivery.join(), timeout=2)
+
+    service = EnhancedNotificationService()
+    for user_id in ("u1", "u2"):
+        _quiet_now(service, user_id)
+    held = [_alert(service, user_id) for user_id in ("u1", "u2", "u1")]
+    urgent = _alert(service, "u1", priority="high")
+
+    assert all(r["queued"] for r in held) and "queued" not in urgent
+    assert len({r["deliver_at"] for r in held}) == 1
+    assert len(service.release_scheduler) == 1  # Both users share one release timer
+    first = service.notifications[held[0]["notification_id"]]
+    assert set(first.delivery_status.values()) == {"deferred"}
+
+    release_at = datetime.fromisoformat(held[0]["deliver_at"])
+    asyncio.run(release(service, release_at))
+    assert set(first.delivery_status.values()) == {"sent"}
+    assert service.deferred == {} and len(service.release_scheduler) == 0
+
+
+def test_digest_mode_users_get_one_incrementally_built_digest():
+    service = EnhancedNotificationService()
+    _quiet_now(service, "u1", digest_mode=True)
+    held = [_alert(service, "u1") for _ in range(3)]
+    held.append(_alert(service, "u1", "news_alert", "NEWS_ALERT"))
+
+    digest = asyncio.run(service.generate_digest("u1"))
+    assert digest["deferred"]["summary"] == {"price_alert": 3, "news_alert": 1}
+
+    release_at = datetime.fromisoformat(held[0]["deliver_at"])
+    assert asyncio.run(service._release_deferred(release_at)) == 4
+    latest = asyncio.run(service.get_notifications("u1", limit=1))[0]
+    assert latest["title"] == "While you were away: 4 notifications"
+    assert latest["message"] == "1 news alert, 3 price alert"
+    statuses = service.notifications[held[0]["notification_id"]].delivery_status.values()
+    assert all(status == f"digested: {latest['notification_id']}" for status in statuses)
+
+
+def test_release_stops_at_the_hourly_limit_and_digests_the_rest():
+    service = EnhancedNotificationService()
+    _quiet_now(service, "u1", max_per_hour=2)
+    held = [_alert(service, "u1") for _ in range(5)]
+    assert all(r["queued"] for r in held)  # Deferral itself is not rate limited
+
+    async def release(when):
+        released = await service._release_deferred(when)
+        await asyncio.wait_for(service.delivery.join(), timeout=2)
+        return released
+
+    assert asyncio.run(release(datetime.fromisoformat(held[0]["deliver_at"]))) == 5
+    latest = asyncio.run(service.get_notifications("u1", limit=1))[0]
+    assert latest["title"] == "While you were away: 3 notifications"
+
+    statuses = [set(service.notifications[r["notification_id"]].delivery_status.values()) for r in held]
+    assert statuses[:2] == [{"sent"}] * 2
+    assert statuses[2:] == [{f"digested: {latest['notification_id']}"}] * 3
+    assert service.rate_limiter.count("u1") == 2
@@ -0,0 +1,65 @@
+import asyncio
+import pytest
+from app.rate_cache import RateCache
+
+
+def make_fetcher(values, delay=0.01):
+    calls = []
+
+    async def fetcher():
+        calls.append(1)
+        await asyncio.sleep(delay)
+        value = values[len(calls) - 1]
+        if isinstance(value, Exception):
+            raise value
+        return value
+
+    return fetcher, calls
+
+
+def test_concurrent_misses_share_one_fetch():
+    cache = RateCache(ttl=60)
+    fetcher, calls = make_fetcher([{"EUR": 0.9}])
+
+    async def run():
+        results = await asyncio.gather(*[cache.get("usd", fetcher) for _ in range(20)])
+        cached = await cache.get("usd", fetcher)
+        return results, cached
+
+    results, cached = asyncio.run(run())
+    assert len(calls) == 1
+    assert all(r == {"EUR": 0.9} for r in results)
+    assert cached == {"EUR": 0.9}
+    assert cache.hits == 1
+
+
+def test_stale_value_served_while_revalidating():
+    cache = RateCache(ttl=0.03, stale_ttl=60)
+    fetcher, calls = make_fetcher([1, 2])
+
+    async def run():
+        first = await cache.get("usd", fetcher)
+        await asyncio.sleep(0.04)
+        stale = await cache.get("usd", fetcher)
+        await asyncio.sleep(0.02)
+        refreshed = await cache.get("usd", fetcher)
+        return first, stale, refreshed
+
+    assert asyncio.run(run()) == (1, 1, 2)
+    assert len(calls) == 2
+
+
+def test_upstream_failure_falls_back_to_last_value():
+    cache = RateCache(ttl=0, stale_ttl=0)
+    fetcher, calls = make_fetcher([1, RuntimeError("down"), RuntimeError("down")])
+
+    async def run():
+        await cache.get("usd", fetcher)
+        return await cache.get("usd", fetcher)
+
+    assert asyncio.run(run()) == 1
+
+    empty = RateCache()
+    failing, _ = make_fetcher([RuntimeError("down")])
+    with pytest.raises(RuntimeError):
+        asyncio.run(empty.get("usd", failing))
@@ -0,0 +1,97 @@
+import asyncio
+import numpy as np
+from app.ai_forex_engine import ForexAIEngine, MarketCondition
+from app.services.backtest_engine import OHLCData
+from app.services.strategy_optimizer import StrategyOptimizer, build_grid
+
+
+def _random_walk(bars=800, seed=11):
+    rng = np.random.default_rng(seed)
+    close = 1.1 * np.exp(np.cumsum(rng.normal(0, 0.002, bars)))
+    spread = np.abs(rng.normal(0, 0.001, bars))
+    return OHLCData.from_arrays(close, close * (1 + spread), close * (1 - spread))
+
+
+def test_build_grid_rejects_unknown_parameters():
+    grid = build_grid({"rsi_oversold": [20, 30], "take_profit_pct": [0.01, 0.02, 0.03]})
+    assert len(grid) == 6
+    assert {p.rsi_oversold for p in grid} == {20, 30}
+    assert all(p.confidence_threshold == 0.5 for p in grid)
+
+    try:
+        build_grid({"rsi_lookback": [14]})
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("unknown parameter accepted")
+
+    try:
+        build_grid({"rsi_oversold": list(range(100)), "rsi_overbought": list(range(100))}, max_combinations=5000)
+    except ValueError as e:
+        assert "10000 combinations" in str(e)
+    else:
+        raise AssertionError("oversized grid accepted")
+
+
+def by_pnl(result):
+    return {tuple(r["params"].values()): r["total_profit_loss"] for r in result["results"]}
+
+
+def test_parallel_sweep_matches_inline_ranking():
+    ohlc = _random_walk()
+    grid = build_grid({
+        "rsi_oversold": [25, 30, 35, 40],
+        "confidence_threshold": [0.3, 0.4, 0.5, 0.6],
+        "take_profit_pct": [0.005, 0.01, 0.02, 0.03],
+    })
+
+    inline = StrategyOptimizer(max_workers=1).sweep("EUR/USD", ohlc, grid, top=None, min_trades=0)
+    optimizer = StrategyOptimizer(max_workers=2)
+    sweeps = optimizer.sweep_pairs({"EUR/USD": ohlc, "GBP/USD": ohlc}, grid, top=None, min_trades=0)
+    pool = optimizer._pool
+    assert pool is not None
+    optimizer.sweep("USD/JPY", ohlc, grid, min_trades=0)
+    assert optimizer._pool is pool  # Later sweeps reuse the spawned workers
+    optimizer.shutdown()
+    assert optimizer._pool is None
+    parallel = sweeps["EUR/USD"]
+    assert by_pnl(sweeps["GBP/USD"]) == by_pnl(parallel)
+
+    assert inline["combinations"] == parallel["combinations"] == 64
+    by_params = lambda table: {tuple(r["params"].values()): r["total_profit_loss"] for r in table}
+    assert by_params(inline["results"]) == by_params(parallel["results"])
+
+    pnl = [row["total_profit_loss"] for row in parallel["results"]]
+    assert pnl == sorted(pnl, reverse=True)
+    assert [row["rank"] for row in parallel["results"]] == list(range(1, 65))
+
+
+def test_tuned_thresholds_drive_live_signals():
+    engine = ForexAIEngine()
+    condition = MarketCondition(
+        pair="EUR/USD", current_price=1.1, trend="SIDEWAYS", volatility=0.0,
+        support_level=1.0, resistance_level=1.2, rsi=35.0, macd={"histogram": 0.001}
+    )
+
+    default = asyncio.run(engine.generate_trading_signal("EUR/USD", condition, {}))
+    assert default.action == "BUY" and default.confidence == 0.6
+
+    engine.set_strategy_params("EUR/USD", {"rsi_oversold": 40, "take_profit_pct": 0.01})
+    tuned = asyncio.run(engine.generate_trading_signal("EUR/USD", condition, {}))
+    assert tuned.action == "BUY" and abs(tuned.confidence - 0.65) < 1e-9
+    assert abs(tuned.take_profit - 1.111) < 1e-9
+
+    # Explicit user strategy wins over the tuned pair thresholds
+    gated = asyncio.run(engine.generate_trading_signal("EUR/USD", condition, {"confidence_threshold": 0.7}))
+    assert gated.action == "HOLD"
+
+
+def test_rank_puts_zero_trade_profit_factor_last():
+    rows = [
+        {"params": {"id": "idle"}, "total_trades": 0, "profit_factor": None},
+        {"params": {"id": "steady"}, "total_trades": 8, "profit_factor": 1.4},
+        {"params": {"id": "flawless"}, "total_trades": 3, "profit_factor": None},
+    ]
+    ranked = StrategyOptimizer()._rank(rows, "profit_factor", min_trades=0)
+    assert [row["params"]["id"] for row in ranked] == ["flawless", "steady", "idle"]
+    assert [row["rank"] for row in ranked] == [1, 2, 3]
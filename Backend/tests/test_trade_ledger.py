@@ -0,0 +1,46 @@
+from datetime import datetime
+import numpy as np
+from app.services.trade_ledger import TradeLedger
+
+
+def _append(ledger, i, pnl, pair="EUR/USD", status="closed"):
+    ledger.append(
+        trade_id=f"t{i}", user_id="u1", pair=pair, action="BUY",
+        entry_price=1.1, position_size=1000, entry_time=datetime(2024, 1, 1),
+        status=status, exit_price=1.1 + pnl / 1000, exit_time=datetime(2024, 1, 2),
+        profit_loss=pnl, profit_loss_percent=pnl / 11
+    )
+
+
+def test_ledger_grows_and_round_trips_rows():
+    ledger = TradeLedger(capacity=2)
+    for i, pnl in enumerate([10.0, -5.0, 20.0, -15.0, 5.0]):
+        _append(ledger, i, pnl, pair="EUR/USD" if i % 2 else "GBP/USD")
+
+    row = ledger.row(3)
+    assert len(ledger) == 5
+    assert row["trade_id"] == "t3" and row["pair"] == "EUR/USD" and row["profit_loss"] == -15.0
+    assert row["entry_time"] == datetime(2024, 1, 1)
+    assert ledger.count(pair="EUR/USD") == 2
+    assert ledger.count(pair="USD/JPY") == 0
+    np.testing.assert_allclose(ledger.column("profit_loss"), [10, -5, 20, -15, 5])
+
+
+def test_summary_matches_trade_by_trade_statistics():
+    ledger = TradeLedger()
+    for i, pnl in enumerate([10.0, -5.0, 20.0, -15.0, 5.0]):
+        _append(ledger, i, pnl)
+    ledger.append(
+        trade_id="open", user_id="u1", pair="EUR/USD", action="SELL",
+        entry_price=1.1, position_size=1000, entry_time=datetime(2024, 1, 3), status="closed_emergency"
+    )
+
+    summary = ledger.summary(starting_balance=100.0)
+    assert summary["total_trades"] == 5
+    assert summary["winning_trades"] == 3
+    assert summary["win_rate"] == 60.0
+    assert summary["total_profit_loss"] == 15.0
+    assert summary["max_drawdown"] == 15.0  # peak 125 -> 110
+    assert abs(summary["max_drawdown_percent"] - 12.0) < 1e-9
+    assert summary["profit_factor"] == 35.0 / 20.0
+    assert ledger.count(status="closed_emergency") == 1
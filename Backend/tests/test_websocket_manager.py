@@ -0,0 +1,187 @@
+import asyncio
+import json
+from app.enhanced_websocket_manager import EnhancedWebSocketManager
+from app.websocket_manager import ConnectionManager
+from app.websocket_outbound import OverflowPolicy
+from app.websocket_codec import BINARY_SUBPROTOCOL, unpack_tick
+
+
+class FakeWebSocket:
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.sent = []
+        self.closed_with = None
+
+    async def accept(self, subprotocol=None):
+        self.subprotocol = subprotocol
+        pass
+
+    async def send_text(self, text):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        self.sent.append(text)
+
+    async def send_bytes(self, data):
+        self.sent.append(data)
+
+    async def close(self, code=1000):
+        self.closed_with = code
+
+
+def test_broadcast_does_not_wait_for_slow_clients():
+    async def run():
+        manager = EnhancedWebSocketManager(max_queue=5, send_timeout=10)
+        fast, slow = FakeWebSocket(), FakeWebSocket(latency=1.0)
+        await manager.connect(fast, "a")
+        await manager.connect(slow, "b")
+
+        await asyncio.wait_for(manager.broadcast("tick", data={"EUR/USD": 1.1}), 0.05)
+        await asyncio.sleep(0.01)
+        return fast, manager
+
+    fast, manager = asyncio.run(run())
+    assert len(fast.sent) == 2  # welcome + broadcast
+    assert json.loads(fast.sent[-1])["data"] == {"EUR/USD": 1.1}
+
+
+def test_laggard_is_disconnected_when_queue_overflows():
+    async def run():
+        manager = EnhancedWebSocketManager(max_queue=2, send_timeout=10)
+        slow = FakeWebSocket(latency=1.0)
+        await manager.connect(slow, "a")
+        for _ in range(5):
+            await manager.broadcast("tick")
+        await asyncio.sleep(0)
+        return slow, manager
+
+    slow, manager = asyncio.run(run())
+    assert manager.get_connection_count() == 0
+    assert manager.laggards_disconnected == 1
+    assert slow.closed_with == 1013
+
+
+def test_disconnect_all_clears_every_subscription():
+    async def run():
+        manager = EnhancedWebSocketManager()
+        websocket, other = FakeWebSocket(), FakeWebSocket()
+        await manager.connect(websocket, "a")
+        await manager.connect(other, "a")
+        manager.subscribe(websocket, "b")
+        manager.subscribe(websocket, "c")
+
+        manager.disconnect(websocket, "b")
+        partially = (manager.get_subscriptions(websocket), manager.get_connection_count())
+
+        manager.disconnect_all(websocket)
+        return manager, partially
+
+    manager, partially = asyncio.run(run())
+    assert partially == ({"a", "c"}, 2)
+    assert set(manager.active_connections) == {"a"}
+    assert manager.get_connection_count() == 1
+    assert len(manager.subscriptions) == 1
+
+
+def test_forex_updates_coalesce_for_slow_clients():
+    async def run():
+        manager = EnhancedWebSocketManager(max_queue=2, send_timeout=10)
+        slow = FakeWebSocket(latency=0.05)
+        await manager.connect(slow, "a")
+        await asyncio.sleep(0)  # writer picks up the welcome message
+        for price in (1.1, 1.2, 1.3, 1.4):
+            await manager.send_forex_update({"rates": {"EUR/USD": price}})
+        await asyncio.sleep(0.15)
+        return slow, manager
+
+    slow, manager = asyncio.run(run())
+    assert manager.get_connection_count() == 1
+    assert len(slow.sent) == 2  # welcome + latest tick only
+    assert json.loads(slow.sent[-1])["data"]["rates"]["EUR/USD"] == 1.4
+    assert manager.get_delivery_stats()["messages_coalesced"] == 3
+
+
+def test_drop_oldest_policy_keeps_slow_client_connected():
+    async def run():
+        manager = ConnectionManager(max_queue=2, send_timeout=10, overflow_policy=OverflowPolicy.DROP_OLDEST)
+        slow = FakeWebSocket(latency=0.05)
+        await manager.connect(slow, "a")
+        await manager.send_update("a", {"n": 0})
+        await asyncio.sleep(0)  # writer is now busy sending 0
+        for i in range(1, 5):
+            await manager.send_update("a", {"n": i})
+        await asyncio.sleep(0.2)
+        return slow, manager
+
+    slow, manager = asyncio.run(run())
+    stats = manager.get_delivery_stats()
+    assert manager.get_connection_count("a") == 1
+    assert [json.loads(text)["n"] for text in slow.sent] == [0, 3, 4]
+    assert stats["messages_dropped"] == 2
+    assert stats["slow_clients_disconnected"] == 0
+
+
+def test_delta_clients_get_snapshot_then_deltas():
+    async def run():
+        manager = EnhancedWebSocketManager()
+        full, delta = FakeWebSocket(), FakeWebSocket()
+        await manager.connect(full, "global")
+        await manager.connect(delta, "global")
+        await manager.send_forex_update({"rates": {"EUR": 0.9, "GBP": 0.8}})
+        await manager.enable_forex_deltas(delta)
+        await manager.send_forex_update({"rates": {"EUR": 0.91, "GBP": 0.8}})
+        await asyncio.sleep(0.01)
+        return full, delta
+
+    full, delta = asyncio.run(run())
+    snapshot, update = [json.loads(text) for text in delta.sent[-2:]]
+    assert snapshot["type"] == "forex_snapshot" and snapshot["seq"] == 1
+    assert update == {"type": "forex_delta", "seq": 2, "timestamp": None, "rates": {"EUR": 0.91}}
+    assert json.loads(full.sent[-1])["data"]["rates"] == {"EUR": 0.91, "GBP": 0.8}
+
+
+def test_binary_subprotocol_gets_compact_updates_and_tick_frames():
+    async def run():
+        manager = EnhancedWebSocketManager()
+        legacy, compact = FakeWebSocket(), FakeWebSocket()
+        await manager.connect(legacy, "a")
+        await manager.connect(compact, "a", subprotocol=BINARY_SUBPROTOCOL)
+        await manager.enable_forex_deltas(compact)
+        await manager.send_forex_update({"timestamp": "2024-01-01T00:00:00", "rates": {"EUR": 0.9}})
+        await asyncio.sleep(0.01)
+        return legacy, compact
+
+    legacy, compact = asyncio.run(run())
+    legacy_welcome, compact_welcome = json.loads(legacy.sent[0]), json.loads(compact.sent[0])
+    assert isinstance(legacy_welcome["id"], str) and isinstance(legacy_welcome["timestamp"], str)
+    assert isinstance(compact_welcome["id"], int) and isinstance(compact_welcome["timestamp"], int)
+    assert compact.subprotocol == BINARY_SUBPROTOCOL
+
+    tick = unpack_tick(compact.sent[-1])
+    assert tick["type"] == "forex_delta" and tick["seq"] == 1
+    assert tick["rates"] == {"EUR": 0.9}
+
+
+def test_forex_stream_skips_repeated_cached_rates(monkeypatch):
+    from app.forex_data_service import forex_service
+    from app.ai_forex_engine import ai_engine
+    from app.price_history import price_history
+
+    snapshots = [{"TST/WS": 1.1}, {"TST/WS": 1.1}, {"TST/WS": 1.2}]
+    folded = []
+
+    async def fake_stream(callback, interval):
+        for rates in snapshots:
+            await callback({"rates": rates, "type": "live_update"})
+
+    monkeypatch.setattr(forex_service, "stream_live_data", fake_stream)
+    monkeypatch.setattr(ai_engine, "update_indicators", folded.append)
+
+    async def scenario():
+        manager = EnhancedWebSocketManager()
+        await manager.start_forex_stream(interval=10)
+        await manager.streaming_tasks["forex_stream"]
+
+    asyncio.run(scenario())
+    assert folded == [{"TST/WS": 1.1}, {"TST/WS": 1.2}]
+    assert list(price_history.buffers["TST/WS"].window()) == [1.1, 1.2]
+    del price_history.buffers["TST/WS"]